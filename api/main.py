@@ -4,19 +4,46 @@ FastAPI backend for browser-based gateway configuration
 """
 
 from fastapi import FastAPI, HTTPException, Response, Request
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from starlette.datastructures import Headers, MutableHeaders
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, ValidationError
+from typing import Optional, List, Callable
 import json
 import os
+import sys
+import gzip
+import mimetypes
+import re
+import copy
+import asyncio
+import signal
+import hashlib
+import threading
 import subprocess
 import time
+import heapq
+import sqlite3
 import logging
+from collections import OrderedDict
 from pathlib import Path
-from datetime import datetime, timedelta
+from stat import S_ISREG
+from datetime import datetime
 import secrets
+from concurrent.futures import Future
+
+# Dosya kilidi (birden fazla uvicorn worker'ı aynı dosyaya yazarken)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows
+
+# Brotli sıkıştırma (opsiyonel, yoksa sadece gzip)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
 
 # Logging yapılandırması
 logging.basicConfig(
@@ -31,6 +58,56 @@ UI_DIR = BASE_DIR / "ui"
 CONFIG_DIR = BASE_DIR / "config"
 USERS_FILE = CONFIG_DIR / "users.json"
 GATEWAY_CONFIG_FILE = CONFIG_DIR / "gateway.json"
+GATEWAY_CONFIG_LOCK_FILE = CONFIG_DIR / ".gateway.json.lock"
+
+# services paketini (BLE servisiyle ortak modüller) bulabilmek için proje kökünü ekle
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from services.live_telemetry import LiveTelemetryHub  # noqa: E402
+from services.value_decoder import compile_profile, ExpressionError  # noqa: E402
+from services.modbus_rtu import parse_register_map  # noqa: E402
+from services import metrics  # noqa: E402
+
+# BLE servisinden gelen canlı okumaların soket dizini ve istemci başına tutulan en fazla cihaz sayısı
+LIVE_TELEMETRY_DIR = Path(os.getenv("LIVE_TELEMETRY_DIR", str(BASE_DIR / "data" / "live")))
+LIVE_TELEMETRY_MAX_KEYS = int(os.getenv("LIVE_TELEMETRY_MAX_KEYS", "1024"))
+
+# BLE tarama süresi ve sonuçların önbellekte tutulma süresi (saniye)
+BLE_SCAN_DURATION = 8
+BLE_SCAN_CACHE_TTL = float(os.getenv("BLE_SCAN_CACHE_TTL", "30"))
+
+# WiFi tarama sonuçlarının önbellek süresi ve arka plan yenileme aralığı (saniye, 0: kapalı)
+WIFI_SCAN_CACHE_TTL = float(os.getenv("WIFI_SCAN_CACHE_TTL", "30"))
+WIFI_SCAN_REFRESH_INTERVAL = float(os.getenv("WIFI_SCAN_REFRESH_INTERVAL", "0"))
+
+# Oturumlar: süre (saniye), en fazla oturum sayısı (aşılırsa en az kullanılan atılır), süpürme aralığı
+SESSION_TTL = int(os.getenv("SESSION_TTL", "86400"))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "1000"))
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+# sqlite (varsayılan): tüm uvicorn worker'ları aynı oturumları paylaşır; memory: sadece tek worker
+# (uvicorn --workers WEB_CONCURRENCY'yi ayarlamaz, worker sayısı buradan güvenilir şekilde bilinemez)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")
+SESSION_DB_FILE = Path(os.getenv("SESSION_DB_FILE", str(CONFIG_DIR / "sessions.db")))
+
+# Bu boyuttan büyük JSON yanıtları ve statik dosyalar sıkıştırılır (byte)
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# Sürümlü (?v=<hash>) statik dosyaların tarayıcıda saklanma süresi (1 yıl)
+STATIC_IMMUTABLE_MAX_AGE = 31536000
+
+# /api/metrics'e cihazın kendisi ve oturum açmış kullanıcılar erişir; dışarıdan kazıyan
+# Prometheus için verilirse "Authorization: Bearer <token>" ile de erişilir
+API_METRICS_TOKEN = os.getenv("API_METRICS_TOKEN", "")
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+# İstek süresi histogram sınırları (saniye); API isteklerinin çoğu milisaniye altında biter
+API_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Art arda gelen kayıtlar bu süre içinde tek bir disk yazımında birleştirilir (0: hemen yaz)
+CONFIG_FLUSH_DELAY = float(os.getenv("GATEWAY_CONFIG_FLUSH_DELAY", "0.5"))
+# Disk yazımı başarısız olursa artan aralıklarla tekrar denenir (saniye)
+CONFIG_FLUSH_RETRY_MIN = 1.0
+CONFIG_FLUSH_RETRY_MAX = 60.0
 
 # ThingsBoard Gateway paths (Raspberry Pi'de /etc/thingsboard-gateway/config/ olacak)
 # Environment variable ile override edilebilir
@@ -53,9 +130,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Session storage (in-memory, simple approach)
-sessions = {}
-
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -84,8 +158,8 @@ def save_users(users):
         json.dump(users, f, indent=2)
 
 
-def load_gateway_config():
-    """Load gateway configuration"""
+def read_gateway_config_file():
+    """Read gateway.json from disk (creates the default configuration if missing)"""
     # Config dizinini oluştur (yoksa)
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     
@@ -95,6 +169,7 @@ def load_gateway_config():
             "gateway_name": "Gateway-01",
             "rs485": {
                 "enabled": False,
+                "port": "/dev/ttyUSB0",
                 "baudrate": 9600,
                 "parity": "none",
                 "data_bits": 8,
@@ -125,7 +200,8 @@ def load_gateway_config():
                 "mqtt_server": "",
                 "mqtt_port": 1883,
                 "udp_server": "",
-                "udp_port": 1700
+                "udp_port": 1700,
+                "local_port": 1680
             },
             "wifi": {
                 "country": "TR",
@@ -142,47 +218,726 @@ def load_gateway_config():
         return json.load(f)
 
 
-def save_gateway_config(config):
-    """Save gateway configuration"""
+def write_gateway_config_file(config):
+    """Write gateway.json atomically (temp file + fsync + rename)"""
+    # Config dizinini oluştur (yoksa)
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # Aynı dizinde geçici dosyaya yaz; yarım yazılmış dosya hiçbir zaman görünmez
+    tmp_file = GATEWAY_CONFIG_FILE.with_name(f".{GATEWAY_CONFIG_FILE.name}.{os.getpid()}.tmp")
     try:
-        # Config dizinini oluştur (yoksa)
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        
-        # Dosyayı yaz
-        with open(GATEWAY_CONFIG_FILE, 'w') as f:
+        with open(tmp_file, 'w') as f:
             json.dump(config, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
         
         # Dosya izinlerini ayarla (okuma/yazma herkes için)
         try:
-            os.chmod(GATEWAY_CONFIG_FILE, 0o644)
+            os.chmod(tmp_file, 0o644)
         except Exception:
             pass  # Windows'ta chmod çalışmayabilir
         
+        os.replace(tmp_file, GATEWAY_CONFIG_FILE)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+    
+    # Rename'in kalıcı olması için dizini de senkronize et
+    try:
+        dir_fd = os.open(CONFIG_DIR, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass  # Windows'ta dizin fsync desteklenmez
+
+
+class ConfigConflictError(Exception):
+    """If-Match precondition failed (configuration changed since it was read)"""
+    
+    def __init__(self, etag: str):
+        super().__init__(etag)
+        self.etag = etag
+
+
+class GatewayConfigStore:
+    """In-memory gateway.json with atomic, debounced writes
+    
+    Reads are served from memory and re-read only when the file changes on
+    disk. Updates are applied as functions on the latest configuration, so
+    concurrent section updates never overwrite each other; unflushed updates
+    are replayed on top of the file if another process changed it meanwhile.
+    """
+    
+    def __init__(self, path: Path, flush_delay: float = 0.5):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._config = None
+        self._body = b""
+        self._etag = ""
+        self._signature = None
+        self._pending: List[Callable[[dict], None]] = []
+        self._timer = None
+        self._lock = threading.RLock()
+        self.flushes = 0
+        # Başarısız yazım durumu: bir sonraki deneme aralığı, son hata ve ilk başarısızlık zamanı
+        self._retry_delay = 0.0
+        self.last_error = None
+        self.failing_since = None
+    
+    def _file_signature(self):
+        # Dışarıdan yazanlar (elle düzenleme, başka worker) inode/mtime/boyut değiştirir
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _set(self, config, signature):
+        self._config = config
+        self._body = json.dumps(config, separators=(",", ":")).encode("utf-8")
+        self._etag = '"' + hashlib.blake2b(self._body, digest_size=16).hexdigest() + '"'
+        self._signature = signature
+    
+    def _refresh(self):
+        signature = self._file_signature()
+        if self._config is not None and signature is not None and signature == self._signature:
+            return
+        # İmza okumadan önce alınır: okuma sırasında değişirse sonraki istekte tekrar okunur
+        config = read_gateway_config_file()
+        # Henüz diske yazılmamış güncellemeleri yeni içeriğin üzerine yeniden uygula
+        applied = []
+        for mutate in self._pending:
+            try:
+                mutate(config)
+                applied.append(mutate)
+            except Exception as e:
+                logger.error(f"Bekleyen konfigürasyon güncellemesi dosyadaki yeni içerikle çakıştı, atlandı: {e}")
+        self._pending = applied
+        self._set(config, signature or self._file_signature())
+    
+    def get(self):
+        """Return (config, serialized body, ETag); the config must not be modified"""
+        with self._lock:
+            self._refresh()
+            return self._config, self._body, self._etag
+    
+    def modify(self, mutate: Callable[[dict], None], if_match: Optional[str] = None) -> str:
+        """Apply mutate(config) to the latest configuration and return the new ETag"""
+        with self._lock:
+            self._refresh()
+            if if_match and not etag_matches(if_match, self._etag):
+                raise ConfigConflictError(self._etag)
+            if not os.access(self.path.parent, os.W_OK):
+                raise PermissionError(f"Dizin yazılabilir değil: {self.path.parent}")
+            
+            config = copy.deepcopy(self._config)
+            mutate(config)
+            self._pending.append(mutate)
+            self._set(config, self._signature)
+            
+            if self.flush_delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return self._etag
+    
+    def flush(self):
+        """Write pending updates to disk in a single atomic write"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            
+            lock_file = None
+            try:
+                if fcntl:
+                    lock_file = open(GATEWAY_CONFIG_LOCK_FILE, 'a')
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                # Kilit altında: başka bir worker yazdıysa güncellemeler onun üzerine uygulanır
+                self._refresh()
+                write_gateway_config_file(self._config)
+                self._pending = []
+                self._signature = self._file_signature()
+                self.flushes += 1
+                if self.last_error is not None:
+                    logger.info("Bekleyen konfigürasyon güncellemeleri diske yazıldı")
+                self._retry_delay = 0.0
+                self.last_error = self.failing_since = None
+            except Exception as e:
+                # İstemci 200 ve yeni ETag'i aldı: güncellemeler diske yazılana kadar tekrar denenir
+                self._retry_delay = min(max(self._retry_delay * 2, CONFIG_FLUSH_RETRY_MIN), CONFIG_FLUSH_RETRY_MAX)
+                self.last_error = str(e)
+                if self.failing_since is None:
+                    self.failing_since = datetime.now().isoformat()
+                self._timer = threading.Timer(self._retry_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                logger.error(
+                    f"Konfigürasyon diske yazılamadı, {self._retry_delay:g} sn sonra tekrar denenecek: {e}"
+                )
+            finally:
+                if lock_file:
+                    lock_file.close()
+    
+    def status(self) -> dict:
+        """Unflushed update count and the last write error (for /api/health)"""
+        with self._lock:
+            return {
+                "pending_updates": len(self._pending),
+                "write_error": self.last_error,
+                "failing_since": self.failing_since
+            }
+
+
+config_store = GatewayConfigStore(GATEWAY_CONFIG_FILE, flush_delay=CONFIG_FLUSH_DELAY)
+
+
+def load_gateway_config():
+    """Load gateway configuration (a private copy the caller may modify)"""
+    config, _body, _etag = config_store.get()
+    return copy.deepcopy(config)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match / If-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def json_merge_patch(target, patch):
+    """Apply an RFC 7386 JSON merge patch"""
+    if not isinstance(patch, dict):
+        return patch
+    if not isinstance(target, dict):
+        target = {}
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = json_merge_patch(target.get(key), value)
+    return target
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in (("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)):
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress_body(body: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compress a response body with gzip or brotli"""
+    if encoding == "br":
+        return brotli.compress(body, quality=min(11, level + 5))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class JSONCompressionMiddleware:
+    """Compress large JSON API responses for clients that accept gzip/brotli"""
+    
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start = None
+        passthrough = False
+        
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                # Zaten sıkıştırılmış (statik) ve JSON olmayan (SSE vb.) yanıtlar olduğu gibi gider
+                if "content-encoding" in headers or not headers.get("content-type", "").startswith("application/json"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            start_message, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body") or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            body = compress_body(body, encoding)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_wrapper)
+
+
+app.add_middleware(JSONCompressionMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+
+
+API_REQUEST_SECONDS = metrics.Histogram(
+    'gateway_api_request_duration_seconds', 'API request latency by route',
+    ['method', 'route'], buckets=API_LATENCY_BUCKETS
+)
+API_REQUESTS = metrics.Counter('gateway_api_requests_total', 'API requests by route and status',
+                               ['method', 'route', 'status'])
+
+
+class MetricsMiddleware:
+    """Record request latency and status per route template for /api/metrics"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status = 500
+        streaming = False
+        
+        async def send_wrapper(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # SSE bağlantılarının açık kalma süresi istek gecikmesi değildir
+                streaming = Headers(raw=message["headers"]).get("content-type", "").startswith("text/event-stream")
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Etiket gerçek yol değil route şablonu: /api/ble/scan/jobs/{job_id} tek seri olur
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            API_REQUESTS.labels(scope["method"], path, status).inc()
+            if not streaming:
+                API_REQUEST_SECONDS.labels(scope["method"], path).observe(time.perf_counter() - started)
+
+
+# En dışta: sıkıştırma dahil toplam süre ölçülür
+app.add_middleware(MetricsMiddleware)
+
+
+class StaticAsset:
+    """A UI file held in memory with a content-hash ETag and precompressed variants"""
+    
+    def __init__(self, path: Path, content: bytes, signature):
+        self.path = path
+        self.signature = signature
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+        self.media_type = media_type
+        self.version = hashlib.sha256(content).hexdigest()[:16]
+        self.variants = {None: content}
+        if len(content) >= COMPRESS_MIN_SIZE:
+            encodings = ("gzip", "br") if BROTLI_AVAILABLE else ("gzip",)
+            for encoding in encodings:
+                compressed = compress_body(content, encoding, level=9)
+                if len(compressed) < len(content):
+                    self.variants[encoding] = compressed
+    
+    def etag(self, encoding: Optional[str]) -> str:
+        # Her kodlamanın kendi ETag'i olur (aynı içerik, farklı byte'lar)
+        return f'"{self.version}-{encoding}"' if encoding else f'"{self.version}"'
+    
+    def response(self, request: Request, cache_control: str) -> Response:
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        if encoding not in self.variants:
+            encoding = None
+        headers = {"ETag": self.etag(encoding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        if any(etag_matches(if_none_match, self.etag(known)) for known in self.variants):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type=self.media_type, headers=headers)
+
+
+class StaticAssetCache:
+    """Serve UI files from memory; a file is reloaded only when it changes on disk"""
+    
+    STATIC_REF_RE = re.compile(r'(["\'])/static/([^"\'?#]+)\1')
+    
+    def __init__(self, directory: Path):
+        self.directory = directory.resolve()
+        self._assets = {}
+        # index.html içinde referans verilen statik dosyalar
+        self._index_refs = []
+        # index.html üretilirken referans verilen dosyalar da yüklenir (aynı thread)
+        self._lock = threading.RLock()
+    
+    def _resolve(self, name: str) -> Optional[Path]:
+        path = (self.directory / name).resolve()
+        if self.directory not in path.parents or path.name.startswith("."):
+            return None
+        return path
+    
+    def _build_index(self, content: bytes) -> bytes:
+        """Point /static references at versioned URLs so they can be cached as immutable"""
+        text = content.decode("utf-8")
+        self._index_refs = [match.group(2) for match in self.STATIC_REF_RE.finditer(text)]
+        
+        def versioned(match):
+            asset = self.get(match.group(2))
+            if asset is None:
+                return match.group(0)
+            quote = match.group(1)
+            return f"{quote}/static/{match.group(2)}?v={asset.version}{quote}"
+        return self.STATIC_REF_RE.sub(versioned, text).encode("utf-8")
+    
+    def get(self, name: str) -> Optional[StaticAsset]:
+        asset = self._assets.get(name)
+        path = asset.path if asset is not None else self._resolve(name)
+        if path is None:
+            return None
+        signature = self._signature(name, path)
+        if signature is None:
+            return None
+        
+        if asset is not None and asset.signature == signature:
+            return asset
+        with self._lock:
+            content = path.read_bytes()
+            if name == "index.html":
+                content = self._build_index(content)
+                signature = self._signature(name, path)
+            asset = StaticAsset(path, content, signature)
+            self._assets[name] = asset
+            return asset
+    
+    def _signature(self, name: str, path: Path):
+        try:
+            stat = path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not S_ISREG(stat.st_mode):
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if name == "index.html":
+            # Sayfa, referans verdiği dosyaların sürümü değişince de yeniden üretilir
+            signature += tuple(getattr(self.get(ref), "version", None) for ref in self._index_refs)
+        return signature
+    
+    def preload(self):
+        """Load and precompress every UI file"""
+        for path in sorted(self.directory.iterdir()):
+            if path.is_file() and not path.name.startswith("."):
+                self.get(path.name)
+        logger.info(f"{len(self._assets)} statik dosya belleğe alındı (brotli: {BROTLI_AVAILABLE})")
+
+
+static_assets = StaticAssetCache(UI_DIR)
+live_hub = LiveTelemetryHub(LIVE_TELEMETRY_DIR, max_keys=LIVE_TELEMETRY_MAX_KEYS)
+
+
+def update_gateway_config(mutate: Callable[[dict], None], request: Request = None,
+                          response: Response = None) -> str:
+    """Apply mutate(config) atomically, honouring If-Match; returns the new ETag"""
+    if_match = request.headers.get("if-match") if request else None
+    try:
+        etag = config_store.modify(mutate, if_match=if_match)
+        
+    except HTTPException:
+        raise
+    except ConfigConflictError as e:
+        raise HTTPException(
+            status_code=412,
+            detail="Configuration was changed by another request, reload and retry",
+            headers={"ETag": e.etag}
+        )
     except PermissionError as e:
         error_msg = f"Dosya yazma izni yok: {GATEWAY_CONFIG_FILE}"
-        print(f"Permission error: {error_msg}")
-        print(f"Lütfen şu komutu çalıştırın: sudo chmod 666 {GATEWAY_CONFIG_FILE}")
-        print(f"Veya: sudo chown $USER:$USER {GATEWAY_CONFIG_FILE}")
+        print(f"Permission error: {error_msg} ({e})")
+        print(f"Lütfen şu komutu çalıştırın: sudo chown -R $USER:$USER {CONFIG_DIR}")
         raise HTTPException(status_code=500, detail=error_msg)
     except Exception as e:
         error_msg = f"Konfigürasyon kaydedilemedi: {str(e)}"
         print(f"Save config error: {error_msg}")
         raise HTTPException(status_code=500, detail=error_msg)
+    
+    if response is not None:
+        response.headers["ETag"] = etag
+    return etag
+
+
+class MemorySessionStore:
+    """In-process session store with TTL expiry and an LRU cap"""
+    
+    def __init__(self, ttl: int = 86400, max_count: int = 1000):
+        self.ttl = ttl
+        self.max_count = max(1, max_count)
+        # session_id -> (username, expires); sıra = son kullanım (LRU)
+        self._sessions = OrderedDict()
+        # (expires, session_id) min-heap'i; silinmiş oturumlar süpürmede atlanır
+        self._expiry = []
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._sessions)
+    
+    def create(self, username: str) -> str:
+        session_id = secrets.token_urlsafe(32)
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._sessions[session_id] = (username, expires)
+            heapq.heappush(self._expiry, (expires, session_id))
+            while len(self._sessions) > self.max_count:
+                self._sessions.popitem(last=False)
+        return session_id
+    
+    def get(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.time() >= session[1]:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session[0]
+    
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+    
+    def sweep(self) -> int:
+        """Remove expired sessions; returns the number removed"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires, session_id = heapq.heappop(self._expiry)
+                session = self._sessions.get(session_id)
+                if session is not None and session[1] == expires:
+                    del self._sessions[session_id]
+                    removed += 1
+            # LRU ile atılan oturumlar heap'te birikmesin
+            if len(self._expiry) > 2 * self.max_count:
+                self._expiry = [(session[1], session_id) for session_id, session in self._sessions.items()]
+                heapq.heapify(self._expiry)
+        return removed
+    
+    def close(self):
+        pass
+
+
+class SQLiteSessionStore:
+    """Session store in a SQLite (WAL) file shared by all uvicorn workers
+
+    get() runs on the event loop: lookups are cached in-process for CACHE_TTL
+    and never write; last-used updates and expired-row deletes are applied by
+    sweep() on the sweeper thread.
+    """
+    
+    # Son kullanım zamanı bu aralıktan sık yazılmaz (her istekte disk yazımı olmasın)
+    TOUCH_INTERVAL = 60
+    # Okunan oturum bu süre boyunca süreçte tutulur; başka worker'da yapılan çıkış en geç bu kadar sonra görülür
+    CACHE_TTL = 5
+    
+    def __init__(self, path: Path, ttl: int = 86400, max_count: int = 1000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_count = max(1, max_count)
+        self._local = threading.local()
+        # özet -> (username, expires, last_used, cache_until); sıra = son kullanım
+        self._cache = OrderedDict()
+        # özet -> son kullanım; sweep() ile diske yazılır
+        self._touches = {}
+        self._lock = threading.Lock()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, username TEXT NOT NULL, "
+            "expires REAL NOT NULL, last_used REAL NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions(expires)")
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions(last_used)")
+        try:
+            os.chmod(self.path, 0o600)
+        except OSError:
+            pass
+    
+    def _conn(self) -> sqlite3.Connection:
+        # Thread başına bir bağlantı (istekler threadpool'da da çalışabilir)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _key(session_id: str) -> str:
+        # Diskte çerez değeri değil özeti tutulur
+        return hashlib.sha256(session_id.encode()).hexdigest()
+    
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    
+    def create(self, username: str) -> str:
+        session_id = secrets.token_urlsafe(32)
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, username, expires, last_used) VALUES (?, ?, ?, ?)",
+                (self._key(session_id), username, now + self.ttl, now)
+            )
+            conn.execute(
+                "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY last_used "
+                "LIMIT max(0, (SELECT COUNT(*) FROM sessions) - ?))",
+                (self.max_count,)
+            )
+        return session_id
+    
+    def get(self, session_id: str) -> Optional[str]:
+        key = self._key(session_id)
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and now < cached[3]:
+                self._cache.move_to_end(key)
+                return self._use(key, cached, now)
+        row = self._conn().execute(
+            "SELECT username, expires, last_used FROM sessions WHERE id = ?", (key,)
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self._cache.pop(key, None)
+                return None
+            cached = (*row, now + self.CACHE_TTL)
+            self._cache[key] = cached
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_count:
+                self._cache.popitem(last=False)
+            return self._use(key, cached, now)
+    
+    def _use(self, key: str, cached: tuple, now: float) -> Optional[str]:
+        # Kilit altında çağrılır; süresi dolan kayıt sweep() ile silinir
+        username, expires, last_used, cache_until = cached
+        if now >= expires:
+            del self._cache[key]
+            return None
+        if now - last_used > self.TOUCH_INTERVAL:
+            self._touches[key] = now
+            self._cache[key] = (username, expires, now, cache_until)
+        return username
+    
+    def delete(self, session_id: str):
+        key = self._key(session_id)
+        with self._lock:
+            self._cache.pop(key, None)
+            self._touches.pop(key, None)
+        self._conn().execute("DELETE FROM sessions WHERE id = ?", (key,))
+    
+    def flush_touches(self):
+        """Write pending last-used updates"""
+        with self._lock:
+            touches, self._touches = self._touches, {}
+        if touches:
+            conn = self._conn()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "UPDATE sessions SET last_used = ? WHERE id = ?",
+                    [(last_used, key) for key, last_used in touches.items()]
+                )
+    
+    def sweep(self) -> int:
+        """Write last-used updates and remove expired sessions; returns the number removed"""
+        self.flush_touches()
+        return self._conn().execute("DELETE FROM sessions WHERE expires <= ?", (time.time(),)).rowcount
+    
+    def close(self):
+        try:
+            self.flush_touches()
+        except sqlite3.Error as e:
+            logger.error(f"Oturum kullanım zamanları yazılamadı: {e}")
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_session_store():
+    """Create the session store selected by SESSION_BACKEND"""
+    if SESSION_BACKEND == "sqlite":
+        try:
+            store = SQLiteSessionStore(SESSION_DB_FILE, ttl=SESSION_TTL, max_count=SESSION_MAX_COUNT)
+            logger.info(f"Oturumlar SQLite'ta paylaşılıyor: {SESSION_DB_FILE}")
+            return store
+        except sqlite3.Error as e:
+            logger.error(f"SQLite oturum deposu açılamadı, bellek kullanılıyor: {e}")
+    elif SESSION_BACKEND != "memory":
+        logger.warning(f"Bilinmeyen oturum deposu '{SESSION_BACKEND}', bellek kullanılıyor")
+    return MemorySessionStore(ttl=SESSION_TTL, max_count=SESSION_MAX_COUNT)
+
+
+sessions = create_session_store()
+_session_sweeper_stop = threading.Event()
+
+
+def start_session_sweeper():
+    """Periodically remove expired sessions, even if they are never looked up again"""
+    _session_sweeper_stop.clear()
+    
+    def sweep_loop():
+        while not _session_sweeper_stop.wait(SESSION_SWEEP_INTERVAL):
+            try:
+                removed = sessions.sweep()
+                if removed:
+                    logger.info(f"Süresi dolan {removed} oturum silindi")
+            except Exception as e:
+                logger.error(f"Oturum süpürme hatası: {e}")
+    
+    threading.Thread(target=sweep_loop, name="session-sweeper", daemon=True).start()
 
 
 def get_session_user(request: Request):
     """Get user from session cookie"""
     session_id = request.cookies.get("session_id")
-    if not session_id or session_id not in sessions:
+    if not session_id:
         return None
-    
-    session = sessions[session_id]
-    # Check if session expired (24 hours)
-    if datetime.now() > session["expires"]:
-        del sessions[session_id]
-        return None
-    
-    return session["username"]
+    return sessions.get(session_id)
 
 
 def scan_wifi_networks():
@@ -348,6 +1103,74 @@ def scan_wifi_networks():
         return []
 
 
+class WiFiScanCache:
+    """Single-flight WiFi scanning in a worker thread with an in-memory TTL cache"""
+    
+    def __init__(self, ttl: float = 30, refresh_interval: float = 0):
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.networks = None
+        self.scanned_at = None
+        self._future = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher = None
+    
+    def _scan(self) -> Future:
+        """Start a scan, or return the one already running"""
+        with self._lock:
+            if self._future is None or self._future.done():
+                self._future = Future()
+                # Bekleyenlerden biri vazgeçerse tarama iptal edilmez
+                self._future.set_running_or_notify_cancel()
+                threading.Thread(target=self._run, args=(self._future,), name="wifi-scan", daemon=True).start()
+            return self._future
+    
+    def _run(self, future: Future):
+        try:
+            networks = scan_wifi_networks()
+            with self._lock:
+                self.networks = networks
+                self.scanned_at = time.time()
+            future.set_result(networks)
+        except Exception as e:
+            future.set_exception(e)
+    
+    def fresh(self) -> bool:
+        return self.scanned_at is not None and time.time() - self.scanned_at < self.ttl
+    
+    async def get(self, refresh: bool = False):
+        """Return (networks, cached) without blocking the event loop"""
+        if not refresh and self.fresh():
+            return self.networks, True
+        networks = await asyncio.wrap_future(self._scan())
+        return networks, False
+    
+    def start_refresher(self):
+        """Keep the cached list warm by rescanning periodically (if enabled)"""
+        if self.refresh_interval <= 0 or (self._refresher and self._refresher.is_alive()):
+            return
+        self._stop.clear()
+        
+        def refresh_loop():
+            while not self._stop.is_set():
+                try:
+                    self._scan().result()
+                except Exception as e:
+                    logger.error(f"WiFi arka plan taraması başarısız: {e}")
+                self._stop.wait(self.refresh_interval)
+        
+        self._refresher = threading.Thread(target=refresh_loop, name="wifi-refresh", daemon=True)
+        self._refresher.start()
+        logger.info(f"WiFi ağ listesi her {self.refresh_interval:g} sn'de arka planda yenileniyor")
+    
+    def stop_refresher(self):
+        self._stop.set()
+
+
+wifi_scan_cache = WiFiScanCache(ttl=WIFI_SCAN_CACHE_TTL, refresh_interval=WIFI_SCAN_REFRESH_INTERVAL)
+
+
 # ============================================================================
 # PYDANTIC MODELS
 # ============================================================================
@@ -359,6 +1182,7 @@ class LoginRequest(BaseModel):
 
 class RS485Config(BaseModel):
     enabled: bool
+    port: Optional[str] = "/dev/ttyUSB0"
     baudrate: int
     parity: str
     data_bits: Optional[int] = 8
@@ -378,6 +1202,11 @@ class ModbusConfig(BaseModel):
     byte_order: str
     retry_count: int
     error_handling: str
+    # Optional uplink; same server/port/token as BLE shares one connection under the supervisor
+    mqtt_server: Optional[str] = ""
+    mqtt_port: Optional[int] = 1883
+    mqtt_topic: Optional[str] = "gateway/modbus/data"
+    mqtt_access_token: Optional[str] = ""
 
 
 class BLEConfig(BaseModel):
@@ -392,6 +1221,10 @@ class BLEConfig(BaseModel):
     read_interval: Optional[int] = 1000
     write_interval: Optional[int] = 1000
     connection_control: Optional[bool] = False
+    backend: Optional[str] = "auto"  # auto (bleak, yoksa bluepy), bleak or bluepy
+    max_concurrent_gatt_ops: Optional[int] = 4
+    max_connections: Optional[int] = 5
+    schedule_stats_interval: Optional[int] = 60
     forwarder_type: Optional[str] = "mqtt"  # mqtt or https
     mqtt_server: Optional[str] = ""
     mqtt_port: Optional[int] = 1883
@@ -401,6 +1234,18 @@ class BLEConfig(BaseModel):
     https_port: Optional[int] = 443
     https_endpoint: Optional[str] = ""
     https_access_token: Optional[str] = ""
+    https_max_in_flight: Optional[int] = 4
+    https_timeout: Optional[int] = 10
+    https_gzip: Optional[bool] = False
+    https_gzip_min_size: Optional[int] = 1024
+    forward_queue_size: Optional[int] = 1000
+    forward_queue_policy: Optional[str] = "drop_oldest"  # block, drop_oldest or drop_newest
+    forward_workers: Optional[int] = 1
+    batch_publish: Optional[bool] = False  # opt-in: payload format changes to {"<MAC>": [{ts, ...}]}
+    max_payload_size_bytes: Optional[int] = None
+    min_pack_size_to_send: Optional[int] = None
+    min_pack_send_delay_ms: Optional[int] = None
+    storage: Optional[dict] = None
     devices: Optional[List[str]] = []
 
 
@@ -412,6 +1257,8 @@ class LoRaWANConfig(BaseModel):
     mqtt_port: Optional[int] = 1883
     udp_server: Optional[str] = ""
     udp_port: Optional[int] = 1700
+    # Yerel packet forwarder'ın (serv_port_up/down) gönderdiği aktarıcı portu
+    local_port: Optional[int] = 1680
 
 
 class WiFiConfig(BaseModel):
@@ -439,14 +1286,28 @@ class BLEProfilesRequest(BaseModel):
 # ============================================================================
 
 @app.get("/", response_class=HTMLResponse)
-async def root():
+async def root(request: Request):
     """Serve main HTML page"""
-    index_file = UI_DIR / "index.html"
-    if not index_file.exists():
+    asset = static_assets.get("index.html")
+    if asset is None:
         return HTMLResponse("<h1>UI not found</h1><p>Please create ui/index.html</p>", status_code=404)
     
-    with open(index_file, 'r', encoding='utf-8') as f:
-        return HTMLResponse(content=f.read())
+    # Sayfa her seferinde doğrulanır; içindeki sürümlü CSS/JS ise önbellekten gelir
+    return asset.response(request, "no-cache")
+
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+async def static_file(path: str, request: Request):
+    """Serve UI assets (CSS, JS) from memory, precompressed"""
+    asset = static_assets.get(path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    if request.query_params.get("v") == asset.version:
+        cache_control = f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        cache_control = "no-cache"
+    return asset.response(request, cache_control)
 
 
 @app.post("/api/login")
@@ -462,18 +1323,14 @@ async def login(credentials: LoginRequest, response: Response):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Create session
-    session_id = secrets.token_urlsafe(32)
-    sessions[session_id] = {
-        "username": credentials.username,
-        "expires": datetime.now() + timedelta(hours=24)
-    }
+    session_id = sessions.create(credentials.username)
     
     # Set cookie
     response.set_cookie(
         key="session_id",
         value=session_id,
         httponly=True,
-        max_age=86400  # 24 hours
+        max_age=SESSION_TTL
     )
     
     return {"status": "success", "username": credentials.username}
@@ -483,8 +1340,8 @@ async def login(credentials: LoginRequest, response: Response):
 async def logout(request: Request, response: Response):
     """Logout endpoint"""
     session_id = request.cookies.get("session_id")
-    if session_id in sessions:
-        del sessions[session_id]
+    if session_id:
+        sessions.delete(session_id)
     
     response.delete_cookie("session_id")
     return {"status": "success"}
@@ -497,66 +1354,149 @@ async def get_config(request: Request):
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    config = load_gateway_config()
-    return config
+    _config, body, etag = config_store.get()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    # Değişmemişse gövde gönderilmez (yoklama yapan UI/scriptler için)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.post("/api/config/rs485")
-async def update_rs485(config: RS485Config, request: Request):
+async def update_rs485(config: RS485Config, request: Request, response: Response):
     """Update RS485 configuration"""
     user = get_session_user(request)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    gateway_config = load_gateway_config()
-    gateway_config["rs485"] = config.dict()
-    save_gateway_config(gateway_config)
+    def mutate(gateway_config):
+        gateway_config["rs485"] = config.dict()
+    update_gateway_config(mutate, request, response)
     
     return {"status": "success", "config": config.dict()}
 
 
+def validate_modbus_config(modbus: dict):
+    """Reject register maps the RS-485 service cannot parse"""
+    try:
+        parse_register_map(
+            modbus.get("register_map") or "{}",
+            data_type=modbus.get("data_type", "uint16"),
+            byte_order=modbus.get("byte_order", "big_endian"),
+            function_codes=modbus.get("function_codes")
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"Geçersiz register haritası: {e}")
+
+
 @app.post("/api/config/modbus")
-async def update_modbus(config: ModbusConfig, request: Request):
+async def update_modbus(config: ModbusConfig, request: Request, response: Response):
     """Update Modbus configuration"""
     user = get_session_user(request)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    gateway_config = load_gateway_config()
-    gateway_config["modbus"] = config.dict()
-    save_gateway_config(gateway_config)
+    validate_modbus_config(config.dict())
+    
+    def mutate(gateway_config):
+        gateway_config["modbus"] = config.dict()
+    update_gateway_config(mutate, request, response)
     
     return {"status": "success", "config": config.dict()}
 
 
-def scan_ble_devices():
+# bluetoothctl çıktısı: "[NEW] Device AA:BB:.. Name", "[CHG] Device AA:BB:.. RSSI: -60" (renk kodları ile)
+ANSI_ESCAPE_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]|\x01|\x02')
+BLUETOOTHCTL_DEVICE_RE = re.compile(r'Device\s+((?:[0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2})(?:\s+(.*))?$')
+
+
+def _stream_process_lines(command: List[str], duration: float, on_line: Callable[[str], None]):
+    """Run a command for `duration` seconds, passing each output line as it arrives"""
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        bufsize=1,
+        start_new_session=True
+    )
+    
+    def terminate():
+        # Tüm süreç grubu sonlandırılır (ör. sudo altındaki hcitool), böylece pipe kapanır
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except (ProcessLookupError, AttributeError):
+            process.terminate()
+    
+    # Süre dolunca süreci sonlandır; satır okuma döngüsü EOF ile biter
+    timer = threading.Timer(duration, terminate)
+    timer.start()
+    try:
+        for line in process.stdout:
+            on_line(ANSI_ESCAPE_RE.sub('', line).strip())
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            terminate()
+        process.wait(timeout=2)
+
+
+def scan_ble_devices(on_device: Callable[[dict], None] = None, duration: float = BLE_SCAN_DURATION):
     """
     Scan for BLE devices using bluetoothctl or hcitool
     Raspberry Pi için gerçek BLE tarama implementasyonu
+    
+    Blocking; each device is also passed to on_device as soon as it is reported.
     """
-    devices = []
+    devices = {}
+    
+    def add_device(mac, name=None, rssi=None):
+        mac = mac.upper()
+        device = devices.get(mac)
+        if device is None:
+            device = devices[mac] = {
+                'mac': mac,
+                'name': name or mac,
+                'service_uuid': '',  # bluetoothctl ile UUID almak için ek komut gerekir
+                'characteristic_uuid': ''
+            }
+        elif not (name and name != device['name']) and rssi is None:
+            return
+        elif name:
+            device['name'] = name
+        if rssi is not None:
+            device['rssi'] = rssi
+        if on_device:
+            on_device(dict(device))
+    
+    def parse_bluetoothctl(line):
+        match = BLUETOOTHCTL_DEVICE_RE.search(line)
+        if not match:
+            return
+        mac, rest = match.group(1), (match.group(2) or '').strip()
+        if '[CHG]' in line:
+            if rest.startswith(('Name:', 'Alias:')):
+                add_device(mac, name=rest.split(':', 1)[1].strip())
+            elif rest.startswith('RSSI:'):
+                value = re.search(r'-?\d+\)?$', rest)
+                if value:
+                    add_device(mac, rssi=int(value.group(0).rstrip(')')))
+        elif '[DEL]' not in line:
+            # [NEW] satırı veya "bluetoothctl devices" çıktısı; isim yoksa MAC tekrar eder
+            name = rest if rest and rest.replace('-', ':').upper() != mac.upper() else None
+            add_device(mac, name=name)
     
     try:
         # Önce bluetoothctl ile dene
         try:
-            # bluetoothctl scan on (background'da çalışır)
-            scan_process = subprocess.Popen(
-                ['bluetoothctl', 'scan', 'on'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # Biraz bekle (cihazların bulunması için)
-            time.sleep(8)
+            # Cihazlar bulundukça bildirilir
+            _stream_process_lines(['bluetoothctl', 'scan', 'on'], duration, parse_bluetoothctl)
             
             # Taramayı durdur
             subprocess.run(['bluetoothctl', 'scan', 'off'], 
                          capture_output=True, timeout=3, check=False)
-            scan_process.terminate()
-            scan_process.wait(timeout=2)
             
-            # Cihazları listele
+            # Tarama sırasında bildirilmeyen (önbellekteki) cihazları da ekle
             result = subprocess.run(
                 ['bluetoothctl', 'devices'],
                 capture_output=True,
@@ -564,27 +1504,12 @@ def scan_ble_devices():
                 timeout=5,
                 check=False
             )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                seen_macs = set()
-                for line in result.stdout.strip().split('\n'):
-                    if 'Device' in line:
-                        parts = line.split(' ', 1)
-                        if len(parts) >= 2:
-                            mac = parts[1].split()[0]
-                            name = ' '.join(parts[1].split()[1:]) if len(parts[1].split()) > 1 else mac
-                            
-                            if mac and mac not in seen_macs and ':' in mac:
-                                seen_macs.add(mac)
-                                devices.append({
-                                    'mac': mac,
-                                    'name': name,
-                                    'service_uuid': '',  # bluetoothctl ile UUID almak için ek komut gerekir
-                                    'characteristic_uuid': ''
-                                })
+            if result.returncode == 0:
+                for line in result.stdout.splitlines():
+                    parse_bluetoothctl(ANSI_ESCAPE_RE.sub('', line).strip())
             
             if devices:
-                return devices
+                return list(devices.values())
                 
         except FileNotFoundError:
             print("bluetoothctl bulunamadı")
@@ -595,34 +1520,18 @@ def scan_ble_devices():
         
         # Eğer bluetoothctl başarısız olduysa, hcitool ile dene
         try:
-            result = subprocess.run(
-                ['sudo', 'hcitool', 'lescan', '--duplicates'],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                check=False
-            )
+            def parse_hcitool(line):
+                if line and not line.startswith('LE Scan'):
+                    parts = line.split()
+                    mac = parts[0]
+                    if ':' in mac and len(mac) == 17:
+                        name = ' '.join(parts[1:]) if len(parts) > 1 else None
+                        add_device(mac, name=None if name == '(unknown)' else name)
             
-            if result.stdout and result.stdout.strip():
-                seen_macs = set()
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip() and not line.startswith('LE Scan'):
-                        parts = line.split()
-                        if len(parts) >= 1:
-                            mac = parts[0]
-                            name = ' '.join(parts[1:]) if len(parts) > 1 else mac
-                            
-                            if mac and mac not in seen_macs and ':' in mac and len(mac) == 17:
-                                seen_macs.add(mac)
-                                devices.append({
-                                    'mac': mac,
-                                    'name': name,
-                                    'service_uuid': '',
-                                    'characteristic_uuid': ''
-                                })
+            _stream_process_lines(['sudo', 'hcitool', 'lescan', '--duplicates'], duration, parse_hcitool)
             
             if devices:
-                return devices
+                return list(devices.values())
                 
         except FileNotFoundError:
             print("hcitool bulunamadı. BLE tarama için bluetoothctl veya hcitool gerekli.")
@@ -635,21 +1544,146 @@ def scan_ble_devices():
         import platform
         if platform.system() == 'Windows':
             print("Windows ortamında - mock BLE cihazları döndürülüyor")
-            return [
-                {
-                    'mac': 'AA:BB:CC:DD:EE:FF',
-                    'name': 'Mock BLE Device',
-                    'service_uuid': '',
-                    'characteristic_uuid': ''
-                }
-            ]
+            add_device('AA:BB:CC:DD:EE:FF', name='Mock BLE Device')
         
     except Exception as e:
         print(f"BLE tarama genel hatası: {e}")
         import traceback
         traceback.print_exc()
     
-    return devices
+    return list(devices.values())
+
+
+class BLEScanJob:
+    """A background BLE scan whose devices can be followed while it runs"""
+    
+    def __init__(self):
+        self.id = secrets.token_hex(8)
+        self.status = "running"
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.devices: List[dict] = []
+        self._index = {}
+        self._lock = threading.Lock()
+        self._waiters = set()
+    
+    def add_device(self, device: dict):
+        with self._lock:
+            position = self._index.get(device['mac'])
+            if position is None:
+                self._index[device['mac']] = len(self.devices)
+                self.devices.append(device)
+            else:
+                # Güncellemeler (isim, RSSI) listenin sonuna tekrar eklenir ki aboneler görsün
+                self.devices[position] = device
+                self.devices.append(device)
+        self._wake()
+    
+    def finish(self, devices: List[dict] = None, error: str = None):
+        with self._lock:
+            for device in devices or []:
+                if device['mac'] not in self._index:
+                    self._index[device['mac']] = len(self.devices)
+                    self.devices.append(device)
+            self.error = error
+            self.status = "failed" if error else "done"
+            self.finished_at = time.time()
+        self._wake()
+    
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+    
+    def unique_devices(self) -> List[dict]:
+        """Latest state of every device found so far"""
+        with self._lock:
+            return [self.devices[position] for position in self._index.values()]
+    
+    def updates_since(self, offset: int):
+        with self._lock:
+            return self.devices[offset:], len(self.devices)
+    
+    def waiter(self) -> asyncio.Event:
+        """Register an event that is set on the next update (call from the event loop)"""
+        event = asyncio.Event()
+        self._waiters.add((asyncio.get_running_loop(), event))
+        return event
+    
+    def remove_waiter(self, event: asyncio.Event):
+        self._waiters = {(loop, waiter) for loop, waiter in self._waiters if waiter is not event}
+    
+    def _wake(self):
+        for loop, event in list(self._waiters):
+            loop.call_soon_threadsafe(event.set)
+    
+    def snapshot(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            "devices": self.unique_devices()
+        }
+
+
+class BLEScanManager:
+    """Single-flight BLE scanning with a short-lived result cache"""
+    
+    def __init__(self, cache_ttl: float = 30, history: int = 10):
+        self.cache_ttl = cache_ttl
+        self.history = history
+        self.jobs = {}
+        self._current = None
+        self._lock = threading.Lock()
+    
+    def start(self, refresh: bool = False):
+        """Return (job, cached): the running scan, a fresh cached one, or a new scan"""
+        with self._lock:
+            job = self._current
+            if job and not job.finished:
+                return job, False
+            if (job and not refresh and job.status == "done"
+                    and time.time() - job.finished_at < self.cache_ttl):
+                return job, True
+            
+            job = self._current = BLEScanJob()
+            self.jobs[job.id] = job
+            # En eski işleri unut
+            while len(self.jobs) > self.history:
+                self.jobs.pop(next(iter(self.jobs)))
+        
+        threading.Thread(target=self._run, args=(job,), name=f"ble-scan-{job.id}", daemon=True).start()
+        logger.info(f"BLE tarama işi başlatıldı: {job.id}")
+        return job, False
+    
+    def _run(self, job: BLEScanJob):
+        try:
+            devices = scan_ble_devices(on_device=job.add_device)
+            job.finish(devices)
+            logger.info(f"BLE tarama işi tamamlandı: {job.id}, {len(job.unique_devices())} cihaz")
+        except Exception as e:
+            logger.error(f"BLE tarama işi başarısız: {job.id}: {e}", exc_info=True)
+            job.finish(error=str(e))
+    
+    def get(self, job_id: str) -> Optional[BLEScanJob]:
+        return self.jobs.get(job_id)
+
+
+ble_scan_manager = BLEScanManager(cache_ttl=BLE_SCAN_CACHE_TTL)
+
+
+async def wait_for_scan(job: BLEScanJob):
+    """Wait for a scan job to finish without blocking the event loop"""
+    while not job.finished:
+        event = job.waiter()
+        try:
+            if job.finished:
+                break
+            await event.wait()
+        finally:
+            job.remove_waiter(event)
 
 
 def update_tb_gateway_config(enabled: bool, profile_name: str = "ble"):
@@ -824,22 +1858,50 @@ def restart_thingsboard_gateway():
         return False
 
 
+def validate_ble_profiles(profiles: List[dict]):
+    """Reject telemetry valueExpressions the BLE service cannot compile"""
+    for profile in profiles or []:
+        try:
+            compile_profile(profile)
+        except ExpressionError as e:
+            raise HTTPException(status_code=422, detail=f"Geçersiz telemetry ifadesi: {e}")
+
+
+def sync_tb_ble_config(enabled: bool, profiles: List[dict]):
+    """Update ThingsBoard Gateway BLE connector config and restart it"""
+    # ThingsBoard Gateway config'leri güncelle
+    if enabled and profiles:
+        # BLE aktif ve profil varsa
+        update_tb_gateway_config(True, "ble")
+        update_tb_ble_config(profiles)
+    else:
+        # BLE pasifse connector'ı kaldır
+        update_tb_gateway_config(False, "ble")
+        update_tb_ble_config([])
+    
+    # ThingsBoard Gateway servisini yeniden başlat
+    restart_thingsboard_gateway()
+
+
 @app.post("/api/config/ble")
-async def update_ble(config: BLEConfig, request: Request):
+async def update_ble(config: BLEConfig, request: Request, response: Response):
     """Update BLE configuration"""
     user = get_session_user(request)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    gateway_config = load_gateway_config()
-    gateway_config["ble"] = config.dict()
-    save_gateway_config(gateway_config)
+    def mutate(gateway_config):
+        # Profiller ayrı endpoint ile yönetilir, BLE servisi onları okur; koru
+        profiles = gateway_config.get("ble", {}).get("profiles", [])
+        gateway_config["ble"] = config.dict()
+        gateway_config["ble"]["profiles"] = profiles
+    update_gateway_config(mutate, request, response)
     
     return {"status": "success", "config": config.dict()}
 
 
 @app.post("/api/config/ble/profiles")
-async def update_ble_profiles(request_data: BLEProfilesRequest, request: Request):
+async def update_ble_profiles(request_data: BLEProfilesRequest, request: Request, response: Response):
     """Update BLE profiles and ThingsBoard Gateway config"""
     logger.info("=" * 50)
     logger.info("BLE PROFILES UPDATE ENDPOINT ÇAĞRILDI")
@@ -859,29 +1921,19 @@ async def update_ble_profiles(request_data: BLEProfilesRequest, request: Request
         print("401: Kullanıcı kimlik doğrulaması yapılmamış")
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    # Gateway config'i güncelle
-    gateway_config = load_gateway_config()
-    if "ble" not in gateway_config:
-        gateway_config["ble"] = {}
+    validate_ble_profiles(request_data.profiles)
     
-    gateway_config["ble"]["enabled"] = request_data.enabled
-    gateway_config["ble"]["profiles"] = request_data.profiles
+    # Gateway config'i güncelle
+    def mutate(gateway_config):
+        if "ble" not in gateway_config:
+            gateway_config["ble"] = {}
+        gateway_config["ble"]["enabled"] = request_data.enabled
+        gateway_config["ble"]["profiles"] = request_data.profiles
     logger.info(f"Gateway config güncelleniyor: enabled={request_data.enabled}")
     print(f"Gateway config güncelleniyor: enabled={request_data.enabled}")
-    save_gateway_config(gateway_config)
+    update_gateway_config(mutate, request, response)
     
-    # ThingsBoard Gateway config'leri güncelle
-    if request_data.enabled and request_data.profiles:
-        # BLE aktif ve profil varsa
-        update_tb_gateway_config(True, "ble")
-        update_tb_ble_config(request_data.profiles)
-    else:
-        # BLE pasifse connector'ı kaldır
-        update_tb_gateway_config(False, "ble")
-        update_tb_ble_config([])
-    
-    # ThingsBoard Gateway servisini yeniden başlat
-    restart_thingsboard_gateway()
+    sync_tb_ble_config(request_data.enabled, request_data.profiles)
     
     return {"status": "success", "profiles": request_data.profiles}
 
@@ -908,7 +1960,12 @@ async def scan_ble(request: Request):
     try:
         logger.info("BLE cihazları taranıyor...")
         print("BLE cihazları taranıyor...")
-        devices = scan_ble_devices()
+        # Tarama arka planda yürür; eşzamanlı istekler aynı taramayı bekler
+        job, _cached = ble_scan_manager.start(refresh=request.query_params.get("refresh") == "1")
+        await wait_for_scan(job)
+        if job.error:
+            raise RuntimeError(job.error)
+        devices = job.unique_devices()
         logger.info(f"Bulunan cihaz sayısı: {len(devices)}")
         logger.info(f"Cihazlar: {devices}")
         print(f"Bulunan cihaz sayısı: {len(devices)}")
@@ -922,35 +1979,127 @@ async def scan_ble(request: Request):
         raise HTTPException(status_code=500, detail=f"BLE tarama başarısız: {str(e)}")
 
 
+@app.post("/api/ble/scan/jobs")
+async def start_ble_scan_job(request: Request):
+    """Start a BLE scan job (or join the running one / reuse a fresh result)"""
+    user = get_session_user(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    job, cached = ble_scan_manager.start(refresh=request.query_params.get("refresh") == "1")
+    result = job.snapshot()
+    result["cached"] = cached
+    return result
+
+
+@app.get("/api/ble/scan/jobs/{job_id}")
+async def get_ble_scan_job(job_id: str, request: Request):
+    """Get the current state of a BLE scan job"""
+    user = get_session_user(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    job = ble_scan_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return job.snapshot()
+
+
+@app.get("/api/ble/scan/jobs/{job_id}/events")
+async def stream_ble_scan_job(job_id: str, request: Request):
+    """Stream devices of a BLE scan job as Server-Sent Events"""
+    user = get_session_user(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    job = ble_scan_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    
+    async def events():
+        offset = 0
+        while True:
+            # Olay, cihazlar okunmadan önce kaydedilir; arada gelen güncelleme kaçmaz
+            event = job.waiter()
+            try:
+                devices, offset = job.updates_since(offset)
+                for device in devices:
+                    yield f"event: device\ndata: {json.dumps(device)}\n\n"
+                if job.finished:
+                    yield f"event: done\ndata: {json.dumps({'status': job.status, 'error': job.error, 'count': len(job.unique_devices())})}\n\n"
+                    return
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Proxy'ler bağlantıyı kapatmasın
+                    yield ": keepalive\n\n"
+            finally:
+                job.remove_waiter(event)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/telemetry/live")
+async def stream_live_telemetry(request: Request):
+    """Stream the latest reading of each BLE device as Server-Sent Events"""
+    user = get_session_user(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    buffer = live_hub.subscribe()
+    
+    async def events():
+        try:
+            while True:
+                # Tampon cihaz başına sadece en yeni okumayı tutar; yavaş istemci okumaları geciktirmez
+                values = await buffer.get(timeout=15)
+                if values:
+                    yield "".join(f"event: telemetry\ndata: {value}\n\n" for value in values)
+                else:
+                    # Proxy'ler bağlantıyı kapatmasın
+                    yield ": keepalive\n\n"
+        finally:
+            live_hub.unsubscribe(buffer)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/api/config/lorawan")
-async def update_lorawan(config: LoRaWANConfig, request: Request):
+async def update_lorawan(config: LoRaWANConfig, request: Request, response: Response):
     """Update LoRaWAN configuration"""
     user = get_session_user(request)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    gateway_config = load_gateway_config()
-    gateway_config["lorawan"] = config.dict()
-    save_gateway_config(gateway_config)
+    def mutate(gateway_config):
+        gateway_config["lorawan"] = config.dict()
+    update_gateway_config(mutate, request, response)
     
     return {"status": "success", "config": config.dict()}
 
 
 @app.post("/api/config/wifi")
-async def update_wifi(config: WiFiConfig, request: Request):
+async def update_wifi(config: WiFiConfig, request: Request, response: Response):
     """Update WiFi configuration"""
     user = get_session_user(request)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    gateway_config = load_gateway_config()
-    if "wifi" not in gateway_config:
-        gateway_config["wifi"] = {}
-    
-    gateway_config["wifi"]["country"] = config.country
-    gateway_config["wifi"]["ssid"] = config.ssid
-    gateway_config["wifi"]["password"] = config.password
-    save_gateway_config(gateway_config)
+    def mutate(gateway_config):
+        if "wifi" not in gateway_config:
+            gateway_config["wifi"] = {}
+        gateway_config["wifi"]["country"] = config.country
+        gateway_config["wifi"]["ssid"] = config.ssid
+        gateway_config["wifi"]["password"] = config.password
+    update_gateway_config(mutate, request, response)
     
     # In production, this would configure the WiFi connection
     # using system commands like nmcli or wpa_supplicant
@@ -959,19 +2108,72 @@ async def update_wifi(config: WiFiConfig, request: Request):
 
 
 @app.post("/api/config/system")
-async def update_system(config: SystemConfig, request: Request):
+async def update_system(config: SystemConfig, request: Request, response: Response):
     """Update system configuration"""
     user = get_session_user(request)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    gateway_config = load_gateway_config()
-    gateway_config["gateway_name"] = config.gateway_name
-    save_gateway_config(gateway_config)
+    def mutate(gateway_config):
+        gateway_config["gateway_name"] = config.gateway_name
+    update_gateway_config(mutate, request, response)
     
     return {"status": "success", "config": config.dict()}
 
 
+# JSON merge-patch ile güncellenebilen bölümler ve doğrulama modelleri
+PATCHABLE_SECTIONS = {
+    "rs485": RS485Config,
+    "modbus": ModbusConfig,
+    "ble": BLEConfig,
+    "lorawan": LoRaWANConfig,
+    "wifi": WiFiConfig,
+}
+
+
+@app.patch("/api/config/{section}")
+async def patch_config_section(section: str, request: Request, response: Response):
+    """Apply a JSON merge patch (RFC 7386) to one configuration section"""
+    user = get_session_user(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    model = PATCHABLE_SECTIONS.get(section)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Unknown configuration section: {section}")
+    
+    try:
+        patch = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON merge patch")
+    if not isinstance(patch, dict):
+        raise HTTPException(status_code=400, detail="Body must be a JSON object")
+    
+    result = {}
+    
+    def mutate(gateway_config):
+        merged = json_merge_patch(copy.deepcopy(gateway_config.get(section)), patch)
+        # Sonuç bölüm modeline uymalı (ek alanlar, ör. ble.profiles, korunur)
+        try:
+            model(**merged)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=json.loads(e.json()))
+        if section == "ble" and "profiles" in patch:
+            validate_ble_profiles(merged.get("profiles"))
+        if section == "modbus":
+            validate_modbus_config(merged)
+        gateway_config[section] = merged
+        result["config"] = merged
+    
+    update_gateway_config(mutate, request, response)
+    
+    # BLE profilleri veya durumu değiştiyse ThingsBoard Gateway'i senkronize et
+    if section == "ble" and ("profiles" in patch or "enabled" in patch):
+        sync_tb_ble_config(result["config"].get("enabled", False), result["config"].get("profiles", []))
+    
+    return {"status": "success", "config": result["config"]}
+
+
 @app.post("/api/user/change-password")
 async def change_password(request_data: ChangePasswordRequest, request: Request):
     """Change user password"""
@@ -1014,20 +2216,20 @@ async def scan_wifi(request: Request):
     
     logger.info("WiFi ağları taranıyor...")
     print("WiFi ağları taranıyor...")
-    networks = scan_wifi_networks()
+    # Tarama ayrı thread'de yürür; eşzamanlı istekler aynı taramayı bekler, sonuç önbellekten gelir
+    networks, cached = await wifi_scan_cache.get(refresh=request.query_params.get("refresh") == "1")
     logger.info(f"Bulunan ağ sayısı: {len(networks)}")
     logger.info(f"Ağlar: {networks}")
     print(f"Bulunan ağ sayısı: {len(networks)}")
     print(f"Ağlar: {networks}")
     
-    # Save scanned networks to config
-    gateway_config = load_gateway_config()
-    if "wifi" not in gateway_config:
-        gateway_config["wifi"] = {}
-    gateway_config["wifi"]["networks"] = networks
-    save_gateway_config(gateway_config)
-    
-    return {"status": "success", "networks": networks}
+    # Tarama sonuçları gateway.json'a yazılmaz (sadece bellekte tutulur)
+    return {
+        "status": "success",
+        "networks": networks,
+        "cached": cached,
+        "scanned_at": datetime.fromtimestamp(wifi_scan_cache.scanned_at).isoformat()
+    }
 
 
 @app.post("/api/system/restart")
@@ -1044,14 +2246,53 @@ async def restart_gateway(request: Request):
     return {"status": "success", "message": "Gateway restart initiated"}
 
 
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start background sweepers and optional refreshers"""
+    start_session_sweeper()
+    wifi_scan_cache.start_refresher()
+    # Sıkıştırma arka planda: sunucu /api/health'e hemen cevap verir, ilk istek dosyayı kendisi yükler
+    threading.Thread(target=static_assets.preload, name="static-preload", daemon=True).start()
+    live_hub.start()
+
+
+@app.on_event("shutdown")
+async def flush_gateway_config():
+    """Write pending configuration updates before exiting"""
+    wifi_scan_cache.stop_refresher()
+    _session_sweeper_stop.set()
+    live_hub.stop()
+    config_store.flush()
+    sessions.close()
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    config_status = config_store.status()
+    # Diske yazılamayan ayarlar varsa servisler ve diğer worker'lar değişikliği henüz görmüyor
+    status = "degraded" if config_status["write_error"] else "healthy"
+    return {"status": status, "timestamp": datetime.now().isoformat(), "config": config_status}
 
 
-# Mount static files (CSS, JS)
-app.mount("/static", StaticFiles(directory=UI_DIR), name="static")
+def metrics_authorized(request: Request) -> bool:
+    """Loopback client, session user or the configured bearer token"""
+    if request.client and request.client.host in LOOPBACK_HOSTS:
+        return True
+    if API_METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and secrets.compare_digest(token.strip().encode(), API_METRICS_TOKEN.encode()):
+            return True
+    return get_session_user(request) is not None
+
+
+@app.get("/api/metrics")
+async def metrics_endpoint(request: Request):
+    """Prometheus metrics of this worker"""
+    # Route adları, istek sayıları ve hata oranları: kimlik doğrulamasız sadece cihazın kendisinden
+    if not metrics_authorized(request):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
 
 
 if __name__ == "__main__":
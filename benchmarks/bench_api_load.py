@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+API yük testi: eşzamanlı istekler altında gecikme, throughput ve kayıp güncelleme kontrolü
+api/main.py projenin geçici bir kopyasında, ayrı süreçte (uvicorn, --workers)
+çalışır. WiFi / BLE tarama fonksiyonları --scan-seconds boyunca bloklayıp sahte
+sonuç dönen stub'larla değiştirilir (donanım gerekmez) ve her worker'da event
+loop gecikmesi ölçülür: bir istek loop'u bloklarsa diğer istekler ve gecikme
+ölçer bunu görür.
+
+--concurrency kadar istemci thread'i giriş yapar ve --duration boyunca --mix
+ağırlıklarıyla istek gönderir:
+
+  config  : GET /api/config
+  update  : POST /api/config/{rs485,modbus,ble,lorawan,wifi,system}; her yazım
+            bölümüne artan bir sıra numarası koyar
+  health  : GET /api/health
+  scan    : POST /api/wifi/scan?refresh=1 veya /api/ble/scan?refresh=1 (stub)
+
+Aynı bölüme aynı anda tek yazım gönderilir, böylece her bölümün son onaylanan
+yazımı bellidir. Kontroller:
+
+  stale_reads  : onaylanmış bir yazımdan sonra başlayan GET'in daha eski değeri
+                 görmesi (tek worker'da kayıp güncelleme işareti; çok worker'da
+                 diske yazma gecikmesi kadar normaldir)
+  lost_updates : yük bittikten sonra API'de veya kapanıştan sonra diskteki
+                 gateway.json'da son onaylanan yazımı göstermeyen bölümler
+
+Endpoint başına p50/p99 (ms), toplam throughput ve event loop gecikmesi JSON
+yazdırılır; kayıp güncelleme varsa çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/bench_api_load.py --concurrency 16 --duration 20
+    python benchmarks/bench_api_load.py --workers 2 --mix config=4,update=4,health=2,scan=1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from pathlib import Path
+from collections import defaultdict
+
+ROOT = Path(__file__).resolve().parent.parent
+# Event loop gecikme ölçerinin uyanma aralığı (saniye)
+LAG_INTERVAL = 0.01
+
+# Bölüm -> (geçerli gövde üreten fonksiyon, yapılandırmadan sıra numarasını okuyan fonksiyon)
+SECTIONS = {
+    'rs485': (
+        lambda seq: {'enabled': False, 'port': f'/dev/bench{seq}', 'baudrate': 9600, 'parity': 'none'},
+        lambda config: int(config.get('rs485', {}).get('port', '/dev/bench0')[len('/dev/bench'):] or 0)
+    ),
+    'modbus': (
+        lambda seq: {'enabled': False, 'slave_id': 1, 'polling_interval': seq, 'function_codes': '3',
+                     'register_map': '{}', 'data_type': 'uint16', 'byte_order': 'big_endian',
+                     'retry_count': 3, 'error_handling': 'retry'},
+        lambda config: int(config.get('modbus', {}).get('polling_interval', 0))
+    ),
+    'ble': (
+        lambda seq: {'enabled': False, 'mqtt_topic': f'bench/{seq}'},
+        lambda config: int((config.get('ble', {}).get('mqtt_topic') or 'bench/0').split('/')[-1])
+    ),
+    'lorawan': (
+        lambda seq: {'enabled': False, 'gateway_id': f'{seq:016X}', 'forwarder_type': 'udp'},
+        lambda config: int(config.get('lorawan', {}).get('gateway_id') or '0', 16)
+    ),
+    'wifi': (
+        lambda seq: {'country': 'TR', 'ssid': f'bench-{seq}', 'password': 'bench'},
+        lambda config: int(config.get('wifi', {}).get('ssid', 'bench-0').split('-')[-1])
+    ),
+    'system': (
+        lambda seq: {'gateway_name': f'bench-{seq}'},
+        lambda config: int(config.get('gateway_name', 'bench-0').split('-')[-1])
+    )
+}
+
+
+# ---------------------------------------------------------------------------
+# Sunucu tarafı (--serve): uvicorn factory'si
+# ---------------------------------------------------------------------------
+
+def create_app():
+    """api.main uygulaması; tarama stub'ları ve event loop gecikme ölçer ile"""
+    import asyncio
+    import api.main as api
+
+    scan_seconds = float(os.getenv('BENCH_SCAN_SECONDS', '2'))
+    lag_file = Path(os.environ['BENCH_LAG_DIR']) / f'{os.getpid()}.json'
+
+    def scan_wifi_networks():
+        time.sleep(scan_seconds)
+        return [{'ssid': f'bench-net-{index}', 'signal': 90 - index, 'encrypted': True} for index in range(10)]
+
+    def scan_ble_devices(on_device=None, duration=0):
+        devices = []
+        for index in range(10):
+            time.sleep(scan_seconds / 10)
+            device = {'mac': f'FA:CE:00:00:00:{index:02X}', 'name': f'bench-{index}', 'rssi': -50 - index}
+            devices.append(device)
+            if on_device:
+                on_device(device)
+        return devices
+
+    api.scan_wifi_networks = scan_wifi_networks
+    api.scan_ble_devices = scan_ble_devices
+
+    samples = []
+
+    async def measure_lag():
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            samples.append((time.time(), time.perf_counter() - started - LAG_INTERVAL))
+
+    @api.app.on_event("startup")
+    async def start_lag_monitor():
+        api.app.state.lag_monitor = asyncio.ensure_future(measure_lag())
+
+    @api.app.on_event("shutdown")
+    async def save_lag_samples():
+        api.app.state.lag_monitor.cancel()
+        lag_file.write_text(json.dumps(samples))
+
+    return api.app
+
+
+def serve(port: int, workers: int):
+    import uvicorn
+    sys.path.insert(0, os.getcwd())
+    uvicorn.run('bench_api_load:create_app', factory=True, host='127.0.0.1', port=port,
+                workers=workers, log_level='warning')
+
+
+# ---------------------------------------------------------------------------
+# İstemci tarafı
+# ---------------------------------------------------------------------------
+
+class LoadState:
+    """İstemci thread'lerinin paylaştığı sonuçlar ve bölüm başına yazım sırası"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.section_locks = {section: threading.Lock() for section in SECTIONS}
+        self.next_seq = {section: 0 for section in SECTIONS}
+        self.acked = {section: 0 for section in SECTIONS}
+        self.stale_reads = defaultdict(int)
+        self.measuring = False
+
+    def record(self, name: str, elapsed: float, ok: bool):
+        if not self.measuring:
+            return
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            if not ok:
+                self.errors[name] += 1
+
+
+class Client:
+    """Kalıcı bağlantılı, oturum çerezli HTTP istemcisi"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        self.cookie = None
+
+    def request(self, method: str, path: str, body=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        try:
+            self.conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = self.conn.getresponse()
+            return response.status, response.read(), response
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            return 0, b'', None
+
+    def login(self) -> bool:
+        status, _body, response = self.request('POST', '/api/login', {'username': 'admin', 'password': 'admin'})
+        if status == 200:
+            self.cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+        return status == 200
+
+    def close(self):
+        self.conn.close()
+
+
+def markers(config: dict) -> dict:
+    values = {}
+    for section, (_body, read) in SECTIONS.items():
+        try:
+            values[section] = read(config)
+        except (ValueError, TypeError, AttributeError):
+            values[section] = 0
+    return values
+
+
+def run_client(index: int, port: int, mix: list, state: LoadState, deadline: float, seed: int):
+    rng = random.Random(seed + index)
+    operations, weights = zip(*mix)
+    client = Client(port)
+    started = time.perf_counter()
+    ok = client.login()
+    state.record('POST /api/login', time.perf_counter() - started, ok)
+    while time.monotonic() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        if operation == 'update':
+            sections = list(SECTIONS)
+            rng.shuffle(sections)
+            section = next((name for name in sections if state.section_locks[name].acquire(blocking=False)), None)
+            if section is None:
+                operation = 'config'
+            else:
+                try:
+                    with state.lock:
+                        state.next_seq[section] += 1
+                        seq = state.next_seq[section]
+                    started = time.perf_counter()
+                    status, _body, _response = client.request('POST', f'/api/config/{section}',
+                                                              SECTIONS[section][0](seq))
+                    state.record(f'POST /api/config/{section}', time.perf_counter() - started, status == 200)
+                    if status == 200:
+                        with state.lock:
+                            state.acked[section] = seq
+                finally:
+                    state.section_locks[section].release()
+                continue
+        if operation == 'config':
+            with state.lock:
+                acked = dict(state.acked)
+            started = time.perf_counter()
+            status, body, _response = client.request('GET', '/api/config')
+            state.record('GET /api/config', time.perf_counter() - started, status == 200)
+            if status == 200:
+                for section, seq in markers(json.loads(body)).items():
+                    if seq < acked[section]:
+                        with state.lock:
+                            state.stale_reads[section] += 1
+        elif operation == 'health':
+            started = time.perf_counter()
+            status, _body, _response = client.request('GET', '/api/health')
+            state.record('GET /api/health', time.perf_counter() - started, status == 200)
+        elif operation == 'scan':
+            path = rng.choice(['/api/wifi/scan', '/api/ble/scan'])
+            started = time.perf_counter()
+            status, _body, _response = client.request('POST', f'{path}?refresh=1')
+            state.record(f'POST {path}', time.perf_counter() - started, status == 200)
+    client.close()
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    samples = sorted(samples)
+
+    def pick(fraction):
+        return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000, 2)
+    return {'p50_ms': pick(0.5), 'p99_ms': pick(0.99), 'max_ms': round(samples[-1] * 1000, 2)}
+
+
+def parse_mix(text: str) -> list:
+    mix = []
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in ('config', 'update', 'health', 'scan'):
+            raise SystemExit(f"Bilinmeyen işlem: {name}")
+        if float(weight) > 0:
+            mix.append((name.strip(), float(weight)))
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare_workdir() -> Path:
+    workdir = Path(tempfile.mkdtemp(prefix='gateway-api-load-'))
+    for name in ('api', 'ui', 'services'):
+        shutil.copytree(ROOT / name, workdir / name, ignore=shutil.ignore_patterns('__pycache__'))
+    (workdir / 'config').mkdir()
+    (workdir / 'config' / 'users.json').write_text(json.dumps({'admin': {'password': 'admin'}}))
+    (workdir / 'config' / 'gateway.json').write_text(json.dumps({}))
+    (workdir / 'lag').mkdir()
+    return workdir
+
+
+def wait_until_ready(port: int, process, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API süreci başlatılamadı")
+        client = Client(port)
+        status, _body, _response = client.request('GET', '/api/health')
+        client.close()
+        if status == 200:
+            return
+        time.sleep(0.05)
+    raise RuntimeError("API zaman aşımı")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn worker sayısı')
+    parser.add_argument('--mix', default='config=5,update=3,health=2,scan=0')
+    parser.add_argument('--scan-seconds', type=float, default=2, help='stub taramaların süresi')
+    parser.add_argument('--flush-delay', type=float, default=0.5, help='GATEWAY_CONFIG_FLUSH_DELAY')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.workers)
+        return
+
+    mix = parse_mix(args.mix)
+    workdir = prepare_workdir()
+    port = free_port()
+    environment = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(filter(None, [str(Path(__file__).resolve().parent), os.getenv('PYTHONPATH')])),
+        GATEWAY_CONFIG_FLUSH_DELAY=str(args.flush_delay),
+        LIVE_TELEMETRY_DIR=str(workdir / 'data' / 'live'),
+        TB_GATEWAY_CONFIG_DIR=str(workdir / 'tb_gateway'),
+        BENCH_SCAN_SECONDS=str(args.scan_seconds),
+        BENCH_LAG_DIR=str(workdir / 'lag')
+    )
+    server = subprocess.Popen([sys.executable, str(Path(__file__).resolve()), '--serve', '--port', str(port),
+                               '--workers', str(args.workers)], cwd=workdir, env=environment,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    state = LoadState()
+    try:
+        wait_until_ready(port, server)
+        deadline = time.monotonic() + args.warmup + args.duration
+        threads = [threading.Thread(target=run_client, args=(index, port, mix, state, deadline, args.seed))
+                   for index in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.warmup)
+        state.measuring = True
+        window_start = time.time()
+        for thread in threads:
+            thread.join()
+        window_end = time.time()
+
+        # Bekleyen disk yazımları tamamlandıktan sonra her worker'a ulaşacak kadar yeni bağlantıyla kontrol
+        time.sleep(args.flush_delay + 0.5)
+        lost_in_api = set()
+        for _ in range(max(4, args.workers * 4)):
+            client = Client(port)
+            client.login()
+            status, body, _response = client.request('GET', '/api/config')
+            client.close()
+            if status == 200:
+                for section, seq in markers(json.loads(body)).items():
+                    if seq != state.acked[section]:
+                        lost_in_api.add(section)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    on_disk = markers(json.loads((workdir / 'config' / 'gateway.json').read_text()))
+    lost_on_disk = sorted(section for section, seq in on_disk.items() if seq != state.acked[section])
+    lags = []
+    for path in (workdir / 'lag').glob('*.json'):
+        lags.extend(lag for at, lag in json.loads(path.read_text()) if window_start <= at <= window_end)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    elapsed = window_end - window_start
+    total = sum(len(samples) for samples in state.latencies.values())
+    report = {
+        'params': {key: value for key, value in vars(args).items() if key not in ('serve', 'port')},
+        'throughput_rps': round(total / elapsed, 1),
+        'requests': total,
+        'errors': sum(state.errors.values()),
+        'endpoints': {
+            name: {'count': len(samples), 'errors': state.errors.get(name, 0), **percentiles(samples)}
+            for name, samples in sorted(state.latencies.items())
+        },
+        'event_loop_lag': percentiles(lags),
+        'consistency': {
+            'acked_writes': dict(state.acked),
+            'stale_reads': dict(state.stale_reads),
+            'lost_in_api': sorted(lost_in_api),
+            'lost_on_disk': lost_on_disk
+        }
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if lost_in_api or lost_on_disk else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Paketli gönderim karşılaştırması
+Eski "her okuma bir MQTT mesajı" yolu ile TelemetryBatcher'ın ürettiği
+paketleri aynı okuma akışı üzerinde karşılaştırır (mesaj sayısı, payload
+byte'ı, MQTT PUBLISH başlıkları dahil kablo byte'ı ve TCP/IP tahmini).
+
+Kullanım:
+    python benchmarks/bench_batching.py --devices 24 --seconds 60 --period-ms 1000
+"""
+
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.telemetry_batcher import TelemetryBatcher  # noqa: E402
+
+# Segment başına IPv4 + TCP başlığı (seçeneksiz)
+TCP_IP_OVERHEAD = 40
+
+
+def mqtt_publish_size(topic: str, payload_len: int, qos: int = 0) -> int:
+    """MQTT 3.1.1 PUBLISH paketinin kablo boyutu"""
+    remaining = 2 + len(topic.encode()) + payload_len + (2 if qos else 0)
+    varint = 1
+    while remaining >= 128 ** varint:
+        varint += 1
+    return 1 + varint + remaining
+
+
+def simulate(devices: int, seconds: int, period_ms: int, data_len: int, seed: int = 1):
+    """Cihazların zaman sıralı okuma akışı: (saniye, mac, veri)"""
+    rng = random.Random(seed)
+    macs = [f"50:78:7D:92:{i // 256:02X}:{i % 256:02X}" for i in range(devices)]
+    events = []
+    for index, mac in enumerate(macs):
+        offset = rng.uniform(0, period_ms / 1000.0)
+        t = offset
+        while t < seconds:
+            events.append((t, mac, bytes(rng.getrandbits(8) for _ in range(data_len))))
+            t += period_ms / 1000.0
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def legacy(events, topic, qos):
+    start = datetime(2026, 1, 1)
+    payload_bytes = wire_bytes = 0
+    for t, mac, data in events:
+        payload = json.dumps({
+            'mac_address': mac,
+            'timestamp': (start + timedelta(seconds=t)).isoformat(),
+            'data': data.hex(),
+            'data_length': len(data)
+        }).encode()
+        payload_bytes += len(payload)
+        wire_bytes += mqtt_publish_size(topic, len(payload), qos)
+    messages = len(events)
+    return {
+        'messages': messages,
+        'payload_bytes': payload_bytes,
+        'mqtt_wire_bytes': wire_bytes,
+        'tcp_ip_estimate_bytes': wire_bytes + messages * TCP_IP_OVERHEAD
+    }
+
+
+def batched(events, topic, qos, max_payload_size, min_pack_size, min_pack_send_delay_ms):
+    batcher = TelemetryBatcher(max_payload_size, min_pack_size, min_pack_send_delay_ms)
+    delay = min_pack_send_delay_ms / 1000.0
+    payloads = []
+    first = None
+    for t, mac, data in events:
+        # Gecikme tetikli gönderim: simülasyon saatinde ilk okumadan delay geçtiyse
+        if first is not None and t - first >= delay:
+            payloads.extend(batcher.drain())
+            first = None
+        if first is None:
+            first = t
+        record = {'ts': int(1767225600000 + t * 1000), 'data': data.hex(), 'data_length': len(data)}
+        if batcher.add(mac, record):
+            payloads.extend(batcher.drain())
+            first = None
+    payloads.extend(batcher.drain())
+
+    wire_bytes = sum(mqtt_publish_size(topic, len(payload), qos) for payload, _ in payloads)
+    return {
+        'messages': len(payloads),
+        'payload_bytes': sum(len(payload) for payload, _ in payloads),
+        'max_payload_bytes': max((len(payload) for payload, _ in payloads), default=0),
+        'mqtt_wire_bytes': wire_bytes,
+        'tcp_ip_estimate_bytes': wire_bytes + len(payloads) * TCP_IP_OVERHEAD
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', type=int, default=24)
+    parser.add_argument('--seconds', type=int, default=60)
+    parser.add_argument('--period-ms', type=int, default=1000)
+    parser.add_argument('--data-len', type=int, default=4)
+    parser.add_argument('--topic', default='gateway/ble/data')
+    parser.add_argument('--qos', type=int, default=1)
+    parser.add_argument('--max-payload-size', type=int, default=8196)
+    parser.add_argument('--min-pack-size', type=int, default=500)
+    parser.add_argument('--min-pack-send-delay-ms', type=int, default=50)
+    args = parser.parse_args()
+
+    events = simulate(args.devices, args.seconds, args.period_ms, args.data_len)
+    old = legacy(events, args.topic, args.qos)
+    new = batched(events, args.topic, args.qos, args.max_payload_size,
+                  args.min_pack_size, args.min_pack_send_delay_ms)
+    result = {
+        'readings': len(events),
+        'params': vars(args),
+        'legacy': old,
+        'batched': new,
+        'savings': {
+            'messages_ratio': round(new['messages'] / old['messages'], 4) if old['messages'] else None,
+            'tcp_ip_bytes_saved_pct': round(
+                100.0 * (1 - new['tcp_ip_estimate_bytes'] / old['tcp_ip_estimate_bytes']), 2
+            ) if old['tcp_ip_estimate_bytes'] else None
+        }
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+BLE veri yolu ölçümü: sahte çevre birimleri -> BLEService -> yerel MQTT / HTTPS alıcısı
+ble_service.py projenin geçici bir kopyasında, ayrı süreçte çalışır; BLE adaptörü
+yerine fake_ble/bluepy (gecikme, sapma ve hata oranları ayarlanabilir N cihaz),
+ağ sunucusu yerine bu süreçteki alıcılar kullanılır:
+
+  mqtt   : CONNECT / PUBLISH / PINGREQ'e cevap veren asgari MQTT 3.1.1 broker'ı
+  https  : kendinden imzalı sertifikalı, keep-alive destekli HTTPS sunucusu
+           (servis REQUESTS_CA_BUNDLE ile bu sertifikaya güvenir)
+
+Her okuma değeri okuma anının zamanını taşır; alıcı okuma -> gönderim gecikmesini
+kayıt başına hesaplar. Isınmadan sonra --duration saniye boyunca okuma/s, gecikme
+yüzdelikleri (ms), servis sürecinin CPU süresi ve RSS'i (toplam ve cihaz başına)
+ölçülür ve sürümler arasında karşılaştırılabilmesi için JSON yazdırılır.
+HTTPS alıcısı için openssl komutu gerekir (Linux).
+
+Kullanım:
+    python benchmarks/bench_ble_datapath.py --devices 1,10,50 --sinks mqtt,https
+    python benchmarks/bench_ble_datapath.py --read-ms 30 --jitter-ms 20 --read-fail-rate 0.05
+    python benchmarks/bench_ble_datapath.py --no-batch      # okuma başına bir mesaj
+"""
+
+import os
+import sys
+import ssl
+import gzip
+import json
+import time
+import shutil
+import socket
+import struct
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_supervisor import process_sample  # noqa: E402
+
+FAKE_BLE_DIR = Path(__file__).resolve().parent / "fake_ble"
+SERVICE_UUID = '0000181a-0000-1000-8000-00805f9b34fb'
+CHAR_UUID = '00002a6e-0000-1000-8000-00805f9b34fb'
+
+
+def fake_mac(index: int) -> str:
+    # fake_ble/bluepy/btle.py ile aynı adresler
+    return 'FA:CE:00:00:%02X:%02X' % (index >> 8 & 0xFF, index & 0xFF)
+
+
+class SampleRecorder:
+    """Alıcıya ulaşan kayıtlar ve okuma -> gönderim gecikmeleri (ns)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.samples = 0
+            self.messages = 0
+            self.bytes = 0
+            self.latencies = []
+
+    def record(self, payload: bytes):
+        received = time.time_ns()
+        message = json.loads(payload)
+        # Tekil gönderim: {"mac_address": ..., "data": ...}; paket: {"<mac>": [{"ts": ..., "data": ...}]}
+        records = [message] if 'mac_address' in message else [r for items in message.values() for r in items]
+        latencies = [received - struct.unpack_from('<Q', bytes.fromhex(record['data']))[0]
+                     for record in records if 'data' in record]
+        with self._lock:
+            self.messages += 1
+            self.bytes += len(payload)
+            self.samples += len(records)
+            self.latencies.extend(latencies)
+
+
+class MQTTSink:
+    """Asgari MQTT 3.1.1 broker'ı: bağlantıyı kabul eder, PUBLISH'leri kaydeder"""
+
+    def __init__(self, recorder: SampleRecorder):
+        self.recorder = recorder
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _addr = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        stream = conn.makefile('rb')
+        try:
+            while True:
+                header = stream.read(1)
+                if not header:
+                    return
+                length, shift = 0, 0
+                while True:
+                    byte = stream.read(1)[0]
+                    length |= (byte & 0x7F) << shift
+                    shift += 7
+                    if not byte & 0x80:
+                        break
+                body = stream.read(length)
+                packet_type = header[0] >> 4
+                if packet_type == 1:    # CONNECT -> CONNACK
+                    conn.sendall(b'\x20\x02\x00\x00')
+                elif packet_type == 3:  # PUBLISH
+                    qos = header[0] >> 1 & 3
+                    offset = 2 + int.from_bytes(body[:2], 'big')
+                    if qos:
+                        conn.sendall(bytes((0x40 if qos == 1 else 0x50, 2)) + body[offset:offset + 2])
+                        offset += 2
+                    self.recorder.record(body[offset:])
+                elif packet_type == 12:  # PINGREQ -> PINGRESP
+                    conn.sendall(b'\xd0\x00')
+                elif packet_type == 14:  # DISCONNECT
+                    return
+        except (OSError, IndexError):
+            pass
+        finally:
+            conn.close()
+
+    def close(self):
+        self.sock.close()
+
+
+class HTTPSSink:
+    """Telemetri POST'larını kaydedip 200 dönen yerel HTTPS sunucusu"""
+
+    def __init__(self, recorder: SampleRecorder, directory: Path):
+        self.cert = str(directory / 'cert.pem')
+        key = str(directory / 'key.pem')
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=127.0.0.1',
+             '-addext', 'subjectAltName=IP:127.0.0.1', '-keyout', key, '-out', self.cert],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                recorder.record(body)
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert, key)
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    samples = sorted(samples)
+
+    def pick(fraction):
+        return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] / 1e6, 2)
+    return {'p50_ms': pick(0.5), 'p90_ms': pick(0.9), 'p99_ms': pick(0.99), 'max_ms': round(samples[-1] / 1e6, 2)}
+
+
+def write_config(workdir: Path, args, devices: int, sink: str, port: int):
+    (workdir / 'config' / 'gateway.json').write_text(json.dumps({
+        'ble': {
+            'enabled': True, 'operation_mode': 'read', 'scan_interval': 30,
+            'max_connections': args.max_connections or devices,
+            'forwarder_type': sink, 'batch_publish': not args.no_batch,
+            'mqtt_server': '127.0.0.1', 'mqtt_port': port,
+            'https_server': '127.0.0.1', 'https_port': port,
+            'profiles': [{'name': f'bench-{index}', 'mac': fake_mac(index), 'poll_period': args.poll_period,
+                          'service_uuid': SERVICE_UUID, 'characteristic_uuid': CHAR_UUID}
+                         for index in range(devices)]
+        }
+    }))
+    cache = workdir / 'data' / 'ble_gatt_cache.json'
+    if cache.exists():
+        cache.unlink()
+
+
+def run_case(workdir: Path, args, devices: int, sink: str, port: int, recorder: SampleRecorder,
+             environment: dict) -> dict:
+    write_config(workdir, args, devices, sink, port)
+    recorder.reset()
+    process = subprocess.Popen([sys.executable, str(workdir / 'services' / 'ble_service.py')], cwd=workdir,
+                               env=dict(environment, FAKE_BLE_DEVICES=str(devices)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while recorder.samples == 0:
+            if time.monotonic() > deadline or process.poll() is not None:
+                raise RuntimeError(f"{sink}: alıcıya okuma ulaşmadı")
+            time.sleep(0.05)
+        time.sleep(args.warmup)
+        recorder.reset()
+        before = process_sample(process.pid)
+        time.sleep(args.duration)
+        after = process_sample(process.pid)
+        samples, messages, latencies = recorder.samples, recorder.messages, list(recorder.latencies)
+    finally:
+        process.kill()
+        process.wait()
+
+    expected = devices * 1000.0 / args.poll_period
+    cpu_ms_per_s = (after['cpu_s'] - before['cpu_s']) / args.duration * 1000
+    return {
+        'devices': devices,
+        'sink': sink,
+        'expected_per_s': round(expected, 1),
+        'samples_per_s': round(samples / args.duration, 1),
+        'delivered_ratio': round(samples / args.duration / expected, 3),
+        'messages_per_s': round(messages / args.duration, 1),
+        'latency': percentiles(latencies),
+        'cpu_ms_per_s': round(cpu_ms_per_s, 2),
+        'cpu_ms_per_s_per_device': round(cpu_ms_per_s / devices, 3),
+        'cpu_us_per_sample': round(cpu_ms_per_s * 1000 / (samples / args.duration), 1) if samples else None,
+        'rss_mb': round(after['rss_kb'] / 1024, 1),
+        'rss_kb_per_device': round(after['rss_kb'] / devices, 1),
+        'threads': after['threads']
+    }
+
+
+def marginal(results) -> dict:
+    """En az ve en çok cihazlı ölçüm arasındaki cihaz başına artış (sabit maliyet hariç)"""
+    first, last = results[0], results[-1]
+    if last['devices'] == first['devices']:
+        return {}
+    added = last['devices'] - first['devices']
+    return {
+        'cpu_ms_per_s_per_device': round((last['cpu_ms_per_s'] - first['cpu_ms_per_s']) / added, 3),
+        'rss_kb_per_device': round((last['rss_mb'] - first['rss_mb']) * 1024 / added, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', default='1,10,50', help='virgülle ayrılmış cihaz sayıları')
+    parser.add_argument('--sinks', default='mqtt,https')
+    parser.add_argument('--poll-period', type=int, default=1000, help='profil poll_period (ms)')
+    parser.add_argument('--max-connections', type=int, default=0, help='0: cihaz sayısı kadar')
+    parser.add_argument('--no-batch', action='store_true', help='batch_publish kapalı')
+    parser.add_argument('--connect-ms', type=float, default=20)
+    parser.add_argument('--read-ms', type=float, default=10)
+    parser.add_argument('--jitter-ms', type=float, default=5)
+    parser.add_argument('--connect-fail-rate', type=float, default=0)
+    parser.add_argument('--read-fail-rate', type=float, default=0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--duration', type=float, default=15)
+    args = parser.parse_args()
+
+    device_counts = sorted(int(count) for count in args.devices.split(','))
+    sinks = [sink.strip() for sink in args.sinks.split(',') if sink.strip()]
+
+    workdir = Path(tempfile.mkdtemp(prefix='gateway-ble-bench-'))
+    shutil.copytree(ROOT / 'services', workdir / 'services', ignore=shutil.ignore_patterns('__pycache__'))
+    (workdir / 'config').mkdir()
+    (workdir / 'data').mkdir()
+    recorder = SampleRecorder()
+    servers = {}
+    results = {}
+    try:
+        if 'mqtt' in sinks:
+            servers['mqtt'] = MQTTSink(recorder)
+        if 'https' in sinks:
+            servers['https'] = HTTPSSink(recorder, workdir)
+        environment = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join(filter(None, [str(FAKE_BLE_DIR), os.getenv('PYTHONPATH')])),
+            # Sahte cihazlar bluepy arayüzünü taklit eder; kurulu bir bleak seçilmesin
+            BLE_BACKEND='bluepy',
+            LIVE_TELEMETRY_DIR=str(workdir / 'data' / 'live'),
+            TB_GATEWAY_CONFIG_DIR=str(workdir / 'tb_gateway'),
+            FAKE_BLE_SCAN_MS='1000',
+            FAKE_BLE_CONNECT_MS=str(args.connect_ms),
+            FAKE_BLE_READ_MS=str(args.read_ms),
+            FAKE_BLE_JITTER_MS=str(args.jitter_ms),
+            FAKE_BLE_CONNECT_FAIL_RATE=str(args.connect_fail_rate),
+            FAKE_BLE_READ_FAIL_RATE=str(args.read_fail_rate),
+            FAKE_BLE_SEED=str(args.seed)
+        )
+        if 'https' in servers:
+            environment['REQUESTS_CA_BUNDLE'] = servers['https'].cert
+        for sink in sinks:
+            runs = [run_case(workdir, args, devices, sink, servers[sink].port, recorder, environment)
+                    for devices in device_counts]
+            results[sink] = {'runs': runs, 'marginal': marginal(runs)}
+    finally:
+        for server in servers.values():
+            server.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({'params': vars(args), 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
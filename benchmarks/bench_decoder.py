@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+valueExpression çözme karşılaştırması
+Aynı okuma akışını üç yoldan telemetry değerlerine çevirir:
+
+  parse_per_read : her okumada ifadeyi metin olarak ayrıştırıp dilimleyen yol
+  compiled       : DecodePlan.decode (derlenmiş struct planı, okuma başına)
+  batch          : DecodePlan.decode_many (aynı uzunluktaki okumalar tek iter_unpack)
+
+Okuma başına mikro saniye ve hızlanma oranları JSON olarak yazdırılır.
+
+Kullanım:
+    python benchmarks/bench_decoder.py --readings 200000
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import struct
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.value_decoder import compile_profile  # noqa: E402
+
+PROFILE = {
+    'name': 'bench',
+    'telemetry': [
+        {'key': 'battery', 'valueExpression': '[0]'},
+        {'key': 'temperature', 'valueExpression': 'int[1:3] / 100'},
+        {'key': 'humidity', 'valueExpression': '[3:5] * 0.01'},
+        {'key': 'pressure', 'valueExpression': 'float[5:9]'},
+        {'key': 'counter', 'valueExpression': '[9:13]'}
+    ]
+}
+
+_SLICE_RE = re.compile(r'^(?:([a-z]+))?\[([^\]]*)\](.*)$')
+
+
+def parse_per_read(data: bytes, telemetry):
+    """Her okumada ifadeyi yeniden ayrıştıran (derlenmemiş) referans yol"""
+    values = {}
+    for item in telemetry:
+        value_type, index, ops = _SLICE_RE.match(item['valueExpression']).groups()
+        start, _, stop = index.partition(':')
+        part = data[int(start or 0):int(stop)] if ':' in index else data[int(index):int(index) + 1]
+        if value_type == 'float':
+            value = struct.unpack('<f', part)[0]
+        else:
+            value = int.from_bytes(part, 'little', signed=value_type == 'int')
+        for operator, number in re.findall(r'([*/+-])\s*([\d.]+)', ops):
+            number = float(number)
+            value = value * number if operator == '*' else value / number if operator == '/' else \
+                value + number if operator == '+' else value - number
+        values[item['key']] = value
+    return values
+
+
+def readings(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [
+        struct.pack('<BhHfI', rng.randrange(101), rng.randrange(-4000, 8000), rng.randrange(10000),
+                    rng.uniform(900, 1100), index)
+        for index in range(count)
+    ]
+
+
+def measure(func, count):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    return result, {'seconds': round(elapsed, 4), 'us_per_reading': round(elapsed / count * 1e6, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readings', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    buffers = readings(args.readings)
+    plan = compile_profile(PROFILE)
+    telemetry = PROFILE['telemetry']
+
+    reference, parse_stats = measure(lambda: [parse_per_read(data, telemetry) for data in buffers], len(buffers))
+    compiled, compiled_stats = measure(lambda: [plan.decode(data) for data in buffers], len(buffers))
+    batched, batch_stats = measure(
+        lambda: [values for i in range(0, len(buffers), args.batch_size)
+                 for values in plan.decode_many(buffers[i:i + args.batch_size])],
+        len(buffers)
+    )
+
+    # Üç yol aynı sonucu üretmeli
+    for expected, got_compiled, got_batched in zip(reference, compiled, batched):
+        for key, value in expected.items():
+            assert abs(got_compiled[key] - value) < 1e-6 and abs(got_batched[key] - value) < 1e-6, key
+
+    print(json.dumps({
+        'params': vars(args),
+        'results': {'parse_per_read': parse_stats, 'compiled': compiled_stats, 'batch': batch_stats},
+        'speedup': {
+            'compiled_x': round(parse_stats['seconds'] / compiled_stats['seconds'], 1),
+            'batch_x': round(parse_stats['seconds'] / batch_stats['seconds'], 1)
+        }
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
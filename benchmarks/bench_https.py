@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+HTTPS gönderim karşılaştırması
+Yerel, kendinden imzalı sertifikalı bir HTTPS sunucusuna (ayrı süreçte)
+aynı okuma akışını iki yoldan gönderir:
+
+  legacy  : her okuma için requests.post (her seferinde yeni TCP + TLS)
+  pooled  : TelemetryBatcher paketleri + HttpsForwarder (keep-alive havuzu,
+            sınırlı eşzamanlı istek, isteğe bağlı gzip)
+
+Okuma/s, istek sayısı, gönderilen byte ve okuma başına istemci CPU süresi
+JSON olarak yazdırılır. Sertifika için openssl komutu gerekir.
+
+Kullanım:
+    python benchmarks/bench_https.py --readings 2000 --pack-size 100 --in-flight 4
+"""
+
+import os
+import sys
+import ssl
+import gzip
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import urllib3
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.telemetry_batcher import TelemetryBatcher  # noqa: E402
+from services.https_forwarder import HttpsForwarder  # noqa: E402
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    """Gövdeyi okuyup 200 dönen telemetri alıcısı (keep-alive destekli)"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        json.loads(body)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int, cert: str, key: str):
+    server = ThreadingHTTPServer(('127.0.0.1', port), SinkHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    print('ready', flush=True)
+    server.serve_forever()
+
+
+def make_cert(directory: str):
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return cert, key
+
+
+def readings(count: int, devices: int, data_len: int, seed: int = 1):
+    rng = random.Random(seed)
+    macs = [f"50:78:7D:92:{i // 256:02X}:{i % 256:02X}" for i in range(devices)]
+    return [(macs[i % devices], bytes(rng.getrandbits(8) for _ in range(data_len))) for i in range(count)]
+
+
+def measure(func):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = func()
+    result['seconds'] = round(time.perf_counter() - wall, 4)
+    result['cpu_seconds'] = round(time.process_time() - cpu, 4)
+    return result
+
+
+def run_legacy(url, events):
+    def run():
+        ok = 0
+        for index, (mac, data) in enumerate(events):
+            payload = {'mac_address': mac, 'timestamp': index, 'data': data.hex(), 'data_length': len(data)}
+            response = requests.post(url, json=payload, headers={'Content-Type': 'application/json'},
+                                     timeout=10, verify=False)
+            ok += response.status_code == 200
+        return {'requests': len(events), 'ok_requests': ok, 'body_bytes': None}
+    return measure(run)
+
+
+def run_pooled(url, events, pack_size, in_flight, use_gzip):
+    def run():
+        forwarder = HttpsForwarder(url, headers={'Content-Type': 'application/json'},
+                                   max_in_flight=in_flight, gzip_enabled=use_gzip, verify=False)
+        batcher = TelemetryBatcher(max_payload_size=65536, min_pack_size=pack_size)
+        futures = []
+        for index, (mac, data) in enumerate(events):
+            record = {'ts': 1767225600000 + index, 'data': data.hex(), 'data_length': len(data)}
+            if batcher.add(mac, record):
+                futures.extend(forwarder.submit(payload) for payload, _ in batcher.drain())
+        futures.extend(forwarder.submit(payload) for payload, _ in batcher.drain())
+        ok = sum(future.result() for future in futures)
+        forwarder.close()
+        stats = forwarder.stats()
+        return {'requests': stats['requests'], 'ok_requests': ok, 'body_bytes': stats['body_bytes']}
+    return measure(run)
+
+
+def summarize(result, count):
+    result['readings_per_second'] = round(count / result['seconds'], 1) if result['seconds'] else None
+    result['cpu_us_per_reading'] = round(result['cpu_seconds'] / count * 1e6, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readings', type=int, default=2000)
+    parser.add_argument('--legacy-readings', type=int, default=300,
+                        help='legacy yol yavaş olduğu için daha az okuma ile ölçülür (okuma başına normalize edilir)')
+    parser.add_argument('--devices', type=int, default=24)
+    parser.add_argument('--data-len', type=int, default=4)
+    parser.add_argument('--pack-size', type=int, default=100)
+    parser.add_argument('--in-flight', type=int, default=4)
+    parser.add_argument('--port', type=int, default=18443)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--cert', help=argparse.SUPPRESS)
+    parser.add_argument('--key', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.cert, args.key)
+        return
+
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_cert(directory)
+        # Sunucu ayrı süreçte: istemci CPU ölçümüne karışmaz
+        server = subprocess.Popen(
+            [sys.executable, __file__, '--serve', '--port', str(args.port), '--cert', cert, '--key', key],
+            stdout=subprocess.PIPE, text=True
+        )
+        try:
+            server.stdout.readline()
+            url = f'https://127.0.0.1:{args.port}/api/v1/telemetry'
+            legacy_events = readings(args.legacy_readings, args.devices, args.data_len)
+            events = readings(args.readings, args.devices, args.data_len)
+
+            results = {
+                'legacy': summarize(run_legacy(url, legacy_events), len(legacy_events)),
+                'pooled': summarize(run_pooled(url, events, args.pack_size, args.in_flight, False), len(events)),
+                'pooled_gzip': summarize(run_pooled(url, events, args.pack_size, args.in_flight, True), len(events))
+            }
+        finally:
+            server.terminate()
+            server.wait()
+
+    legacy, pooled = results['legacy'], results['pooled']
+    print(json.dumps({
+        'params': {k: v for k, v in vars(args).items() if k not in ('serve', 'cert', 'key')},
+        'results': results,
+        'improvement': {
+            'throughput_x': round(pooled['readings_per_second'] / legacy['readings_per_second'], 1),
+            'cpu_per_reading_x': round(legacy['cpu_us_per_reading'] / pooled['cpu_us_per_reading'], 1)
+                if pooled['cpu_us_per_reading'] else None
+        }
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
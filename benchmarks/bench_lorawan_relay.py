@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Semtech UDP aktarıcı ölçümü (yerel UDP stand-in'leri ile)
+Aktarıcı ayrı bir süreçte çalışır; bu süreçte packet forwarder ve ağ sunucusu
+yerine geçen iki UDP soketi vardır. Ölçülenler:
+
+  direct    : forwarder -> sunucu doğrudan gönderimde gecikme (referans)
+  relay     : aynı uplink'lerin aktarıcı üzerinden gecikmesi
+  downlink  : sunucu PULL_RESP -> forwarder gecikmesi
+  outage    : sunucu --outage saniye cevap vermezken gönderilen uplink'lerin
+              bağlantı dönünce kayıpsız teslim edilip edilmediği
+
+Gecikme yüzdelikleri mikro saniye olarak JSON yazdırılır.
+
+Kullanım:
+    python benchmarks/bench_lorawan_relay.py --uplinks 2000 --rate 500
+"""
+
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.lorawan_service import SemtechRelay, PUSH_DATA, PUSH_ACK, PULL_DATA, PULL_RESP, \
+    PULL_ACK  # noqa: E402
+
+GATEWAY_EUI = bytes.fromhex('AA555A0000000001')
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    samples = sorted(samples)
+
+    def pick(fraction):
+        return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] / 1000, 1)
+    return {'count': len(samples), 'p50_us': pick(0.5), 'p90_us': pick(0.9), 'p99_us': pick(0.99),
+            'max_us': round(samples[-1] / 1000, 1)}
+
+
+def push_data(token: int, sequence: int) -> bytes:
+    payload = json.dumps({'rxpk': [{'tmst': sequence, 'freq': 868.1, 'datr': 'SF7BW125',
+                                    'data': 'QAEAAAAAAQAB', 'sent_ns': time.perf_counter_ns()}]})
+    return bytes((2,)) + token.to_bytes(2, 'big') + bytes((PUSH_DATA,)) + GATEWAY_EUI + payload.encode()
+
+
+class NetworkServer:
+    """Ağ sunucusu stand-in'i: PUSH/PULL ACK verir, uplink gecikmelerini kaydeder"""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.down = False
+        self.pull_addr = None
+        self.latencies = []
+        self.sequences = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            received = time.perf_counter_ns()
+            if self.down or len(data) < 4:
+                continue
+            if data[3] == PUSH_DATA:
+                rxpk = json.loads(data[12:])['rxpk'][0]
+                self.latencies.append(received - rxpk['sent_ns'])
+                self.sequences.add(rxpk['tmst'])
+                self.sock.sendto(data[:3] + bytes((PUSH_ACK,)), addr)
+            elif data[3] == PULL_DATA:
+                self.pull_addr = addr
+                self.sock.sendto(data[:3] + bytes((PULL_ACK,)), addr)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+
+
+class PacketForwarder:
+    """Packet forwarder stand-in'i: uplink gönderir, PULL_RESP gecikmelerini kaydeder"""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(0.2)
+        self.acks = 0
+        self.downlink_latencies = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        while not self._stop.is_set():
+            try:
+                data, _addr = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            if data[3] == PUSH_ACK:
+                self.acks += 1
+            elif data[3] == PULL_RESP:
+                sent = json.loads(data[4:])['txpk']['sent_ns']
+                self.downlink_latencies.append(time.perf_counter_ns() - sent)
+
+    def send_uplinks(self, target, first: int, count: int, rate: float):
+        interval = 1.0 / rate
+        next_send = time.perf_counter()
+        for sequence in range(first, first + count):
+            self.sock.sendto(push_data(sequence & 0xFFFF, sequence), target)
+            next_send += interval
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+
+
+def run_relay(server_port, local_port, ready, stop, stats_queue):
+    async def main():
+        relay = SemtechRelay('127.0.0.1', server_port, local_port=local_port, gateway_eui=GATEWAY_EUI,
+                             keepalive_interval=0.5, ack_timeout=0.3, max_missed=2)
+        await relay.start()
+        ready.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.05)
+        stats_queue.put(relay.stats())
+        await relay.stop()
+    asyncio.run(main())
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uplinks', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=500, help='saniyede uplink')
+    parser.add_argument('--downlinks', type=int, default=200)
+    parser.add_argument('--outage', type=float, default=2.0, help='sunucu kesintisi (saniye)')
+    args = parser.parse_args()
+
+    server = NetworkServer()
+    forwarder = PacketForwarder()
+    local_port = free_port()
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    stats_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run_relay, args=(server.port, local_port, ready, stop, stats_queue))
+    process.start()
+    ready.wait(10)
+    relay_addr = ('127.0.0.1', local_port)
+    results = {}
+    try:
+        # Doğrudan gönderim (referans)
+        forwarder.send_uplinks(('127.0.0.1', server.port), 0, args.uplinks, args.rate)
+        time.sleep(0.3)
+        results['direct'] = percentiles(server.latencies)
+
+        # Aktarıcı üzerinden
+        server.latencies = []
+        forwarder.sock.sendto(bytes((2, 0, 1, PULL_DATA)) + GATEWAY_EUI, relay_addr)
+        forwarder.send_uplinks(relay_addr, 100000, args.uplinks, args.rate)
+        time.sleep(0.3)
+        results['relay'] = percentiles(server.latencies)
+
+        # Downlink: sunucu aktarıcının PULL adresine PULL_RESP gönderir
+        for index in range(args.downlinks):
+            txpk = json.dumps({'txpk': {'imme': True, 'sent_ns': time.perf_counter_ns()}}).encode()
+            server.sock.sendto(bytes((2,)) + index.to_bytes(2, 'big') + bytes((PULL_RESP,)) + txpk,
+                               server.pull_addr)
+            time.sleep(1.0 / args.rate)
+        time.sleep(0.3)
+        results['downlink'] = percentiles(forwarder.downlink_latencies)
+
+        # Kesinti: sunucu cevap vermezken gönderilen uplink'ler tamponlanmalı
+        first, count = 200000, int(args.outage * 20)
+        server.sequences.clear()
+        server.down = True
+        forwarder.send_uplinks(relay_addr, first, count, 20)
+        server.down = False
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and len(server.sequences) < count:
+            time.sleep(0.1)
+        results['outage'] = {
+            'sent': count,
+            'delivered': len(server.sequences & set(range(first, first + count))),
+            'seconds': args.outage
+        }
+    finally:
+        stop.set()
+        relay_stats = stats_queue.get(timeout=10)
+        process.join()
+        server.close()
+        forwarder.close()
+
+    print(json.dumps({'params': vars(args), 'results': results, 'relay_stats': relay_stats}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
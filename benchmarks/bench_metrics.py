@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Metrik registry'sinin sıcak yol maliyeti
+services/metrics.py işlemlerini okuma / istek başına yapılan sırayla ölçer:
+
+  counter_inc        : etiketsiz Counter.inc
+  histogram_observe  : etiketsiz Histogram.observe (11 kova)
+  labeled_observe    : labels(...).observe (seri sözlükten bulunur)
+  contended_observe  : aynı histograma --threads thread'den eşzamanlı observe
+  render             : --series etiketli histogram serisinin metin çıktısı (ms)
+
+İşlem başına nanosaniye JSON olarak yazdırılır; okuma / istek başına
+yapılan 2-3 işlemin toplam maliyeti buradan hesaplanabilir.
+
+Kullanım:
+    python benchmarks/bench_metrics.py --ops 500000
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.metrics import Counter, Histogram, Registry  # noqa: E402
+
+
+def per_op_ns(func, ops: int) -> float:
+    started = time.perf_counter()
+    func(ops)
+    return round((time.perf_counter() - started) / ops * 1e9, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ops', type=int, default=500000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--series', type=int, default=100)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = Counter('bench_total', 'bench', registry=registry)
+    histogram = Histogram('bench_seconds', 'bench', registry=registry)
+    labeled = Histogram('bench_route_seconds', 'bench', ['method', 'route'], registry=registry)
+
+    def empty_loop(ops):
+        for _ in range(ops):
+            pass
+
+    def counter_loop(ops):
+        for _ in range(ops):
+            counter.inc()
+
+    def observe_loop(ops):
+        for _ in range(ops):
+            histogram.observe(0.012)
+
+    def labeled_loop(ops):
+        for _ in range(ops):
+            labeled.labels('GET', '/api/config').observe(0.012)
+
+    def contended(ops):
+        threads = [threading.Thread(target=observe_loop, args=(ops // args.threads,)) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    loop_ns = per_op_ns(empty_loop, args.ops)
+    results = {
+        'counter_inc_ns': round(per_op_ns(counter_loop, args.ops) - loop_ns, 1),
+        'histogram_observe_ns': round(per_op_ns(observe_loop, args.ops) - loop_ns, 1),
+        'labeled_observe_ns': round(per_op_ns(labeled_loop, args.ops) - loop_ns, 1),
+        'contended_observe_ns': round(per_op_ns(contended, args.ops) - loop_ns, 1)
+    }
+
+    for index in range(args.series):
+        labeled.labels('GET', f'/api/route/{index}').observe(index / 1000)
+    started = time.perf_counter()
+    text = registry.render()
+    results['render_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    results['render_bytes'] = len(text)
+
+    print(json.dumps({'params': vars(args), 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Modbus RTU çerçeveleme karşılaştırması
+Pty üzerindeki simüle slave'e aynı okuma isteğini üç yoldan gönderir:
+
+  read_timeout    : yanıtı timeout dolana kadar okuyan basit seri okuma
+  expected_length : beklenen uzunluk gelince dönen, eksik çerçevede tam timeout bekleyen okuma
+  framed          : RTUFramer (t3.5 sessizlik + beklenen uzunluk, baud'dan hesaplanan süreler)
+
+Temiz hatta ve yanıtların bir kısmı eksik geldiğinde (--truncate-rate) saniye
+başına işlem ve işlem başına süre JSON olarak yazdırılır.
+
+Kullanım:
+    python benchmarks/bench_rtu_framing.py --baudrate 9600 --transactions 20
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serial  # noqa: E402
+
+from services.modbus_rtu import RTUFramer, RTUTiming, build_read_request, check_crc, \
+    expected_response_length  # noqa: E402
+from modbus_slave_sim import SimulatedSlave  # noqa: E402
+
+REGISTER_COUNT = 10
+
+
+class ReadTimeoutFramer:
+    """Çerçeve sonunu sadece timeout ile belirleyen referans"""
+
+    def __init__(self, port, timeout):
+        self.port = port
+        self.port.timeout = timeout
+
+    def send(self, frame):
+        self.port.reset_input_buffer()
+        self.port.write(frame)
+        self.port.flush()
+
+    def receive(self, length):
+        return self.port.read(256)
+
+
+class ExpectedLengthFramer(ReadTimeoutFramer):
+    """Beklenen uzunlukta dönen ama eksik çerçevede timeout'a kadar bekleyen referans"""
+
+    def receive(self, length):
+        return self.port.read(length)
+
+
+def run(framer, transactions):
+    request = build_read_request(1, 3, 0, REGISTER_COUNT)
+    length = expected_response_length(3, REGISTER_COUNT)
+    valid = 0
+    started = time.perf_counter()
+    for _ in range(transactions):
+        framer.send(request)
+        frame = framer.receive(length)
+        valid += len(frame) == length and check_crc(frame)
+    elapsed = time.perf_counter() - started
+    return {
+        'transactions_per_second': round(transactions / elapsed, 1),
+        'ms_per_transaction': round(elapsed / transactions * 1000, 1),
+        'valid_frames': valid
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baudrate', type=int, default=9600)
+    parser.add_argument('--timeout', type=float, default=1.0, help="rs485.timeout (saniye)")
+    parser.add_argument('--transactions', type=int, default=20)
+    parser.add_argument('--truncate-rate', type=float, default=0.2)
+    args = parser.parse_args()
+
+    registers = {(3, address): address for address in range(REGISTER_COUNT)}
+    results = {}
+    for scenario, truncate_rate in (('clean', 0.0), ('truncated', args.truncate_rate)):
+        results[scenario] = {}
+        for name in ('read_timeout', 'expected_length', 'framed'):
+            slave = SimulatedSlave(registers, baudrate=args.baudrate, truncate_rate=truncate_rate).start()
+            try:
+                with serial.Serial(slave.port, baudrate=args.baudrate) as link:
+                    if name == 'read_timeout':
+                        framer = ReadTimeoutFramer(link, args.timeout)
+                    elif name == 'expected_length':
+                        framer = ExpectedLengthFramer(link, args.timeout)
+                    else:
+                        framer = RTUFramer(link, RTUTiming(args.baudrate), response_timeout=args.timeout)
+                    results[scenario][name] = run(framer, args.transactions)
+            finally:
+                slave.stop()
+
+    timing = RTUTiming(args.baudrate)
+    print(json.dumps({
+        'params': vars(args),
+        'timing_ms': {'char': round(timing.char_time * 1000, 3), 't1.5': round(timing.t15 * 1000, 3),
+                      't3.5': round(timing.t35 * 1000, 3)},
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Soğuk açılış ölçümü: import süresi ağacı, ilk isteğe ve ilk okumaya kadar geçen süre
+Her ölçüm yeni bir Python sürecinde, projenin geçici bir kopyasında yapılır:
+
+  imports             : `python -X importtime` ile modülün toplam import süresi, en
+                        pahalı doğrudan import'ları ve yüklenen ağır kütüphaneler
+  first_request       : uvicorn api.main:app başlatılmasından /api/health'in ilk
+                        200 cevabına kadar geçen süre
+  first_sample        : ble_service.py başlatılmasından ilk okumanın canlı veri
+                        soketine (API worker'ı yerine bu süreç dinler) ulaşmasına
+                        kadar geçen süre; BLE adaptörü yerine fake_ble/bluepy kullanılır
+
+Sonuçlar (ms, --repeat ölçümün medyanı) JSON yazdırılır ve
+benchmarks/baselines/startup.json ile karşılaştırılır; --max-regression'dan fazla
+yavaşlayan ölçüm varsa çıkış kodu 1 olur. Baseline ölçüldüğü makineye özgüdür:
+Raspberry Pi üzerinde --save ile kendi baseline'ınızı kaydedin.
+
+Kullanım:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --save                # baseline'ı güncelle
+    python benchmarks/bench_startup.py --forwarder mqtt      # MQTT forwarder ile ilk okuma
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKE_BLE_DIR = Path(__file__).resolve().parent / "fake_ble"
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "startup.json"
+
+# import süresi ölçülen modüller
+IMPORT_MODULES = ['services.ble_service', 'services.supervisor', 'api.main']
+# Açılışta yüklenmesi istenmeyen (sadece seçilen backend / forwarder'ın ihtiyaç duyduğu) kütüphaneler
+HEAVY_MODULES = ['requests', 'paho.mqtt.client', 'bluepy.btle', 'bleak', 'serial']
+FAKE_MAC = 'FA:CE:00:00:00:00'
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare_workdir(forwarder: str, sink_port: int) -> Path:
+    """api, ui ve services'in kopyası; tek sahte cihazı okuyan BLE konfigürasyonu"""
+    workdir = Path(tempfile.mkdtemp(prefix='gateway-startup-'))
+    for name in ('api', 'ui', 'services'):
+        shutil.copytree(ROOT / name, workdir / name, ignore=shutil.ignore_patterns('__pycache__'))
+    (workdir / 'config').mkdir()
+    shutil.copy(ROOT / 'config' / 'users.json', workdir / 'config' / 'users.json')
+    (workdir / 'config' / 'gateway.json').write_text(json.dumps({
+        'ble': {
+            'enabled': True, 'operation_mode': 'read', 'scan_interval': 10,
+            'forwarder_type': forwarder,
+            'mqtt_server': '127.0.0.1', 'mqtt_port': sink_port,
+            'https_server': '127.0.0.1', 'https_port': sink_port,
+            'profiles': [{'name': 'bench', 'mac': FAKE_MAC, 'poll_period': 1000,
+                          'service_uuid': '0000181a-0000-1000-8000-00805f9b34fb',
+                          'characteristic_uuid': '00002a6e-0000-1000-8000-00805f9b34fb'}]
+        }
+    }))
+    return workdir
+
+
+def parse_importtime(stderr: str, module: str) -> dict:
+    """Modülün toplam süresi, doğrudan import'ları ve yüklenen ağır kütüphaneler"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative_us)))
+    loaded = {name for _depth, name, _cumulative in entries}
+    index = max(i for i, entry in enumerate(entries) if entry[0] == 0 and entry[1] == module)
+    children = []
+    for depth, name, cumulative in reversed(entries[:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, cumulative))
+    children.sort(key=lambda child: -child[1])
+    return {
+        'total_us': entries[index][2],
+        'children': children,
+        'heavy': [name for name in HEAVY_MODULES if name in loaded]
+    }
+
+
+def measure_imports(workdir: Path, module: str, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=workdir, capture_output=True, text=True, check=True)
+        runs.append(parse_importtime(result.stderr, module))
+    top = {}
+    for name, _cumulative in runs[0]['children'][:8]:
+        values = [dict(run['children']).get(name, 0) for run in runs]
+        top[name] = round(statistics.median(values) / 1000, 1)
+    return {
+        'ms': round(statistics.median(run['total_us'] for run in runs) / 1000, 1),
+        'top': top,
+        'heavy': runs[0]['heavy']
+    }
+
+
+def measure_first_request(workdir: Path, timeout: float = 60) -> float:
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/api/health'
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'api.main:app', '--port', str(port),
+                                '--log-level', 'warning'], cwd=workdir,
+                               env=dict(os.environ, LIVE_TELEMETRY_DIR=str(workdir / 'data' / 'api-live')),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return round((time.perf_counter() - started) * 1000, 1)
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("API zaman aşımı")
+    finally:
+        process.terminate()
+        process.wait(timeout=15)
+
+
+def measure_first_sample(workdir: Path, timeout: float = 60) -> float:
+    live_dir = workdir / 'data' / 'live'
+    live_dir.mkdir(parents=True, exist_ok=True)
+    for path in live_dir.iterdir():
+        path.unlink()
+    # Ölçüm önceki çalıştırmanın GATT önbelleğinden etkilenmesin
+    cache = workdir / 'data' / 'ble_gatt_cache.json'
+    if cache.exists():
+        cache.unlink()
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    listener.bind(str(live_dir / 'bench.sock'))
+    listener.settimeout(timeout)
+    environment = dict(os.environ, LIVE_TELEMETRY_DIR=str(live_dir), FAKE_BLE_SCAN_MS='10000', BLE_BACKEND='bluepy',
+                       PYTHONPATH=os.pathsep.join(filter(None, [str(FAKE_BLE_DIR), os.getenv('PYTHONPATH')])))
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, str(workdir / 'services' / 'ble_service.py')], cwd=workdir,
+                               env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        listener.recv(65536)
+        return round((time.perf_counter() - started) * 1000, 1)
+    except socket.timeout:
+        raise RuntimeError("İlk okuma zaman aşımı")
+    finally:
+        # Kapanış ölçülmüyor (cevap vermeyen sink'e giden istekler beklenmesin)
+        process.kill()
+        process.wait()
+        listener.close()
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """Baseline'a göre max_regression oranından fazla yavaşlayan ölçümler"""
+    pairs = [(f'imports.{module}', results['imports'][module]['ms'], baseline['imports'].get(module, {}).get('ms'))
+             for module in results['imports']]
+    pairs += [(name, results[name], baseline.get(name)) for name in ('interpreter', 'first_request', 'first_sample')]
+    regressions = []
+    for name, value, reference in pairs:
+        if reference and value > reference * (1 + max_regression):
+            regressions.append({'name': name, 'ms': value, 'baseline_ms': reference,
+                                'change': f"+{(value / reference - 1) * 100:.0f}%"})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--forwarder', choices=['https', 'mqtt'], default='https')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='izin verilen yavaşlama oranı')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--save', action='store_true', help='sonuçları baseline olarak kaydet')
+    args = parser.parse_args()
+
+    # MQTT / HTTPS forwarder'ın bağlandığı, hiçbir şey yapmayan yerel TCP soketi
+    sink = socket.socket()
+    sink.bind(('127.0.0.1', 0))
+    sink.listen(16)
+    workdir = prepare_workdir(args.forwarder, sink.getsockname()[1])
+    try:
+        interpreter = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'pass'], check=True)
+            interpreter.append((time.perf_counter() - started) * 1000)
+        results = {
+            'interpreter': round(statistics.median(interpreter), 1),
+            'imports': {module: measure_imports(workdir, module, args.repeat) for module in IMPORT_MODULES},
+            'first_request': statistics.median(measure_first_request(workdir) for _ in range(args.repeat)),
+            'first_sample': statistics.median(measure_first_sample(workdir) for _ in range(args.repeat))
+        }
+    finally:
+        sink.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {'params': {'repeat': args.repeat, 'forwarder': args.forwarder,
+                         'python': sys.version.split()[0]}, 'results': results}
+    exit_code = 0
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n')
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        report['regressions'] = compare(results, baseline['results'], args.max_regression)
+        exit_code = 1 if report['regressions'] else 0
+    print(json.dumps(report, indent=2))
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Ayrı servis süreçleri ile tek süreçli supervisor karşılaştırması
+Servisler geçici bir kopyada, simüle RS-485 slave'i (pty) ve yerel UDP ağ
+sunucusu stand-in'i ile çalıştırılır; iki düzen sırayla ölçülür:
+
+  separate   : ble_service.py, rs485_service.py, lorawan_service.py ayrı süreçler
+  supervisor : supervisor.py (aynı servisler tek süreçte)
+
+Isınmadan sonra --duration saniye boyunca toplam RSS / PSS, CPU süresi,
+thread sayısı ve bağlam değişimleri (uyanma sayısı için vekil) /proc'tan
+okunup JSON olarak yazdırılır (Linux).
+
+Kullanım:
+    python benchmarks/bench_supervisor.py --duration 20
+    python benchmarks/bench_supervisor.py --ble   # BLE servisi de etkin (adaptör gerekir)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modbus_slave_sim import SimulatedSlave  # noqa: E402
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_KB = os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def process_sample(pid: int) -> dict:
+    """Sürecin RSS / PSS (kB), CPU (saniye), thread ve bağlam değişimi sayıları"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    rss = int(fields[21]) * PAGE_KB
+    pss = None
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    switches = 0
+    tasks = os.listdir(f'/proc/{pid}/task')
+    for task in tasks:
+        try:
+            with open(f'/proc/{pid}/task/{task}/status') as f:
+                for line in f:
+                    if line.startswith(('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches')):
+                        switches += int(line.split()[1])
+        except OSError:
+            pass
+    return {'rss_kb': rss, 'pss_kb': pss, 'cpu_s': cpu, 'threads': len(tasks), 'switches': switches}
+
+
+def measure(processes, warmup: float, duration: float) -> dict:
+    time.sleep(warmup)
+    for process in processes:
+        if process.poll() is not None:
+            raise RuntimeError(f"Süreç erken bitti: {process.args}")
+    before = [process_sample(process.pid) for process in processes]
+    time.sleep(duration)
+    after = [process_sample(process.pid) for process in processes]
+    return {
+        'processes': len(processes),
+        'rss_mb': round(sum(sample['rss_kb'] for sample in after) / 1024, 1),
+        'pss_mb': round(sum(sample['pss_kb'] or 0 for sample in after) / 1024, 1),
+        'threads': sum(sample['threads'] for sample in after),
+        'cpu_ms_per_s': round(sum(a['cpu_s'] - b['cpu_s'] for a, b in zip(after, before)) / duration * 1000, 2),
+        'wakeups_per_s': round(sum(a['switches'] - b['switches'] for a, b in zip(after, before)) / duration, 1)
+    }
+
+
+def stop(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--warmup', type=float, default=5)
+    parser.add_argument('--polling-interval', type=int, default=1000, help='modbus.polling_interval (ms)')
+    parser.add_argument('--ble', action='store_true', help='BLE servisini de etkinleştir')
+    args = parser.parse_args()
+
+    slave = SimulatedSlave({(3, address): address for address in range(50)}, baudrate=9600).start()
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+
+    workdir = Path(tempfile.mkdtemp(prefix='gateway-bench-'))
+    shutil.copytree(ROOT / 'services', workdir / 'services', ignore=shutil.ignore_patterns('__pycache__'))
+    (workdir / 'config').mkdir()
+    (workdir / 'config' / 'gateway.json').write_text(json.dumps({
+        'rs485': {'enabled': True, 'baudrate': 9600, 'port': slave.port, 'timeout': 500},
+        'modbus': {'enabled': True, 'slave_id': 1, 'polling_interval': args.polling_interval,
+                   'function_codes': '3,4', 'register_map': json.dumps({'holding': [0, 20]})},
+        'ble': {'enabled': args.ble, 'profiles': []},
+        'lorawan': {'enabled': True, 'forwarder_type': 'udp', 'udp_server': '127.0.0.1',
+                    'udp_port': server.getsockname()[1], 'local_port': 0, 'gateway_id': 'AA555A0000000001'}
+    }))
+    environment = dict(os.environ, LIVE_TELEMETRY_DIR=str(workdir / 'data' / 'live'))
+
+    def spawn(script):
+        return subprocess.Popen([sys.executable, str(workdir / 'services' / script)], cwd=workdir,
+                                env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    results = {}
+    try:
+        processes = [spawn('ble_service.py'), spawn('rs485_service.py'), spawn('lorawan_service.py')]
+        try:
+            results['separate'] = measure(processes, args.warmup, args.duration)
+        finally:
+            stop(processes)
+
+        processes = [spawn('supervisor.py')]
+        try:
+            results['supervisor'] = measure(processes, args.warmup, args.duration)
+        finally:
+            stop(processes)
+    finally:
+        slave.stop()
+        server.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    separate, supervisor = results['separate'], results['supervisor']
+    print(json.dumps({
+        'params': vars(args),
+        'results': results,
+        'saved': {
+            'rss_mb': round(separate['rss_mb'] - supervisor['rss_mb'], 1),
+            'pss_mb': round(separate['pss_mb'] - supervisor['pss_mb'], 1),
+            'wakeups_per_s': round(separate['wakeups_per_s'] - supervisor['wakeups_per_s'], 1)
+        }
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
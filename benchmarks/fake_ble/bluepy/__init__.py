@@ -0,0 +1 @@
+"""Ölçümler için bluepy yerine geçen sahte BLE backend'i (bkz. btle.py)"""
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Sahte bluepy.btle - Adaptör olmadan BLE servisini ölçmek için
+BLE servisi ayrı süreçte çalıştığından ayarlar ortam değişkenlerinden okunur:
+
+  FAKE_BLE_DEVICES     : cihaz sayısı (MAC'ler fake_mac(0..N-1))
+  FAKE_BLE_SCAN_MS     : Scanner.scan süresi (verilmezse istenen timeout)
+  FAKE_BLE_CONNECT_MS  : Peripheral bağlantı süresi
+  FAKE_BLE_READ_MS     : readCharacteristic / writeCharacteristic süresi
+  FAKE_BLE_JITTER_MS   : bağlantı ve okuma sürelerine eklenen rastgele sapma (±)
+  FAKE_BLE_CONNECT_FAIL_RATE / FAKE_BLE_READ_FAIL_RATE : başarısız bağlantı /
+                         okuma oranı (0..1, BTLEDisconnectError fırlatılır)
+  FAKE_BLE_SEED        : rastgelelik tohumu
+
+Okunan değer: okuma anının time.time_ns() değeri (8 byte, little endian) +
+2 byte sayaç; alıcı uçtan uca gecikmeyi bu zamandan hesaplar.
+
+Kullanım:
+    PYTHONPATH=benchmarks/fake_ble python3 services/ble_service.py
+"""
+
+import os
+import time
+import random
+import struct
+import threading
+
+DEVICE_COUNT = int(os.getenv("FAKE_BLE_DEVICES", "1"))
+SCAN_MS = os.getenv("FAKE_BLE_SCAN_MS")
+CONNECT_MS = float(os.getenv("FAKE_BLE_CONNECT_MS", "0"))
+READ_MS = float(os.getenv("FAKE_BLE_READ_MS", "0"))
+JITTER_MS = float(os.getenv("FAKE_BLE_JITTER_MS", "0"))
+CONNECT_FAIL_RATE = float(os.getenv("FAKE_BLE_CONNECT_FAIL_RATE", "0"))
+READ_FAIL_RATE = float(os.getenv("FAKE_BLE_READ_FAIL_RATE", "0"))
+
+# Her cihazda tek karakteristik (bu handle'da)
+VALUE_HANDLE = 0x2a
+
+DEFAULT_CHAR_UUID = '00002a00-0000-1000-8000-00805f9b34fb'
+
+_counter_lock = threading.Lock()
+_counter = 0
+_random = random.Random(int(os.getenv("FAKE_BLE_SEED", "1")))
+# Keşfedilen karakteristik UUID'si (handle doğrulaması aynı UUID'yi döndürür)
+_char_uuid = DEFAULT_CHAR_UUID
+
+
+def _delay(milliseconds: float):
+    """Sapmalı bekleme; rastgele sayılar okuma thread'leri arasında paylaşılır"""
+    if JITTER_MS:
+        with _counter_lock:
+            milliseconds += _random.uniform(-JITTER_MS, JITTER_MS)
+    if milliseconds > 0:
+        time.sleep(milliseconds / 1000)
+
+
+def _fails(rate: float) -> bool:
+    if not rate:
+        return False
+    with _counter_lock:
+        return _random.random() < rate
+
+
+def fake_mac(index: int) -> str:
+    return 'FA:CE:00:00:%02X:%02X' % (index >> 8 & 0xFF, index & 0xFF)
+
+
+class BTLEException(Exception):
+    pass
+
+
+class BTLEDisconnectError(BTLEException):
+    pass
+
+
+class UUID:
+    def __init__(self, value):
+        if isinstance(value, int):
+            value = '%08x-0000-1000-8000-00805f9b34fb' % value
+        self.value = str(value).lower()
+
+    def __eq__(self, other):
+        return isinstance(other, UUID) and self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __str__(self):
+        return self.value
+
+
+class ScanEntry:
+    COMPLETE_LOCAL_NAME = 9
+
+    def __init__(self, addr: str, rssi: int = -60):
+        self.addr = addr.lower()
+        self.rssi = rssi
+
+    def getValueText(self, adtype):
+        return f"fake-{self.addr[-5:]}" if adtype == self.COMPLETE_LOCAL_NAME else None
+
+
+class Scanner:
+    def scan(self, timeout=10):
+        time.sleep(float(SCAN_MS) / 1000 if SCAN_MS is not None else timeout)
+        return [ScanEntry(fake_mac(index)) for index in range(DEVICE_COUNT)]
+
+
+class Characteristic:
+    def __init__(self, uuid, handle: int = VALUE_HANDLE, properties: int = 0x12):
+        self.uuid = UUID(uuid)
+        self.properties = properties
+        self._handle = handle
+
+    def getHandle(self):
+        return self._handle
+
+
+class Service:
+    def __init__(self, uuid):
+        self.uuid = UUID(uuid)
+
+    def getCharacteristics(self, forUUID=None):
+        global _char_uuid
+        if forUUID is not None:
+            _char_uuid = str(forUUID)
+        return [Characteristic(_char_uuid)]
+
+
+class DefaultDelegate:
+    def __init__(self):
+        pass
+
+    def handleNotification(self, cHandle, data):
+        pass
+
+
+class Peripheral:
+    def __init__(self, deviceAddr=None, *args, **kwargs):
+        if deviceAddr is not None:
+            self.connect(deviceAddr)
+
+    def connect(self, deviceAddr):
+        if deviceAddr.upper() not in {fake_mac(index) for index in range(DEVICE_COUNT)}:
+            raise BTLEDisconnectError(f"Failed to connect to peripheral {deviceAddr}")
+        _delay(CONNECT_MS)
+        if _fails(CONNECT_FAIL_RATE):
+            raise BTLEDisconnectError(f"Failed to connect to peripheral {deviceAddr}")
+        self.addr = deviceAddr
+        self._delegate = None
+
+    def withDelegate(self, delegate):
+        self._delegate = delegate
+        return self
+
+    def getServiceByUUID(self, uuid):
+        return Service(uuid)
+
+    def getCharacteristics(self, startHnd=1, endHnd=0xFFFF, uuid=None):
+        return [Characteristic(uuid or _char_uuid)]
+
+    def getDescriptors(self, startHnd=1, endHnd=0xFFFF):
+        return []
+
+    def readCharacteristic(self, handle):
+        global _counter
+        _delay(READ_MS)
+        if _fails(READ_FAIL_RATE):
+            raise BTLEDisconnectError("Device disconnected")
+        with _counter_lock:
+            _counter += 1
+            counter = _counter & 0xFFFF
+        return struct.pack('<QH', time.time_ns(), counter)
+
+    def writeCharacteristic(self, handle, val, withResponse=False):
+        _delay(READ_MS)
+
+    def waitForNotifications(self, timeout):
+        time.sleep(timeout)
+        return False
+
+    def disconnect(self):
+        pass
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Pty tabanlı simüle Modbus RTU slave
+Bir pseudo-terminal çifti açar; pty'nin slave ucu (ör. /dev/pts/5) gerçek
+seri port gibi pyserial veya rs485_service ile açılabilir. FC3/FC4 okuma
+isteklerini register tablosundan yanıtlar, tabloda olmayan adreslere
+exception 02 döndürür. baudrate verilirse istek ve yanıtın hatta geçeceği
+süre (8N1, karakter başına 10 bit) ve 3.5 karakterlik sessizlik beklenir.
+truncate_rate ile yanıtların bir kısmı eksik gönderilir (hat gürültüsü /
+kopan çerçeve benzetimi).
+
+Kullanım:
+    python benchmarks/modbus_slave_sim.py --baudrate 9600
+    # yazdırılan port yolunu gateway.json rs485.port (veya RS485_PORT) olarak verin
+"""
+
+import os
+import sys
+import tty
+import time
+import random
+import struct
+import select
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Tuple, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.modbus_rtu import with_crc, check_crc, EXCEPTION_ILLEGAL_DATA_ADDRESS, \
+    EXCEPTION_ILLEGAL_FUNCTION  # noqa: E402
+
+# 8N1 karakter: başlangıç + 8 veri + stop
+BITS_PER_CHAR = 10
+
+
+class SimulatedSlave:
+    """Pty üzerinde çalışan Modbus RTU slave"""
+
+    def __init__(self, registers: Dict[Tuple[int, int], int], slave_id: int = 1,
+                 baudrate: Optional[int] = None, truncate_rate: float = 0.0, seed: int = 1):
+        # registers: (fonksiyon kodu, adres) -> 16 bit değer
+        self.registers = registers
+        self.slave_id = slave_id
+        self.char_time = BITS_PER_CHAR / baudrate if baudrate else 0.0
+        self.truncate_rate = truncate_rate
+        self._random = random.Random(seed)
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        self._stop = threading.Event()
+        self._thread = None
+
+        # İstatistikler
+        self.requests = 0
+        self.exceptions = 0
+        self.truncated = 0
+        self.bus_bytes = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name='modbus-slave', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+    def respond(self, request: bytes) -> Optional[bytes]:
+        """8 byte'lık okuma isteğinin yanıtı (başka slave'e ise None)"""
+        slave_id, function, address, count = struct.unpack_from('>BBHH', request)
+        if slave_id != self.slave_id:
+            return None
+        if function not in (3, 4):
+            return with_crc(struct.pack('>BBB', slave_id, function | 0x80, EXCEPTION_ILLEGAL_FUNCTION))
+        try:
+            values = [self.registers[(function, register)] for register in range(address, address + count)]
+        except KeyError:
+            self.exceptions += 1
+            return with_crc(struct.pack('>BBB', slave_id, function | 0x80, EXCEPTION_ILLEGAL_DATA_ADDRESS))
+        return with_crc(struct.pack(f'>BBB{count}H', slave_id, function, 2 * count, *values))
+
+    def _serve(self):
+        buffer = b''
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self.master_fd], [], [], 0.05)
+            if not readable:
+                continue
+            try:
+                buffer += os.read(self.master_fd, 256)
+            except OSError:
+                return
+            while len(buffer) >= 8:
+                request, buffer = buffer[:8], buffer[8:]
+                if not check_crc(request):
+                    buffer = b''
+                    break
+                self.requests += 1
+                response = self.respond(request)
+                if response is None:
+                    continue
+                if self.truncate_rate and self._random.random() < self.truncate_rate:
+                    response = response[:len(response) // 2]
+                    self.truncated += 1
+                self.bus_bytes += len(request) + len(response)
+                self._transmit(response, len(request))
+
+    def _transmit(self, response: bytes, request_length: int):
+        """İsteğin hatta geçmesi + 3.5 karakter sessizlikten sonra yanıtı hat hızında yaz"""
+        if not self.char_time:
+            os.write(self.master_fd, response)
+            return
+        started = time.monotonic() + self.char_time * (request_length + 3.5)
+        for index in range(len(response)):
+            delay = started + self.char_time * (index + 1) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            os.write(self.master_fd, response[index:index + 1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slave-id', type=int, default=1)
+    parser.add_argument('--baudrate', type=int, default=9600)
+    parser.add_argument('--holding', type=int, default=200, help="0'dan başlayan holding register sayısı")
+    parser.add_argument('--input', type=int, default=200, help="0'dan başlayan input register sayısı")
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help="eksik gönderilen yanıt oranı")
+    args = parser.parse_args()
+
+    registers = {(3, address): address for address in range(args.holding)}
+    registers.update({(4, address): 0xFFFF - address for address in range(args.input)})
+    slave = SimulatedSlave(registers, args.slave_id, args.baudrate, args.truncate_rate).start()
+    print(f"Simüle slave {args.slave_id} dinliyor: {slave.port} ({args.baudrate} baud)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        slave.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+BLE Engine - bleak tabanlı asyncio BLE motoru
+Tek bir uzun ömürlü event loop üzerinde çok sayıda BleakClient bağlantısını
+açık tutar ve GATT okuma/yazma işlemlerini eşzamanlı yürütür
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Optional, List, Dict, Callable
+
+from bleak import BleakScanner, BleakClient
+from bleak.uuids import normalize_uuid_str
+
+logger = logging.getLogger('BLE_Engine')
+
+
+class BleakEngine:
+    """bleak bağlantı havuzu ve eşzamanlı GATT işlem motoru"""
+
+    def __init__(self, max_concurrent_ops: int = 4, connect_timeout: float = 30.0,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.max_concurrent_ops = max(1, int(max_concurrent_ops))
+        self.connect_timeout = connect_timeout
+        self.clients: Dict[str, BleakClient] = {}
+        self.loop = loop
+        self._own_loop = loop is None
+        self._thread = None
+        self._ops_semaphore = None
+        self._device_locks: Dict[str, asyncio.Lock] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+
+    # ------------------------------------------------------------------
+    # Event loop yönetimi
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Event loop'u başlat (dışarıdan loop verilmediyse kendi thread'inde)"""
+        if self._own_loop:
+            if self._thread and self._thread.is_alive():
+                return
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(ready.set)
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name='ble-engine', daemon=True)
+            self._thread.start()
+            ready.wait(timeout=5)
+        logger.info(f"BLE motoru başlatıldı (eşzamanlı GATT işlem limiti: {self.max_concurrent_ops})")
+
+    def stop(self, timeout: float = 10.0):
+        """Tüm bağlantıları kapat ve event loop'u durdur"""
+        if not self.loop or self.loop.is_closed():
+            return
+        try:
+            self.run(self.disconnect_all(), timeout=timeout)
+        except Exception as e:
+            logger.error(f"BLE motoru kapatma hatası: {e}")
+
+        if self._own_loop:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            if self._thread:
+                self._thread.join(timeout=timeout)
+            self.loop.close()
+            self._thread = None
+        logger.info("BLE motoru durduruldu")
+
+    def submit(self, coro) -> Future:
+        """Coroutine'i motor loop'una gönder, concurrent Future döndür"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Coroutine'i motor loop'unda çalıştır ve sonucu bekle (thread'lerden çağrılır)"""
+        return self.submit(coro).result(timeout=timeout)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._ops_semaphore is None:
+            self._ops_semaphore = asyncio.Semaphore(self.max_concurrent_ops)
+        return self._ops_semaphore
+
+    def _device_lock(self, mac_address: str) -> asyncio.Lock:
+        lock = self._device_locks.get(mac_address)
+        if lock is None:
+            lock = self._device_locks[mac_address] = asyncio.Lock()
+        return lock
+
+    # ------------------------------------------------------------------
+    # Tarama ve bağlantı
+    # ------------------------------------------------------------------
+
+    async def scan(self, timeout: float = 10.0) -> List[Dict]:
+        """BLE cihazlarını tara"""
+        devices = []
+        results = await BleakScanner.discover(timeout=timeout, return_adv=True)
+        for device, adv in results.values():
+            devices.append({
+                'mac': device.address,
+                'name': device.name or device.address,
+                'rssi': adv.rssi if adv is not None else 0,
+                'connectable': True
+            })
+        return devices
+
+    def is_connected(self, mac_address: str) -> bool:
+        client = self.clients.get(mac_address)
+        return bool(client and client.is_connected)
+
+    async def connect(self, mac_address: str, timeout: Optional[float] = None) -> bool:
+        """Cihaza bağlan (bağlıysa mevcut bağlantıyı kullan)"""
+        lock = self._connect_locks.setdefault(mac_address, asyncio.Lock())
+        async with lock:
+            if self.is_connected(mac_address):
+                return True
+
+            def on_disconnect(_client, mac=mac_address):
+                if self.clients.get(mac) is _client:
+                    del self.clients[mac]
+                logger.warning(f"Cihaz bağlantısı koptu: {mac}")
+
+            client = BleakClient(
+                mac_address,
+                disconnected_callback=on_disconnect,
+                timeout=timeout or self.connect_timeout
+            )
+            # Bağlantı kurulumu da radyo kaynağı kullanır, GATT limitine dahil edilir
+            async with self._semaphore():
+                await client.connect()
+            self.clients[mac_address] = client
+            return True
+
+    async def disconnect(self, mac_address: str):
+        """Cihaz bağlantısını kapat"""
+        client = self.clients.pop(mac_address, None)
+        if client:
+            await client.disconnect()
+
+    async def disconnect_all(self):
+        """Tüm cihaz bağlantılarını kapat"""
+        macs = list(self.clients.keys())
+        results = await asyncio.gather(*(self.disconnect(mac) for mac in macs), return_exceptions=True)
+        for mac, result in zip(macs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Bağlantı kesme hatası ({mac}): {result}")
+
+    def _client(self, mac_address: str) -> BleakClient:
+        client = self.clients.get(mac_address)
+        if client is None or not client.is_connected:
+            raise ConnectionError(f"Cihaz bağlı değil: {mac_address}")
+        return client
+
+    def resolve_handle(self, mac_address: str, service_uuid: str, char_uuid: str) -> int:
+        """Bağlantıda keşfedilmiş servis tablosundan value handle'ı bul"""
+        service = self._client(mac_address).services.get_service(service_uuid)
+        if service is None:
+            raise LookupError(f"Servis bulunamadı: {service_uuid}")
+        characteristic = service.get_characteristic(char_uuid)
+        if characteristic is None:
+            raise LookupError(f"Karakteristik bulunamadı: {char_uuid}")
+        return characteristic.handle
+
+    def verify_handle(self, mac_address: str, char_uuid: str, handle: int) -> bool:
+        """Handle'ın hâlâ verilen karakteristiğe ait olup olmadığını kontrol et"""
+        characteristic = self._client(mac_address).services.get_characteristic(handle)
+        return characteristic is not None and characteristic.uuid == normalize_uuid_str(char_uuid)
+
+    # ------------------------------------------------------------------
+    # GATT işlemleri
+    # ------------------------------------------------------------------
+
+    async def read(self, mac_address: str, char_specifier) -> bytes:
+        """Karakteristik oku (cihaz başına sıralı, toplamda limitli eşzamanlı)"""
+        async with self._device_lock(mac_address):
+            async with self._semaphore():
+                client = self._client(mac_address)
+                return bytes(await client.read_gatt_char(char_specifier))
+
+    async def write(self, mac_address: str, char_specifier, value: bytes, response: bool = True):
+        """Karakteristiğe yaz"""
+        async with self._device_lock(mac_address):
+            async with self._semaphore():
+                client = self._client(mac_address)
+                await client.write_gatt_char(char_specifier, value, response=response)
+
+    async def start_notify(self, mac_address: str, char_specifier,
+                           callback: Callable[[str, bytes], None]):
+        """Bildirim/indication aboneliği başlat (CCCD yazımı bleak tarafından yapılır)"""
+        async with self._device_lock(mac_address):
+            async with self._semaphore():
+                client = self._client(mac_address)
+                await client.start_notify(
+                    char_specifier,
+                    lambda _sender, data, mac=mac_address: callback(mac, bytes(data))
+                )
+
+    async def stop_notify(self, mac_address: str, char_specifier):
+        """Bildirim aboneliğini sonlandır"""
+        async with self._device_lock(mac_address):
+            client = self._client(mac_address)
+            await client.stop_notify(char_specifier)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+BLE Poll Scheduler - Çoklu cihaz okuma zamanlayıcısı
+Her profil cihazını kendi periyodunda, monotonic saat tabanlı ve kaymasız
+son tarihlerle (deadline heap) yoklar; bağlantıları sınırlı bir havuzdan kullanır
+"""
+
+import time
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional, List, Dict, Callable
+
+logger = logging.getLogger('BLE_Scheduler')
+
+
+class PollTarget:
+    """Zamanlanmış okuma hedefi (bir profil cihazı)"""
+
+    def __init__(self, mac: str, service_uuid: str, char_uuid: str, period: float,
+                 name: str = '', profile: Optional[Dict] = None):
+        self.mac = mac.upper()
+        self.service_uuid = service_uuid
+        self.char_uuid = char_uuid
+        self.period = max(0.01, float(period))
+        self.name = name or self.mac
+        self.profile = profile or {}
+
+        # Zamanlama durumu
+        self.generation = 0
+        self.next_due = 0.0
+        self.in_flight = False
+        self.blocked_until = 0.0
+        self.connect_failures = 0
+
+        # Gecikme istatistikleri (saniye)
+        self.polls = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+        self.total_lateness = 0.0
+        self.overruns = 0
+        self.skipped = 0
+
+    @property
+    def key(self):
+        return (self.mac, self.service_uuid.lower(), self.char_uuid.lower())
+
+    def record_lateness(self, lateness: float):
+        self.polls += 1
+        self.last_lateness = lateness
+        self.total_lateness += lateness
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+
+    def stats(self) -> Dict:
+        return {
+            'name': self.name,
+            'mac': self.mac,
+            'period_ms': round(self.period * 1000),
+            'polls': self.polls,
+            'last_lateness_ms': round(self.last_lateness * 1000, 3),
+            'avg_lateness_ms': round(self.total_lateness / self.polls * 1000, 3) if self.polls else 0.0,
+            'max_lateness_ms': round(self.max_lateness * 1000, 3),
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'connect_failures': self.connect_failures
+        }
+
+
+class PollScheduler:
+    """Deadline sıralı (heap) okuma zamanlayıcısı
+
+    dispatch(target) okumayı başlatır ve bir Future döndürür; zamanlayıcı
+    thread'i hiçbir zaman okuma süresi kadar bloklanmaz. Bir sonraki son tarih
+    önceki son tarihe periyot eklenerek hesaplanır, böylece okuma süresi
+    periyoda eklenmez (kayma olmaz).
+    """
+
+    def __init__(self, dispatch: Callable[[PollTarget], Future],
+                 clock: Callable[[], float] = time.monotonic,
+                 stats_log_interval: float = 60.0):
+        self.dispatch = dispatch
+        self.clock = clock
+        self.stats_log_interval = stats_log_interval
+        self.targets: Dict[tuple, PollTarget] = {}
+        self._heap = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def set_targets(self, targets: List[PollTarget]):
+        """Hedef listesini güncelle; periyodu değişmeyen hedeflerin son tarihleri korunur"""
+        now = self.clock()
+        with self._cond:
+            new_targets = {}
+            for target in targets:
+                existing = self.targets.get(target.key)
+                if existing and existing.period == target.period:
+                    existing.name = target.name
+                    existing.profile = target.profile
+                    new_targets[target.key] = existing
+                    continue
+                if existing:
+                    # Periyot değişti: istatistikleri koru, yeni son tarihle yeniden zamanla
+                    existing.period = target.period
+                    existing.name = target.name
+                    existing.profile = target.profile
+                    target = existing
+                target.generation += 1
+                target.next_due = now
+                self._push(target)
+                new_targets[target.key] = target
+            # Listeden çıkan hedeflerin heap kayıtları pop edilirken atlanır
+            self.targets = new_targets
+            self._cond.notify()
+
+    def _push(self, target: PollTarget):
+        self._seq += 1
+        heapq.heappush(self._heap, (target.next_due, self._seq, target.generation, target))
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='ble-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        next_report = self.clock() + self.stats_log_interval
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _seq, generation, target = self._heap[0]
+                now = self.clock()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._heap)
+                if self.targets.get(target.key) is not target or generation != target.generation:
+                    continue
+
+                # Kaymasız bir sonraki son tarih; kaçırılan periyotlar atlanır
+                next_due = due + target.period
+                if next_due <= now:
+                    missed = int((now - next_due) // target.period) + 1
+                    next_due += missed * target.period
+                    target.skipped += missed
+                target.next_due = next_due
+                self._push(target)
+
+            self._poll(target, due, now)
+
+            if now >= next_report:
+                self.log_stats()
+                next_report = now + self.stats_log_interval
+
+    def _poll(self, target: PollTarget, due: float, now: float):
+        if now < target.blocked_until:
+            return
+        target.record_lateness(now - due)
+        if target.in_flight:
+            # Önceki okuma hâlâ sürüyor; aynı cihaza ikinci işlem gönderilmez
+            target.overruns += 1
+            return
+        target.in_flight = True
+        try:
+            future = self.dispatch(target)
+        except Exception as e:
+            target.in_flight = False
+            logger.error(f"Okuma başlatılamadı ({target.name}): {e}")
+            return
+
+        def done(_future, t=target):
+            t.in_flight = False
+
+        future.add_done_callback(done)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Cihaz başına zamanlama gecikmesi istatistikleri"""
+        return {target.name: target.stats() for target in list(self.targets.values())}
+
+    def log_stats(self):
+        for stats in self.stats().values():
+            logger.info(
+                f"Zamanlama [{stats['name']}]: periyot={stats['period_ms']}ms "
+                f"gecikme ort={stats['avg_lateness_ms']}ms maks={stats['max_lateness_ms']}ms "
+                f"taşma={stats['overruns']} atlanan={stats['skipped']}"
+            )
+
+
+class ConnectionPool:
+    """Adaptör limitiyle sınırlı BLE bağlantı havuzu
+
+    Havuz doluyken yeni bir cihaz istendiğinde en uzun süredir kullanılmayan
+    boşta bağlantı kapatılır (LRU). Tüm bağlantılar kullanımdaysa bekler.
+    """
+
+    def __init__(self, connect: Callable[[str], bool], disconnect: Callable[[str], None],
+                 is_connected: Callable[[str], bool], max_connections: int = 5):
+        self._connect = connect
+        self._disconnect = disconnect
+        self._is_connected = is_connected
+        self.max_connections = max(1, int(max_connections))
+        self._leases: 'OrderedDict[str, int]' = OrderedDict()
+        self._cond = threading.Condition()
+        self.evictions = 0
+
+    def acquire(self, mac_address: str, timeout: Optional[float] = None) -> bool:
+        """Cihaz için bağlantı al (gerekirse bağlan); başarısızsa False"""
+        victim = None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while mac_address not in self._leases and len(self._leases) >= self.max_connections:
+                victim = next((mac for mac, users in self._leases.items() if users == 0), None)
+                if victim:
+                    del self._leases[victim]
+                    self.evictions += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self._leases[mac_address] = self._leases.get(mac_address, 0) + 1
+            self._leases.move_to_end(mac_address)
+
+        if victim:
+            logger.debug(f"Bağlantı havuzu dolu, boşta bağlantı kapatılıyor: {victim}")
+            self._disconnect(victim)
+
+        if self._is_connected(mac_address) or self._connect(mac_address):
+            return True
+        self.release(mac_address, drop=True)
+        return False
+
+    def resize(self, max_connections: int):
+        """Bağlantı limitini değiştir; fazla boşta bağlantılar sonraki isteklerde kapatılır"""
+        with self._cond:
+            self.max_connections = max(1, int(max_connections))
+            self._cond.notify_all()
+
+    def release(self, mac_address: str, drop: bool = False):
+        """Bağlantıyı havuza geri ver; drop=True ise kaydı sil (bağlantı yok)"""
+        with self._cond:
+            users = self._leases.get(mac_address)
+            if users is None:
+                return
+            if drop and users <= 1:
+                del self._leases[mac_address]
+            else:
+                self._leases[mac_address] = max(0, users - 1)
+            self._cond.notify()
+
+    def forget(self, mac_address: str):
+        """Dışarıdan kapatılan bağlantının kaydını sil"""
+        with self._cond:
+            if self._leases.pop(mac_address, None) is not None:
+                self._cond.notify()
+
+    def size(self) -> int:
+        return len(self._leases)
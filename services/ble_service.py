@@ -4,80 +4,275 @@ BLE Service - Bluetooth Low Energy Haberleşme Servisi
 Raspberry Pi için BLE cihazlarıyla haberleşme servisi
 """
 
+import os
+import sys
 import json
 import time
 import logging
+import signal
 import threading
-import requests
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 
-# MQTT kütüphanesi
-try:
-    import paho.mqtt.client as mqtt
-    MQTT_AVAILABLE = True
-except ImportError:
-    MQTT_AVAILABLE = False
+# Script olarak çalıştırıldığında services paketini bulabilmek için proje kökünü ekle
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 
-# BLE kütüphaneleri (bluepy veya bleak)
-try:
-    from bluepy import btle
-    USE_BLUEPY = True
-except ImportError:
-    try:
-        import asyncio
-        from bleak import BleakScanner, BleakClient
-        USE_BLUEPY = False
-    except ImportError:
-        print("HATA: BLE kütüphanesi bulunamadı. 'pip install bluepy' veya 'pip install bleak' kurun")
-        USE_BLUEPY = None
+from services.gatt_cache import GattHandleCache
+from services.ble_scheduler import PollTarget, PollScheduler, ConnectionPool
+from services.telemetry_batcher import TelemetryBatcher, encode_record
+from services.message_store import create_message_store
+from services.forward_queue import ForwardQueue
+from services.config_watcher import ConfigWatcher, diff_config
+from services.live_telemetry import LivePublisher
+from services.value_decoder import compile_profile, ExpressionError
+from services.metrics import Counter, Gauge, Histogram, start_http_server
 
-# Logging yapılandırması
-LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
+# BLE kütüphaneleri (bluepy veya bleak) ve MQTT istemcisi import sırasında değil,
+# servis başladığında / MQTT forwarder seçildiğinde yüklenir (load_ble_backend, load_mqtt)
+btle = None
+BleakEngine = None
+USE_BLUEPY = None
+mqtt = None
+MQTT_AVAILABLE = None
+# Yüklü backend'in hangi tercihle seçildiği (None: henüz yüklenmedi)
+_BLE_BACKEND_LOADED = None
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_DIR / 'ble_service.log'),
-        logging.StreamHandler()
-    ]
-)
+LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
 logger = logging.getLogger('BLE_Service')
 
-if not MQTT_AVAILABLE:
-    logger.warning("paho-mqtt bulunamadı. MQTT desteği devre dışı.")
-
 # Yollar
 BASE_DIR = Path(__file__).resolve().parent.parent
 CONFIG_FILE = BASE_DIR / "config" / "gateway.json"
+GATT_CACHE_FILE = BASE_DIR / "data" / "ble_gatt_cache.json"
+# API worker'larının canlı veri soketleri (API ile aynı dizin olmalı)
+LIVE_TELEMETRY_DIR = Path(os.getenv("LIVE_TELEMETRY_DIR", str(BASE_DIR / "data" / "live")))
+
+# Prometheus metriklerinin sunulduğu port (0: kapalı; supervisor altında GATEWAY_METRICS_PORT kullanılır)
+BLE_METRICS_PORT = int(os.getenv("BLE_METRICS_PORT", "9101"))
+# Kimlik doğrulamasız uç nokta: dışarıdan kazınacaksa 0.0.0.0 veya arayüz adresi verilir
+BLE_METRICS_HOST = os.getenv("BLE_METRICS_HOST", "127.0.0.1")
+# BLE kütüphanesi: auto (bleak, yoksa bluepy), bleak veya bluepy; verilirse ble.backend ayarını ezer
+BLE_BACKEND = os.getenv("BLE_BACKEND", "")
+
+# ThingsBoard Gateway config'i (paketleme limitleri buradan okunur)
+TB_GATEWAY_CONFIG_DIR = Path(os.getenv("TB_GATEWAY_CONFIG_DIR", "/etc/thingsboard-gateway/config"))
+TB_GATEWAY_CONFIG_FILE = TB_GATEWAY_CONFIG_DIR / "tb_gateway.json"
+
+# GATT sabitleri (bildirim aboneliği için)
+GATT_CCCD_UUID = 0x2902
+GATT_CHAR_DECLARATION_UUID = 0x2803
+GATT_PROP_NOTIFY = 0x10
+GATT_PROP_INDICATE = 0x20
+
+# Konfigürasyon değişikliklerinin uygulanma şekli (anahtar grupları)
+# Döngüler her turda okur, ek işlem gerekmez
+LIVE_CONFIG_KEYS = {
+    'scan_interval', 'auto_reconnect', 'connection_control', 'connection_timeout',
+    'write_interval', 'mqtt_topic', 'devices', 'schedule_stats_interval'
+}
+# Zamanlayıcı hedefleri yeniden hesaplanır, bağlantılar korunur
+SCHEDULE_CONFIG_KEYS = {'profiles', 'read_interval', 'server_mac', 'service_uuid', 'characteristic_uuid'}
+# Paket limitleri yerinde güncellenir
+BATCH_CONFIG_KEYS = {'max_payload_size_bytes', 'min_pack_size_to_send', 'min_pack_send_delay_ms'}
+# Sadece uplink (MQTT/HTTPS) yeniden kurulur, BLE bağlantılarına dokunulmaz
+FORWARDER_CONFIG_KEYS = {
+    'forwarder_type', 'mqtt_server', 'mqtt_port', 'mqtt_access_token',
+    'https_server', 'https_port', 'https_endpoint', 'https_access_token',
+    'https_max_in_flight', 'https_timeout', 'https_gzip', 'https_gzip_min_size'
+}
+# Paketli modda forwarder thread'inin kuyruktan tek seferde aldığı en fazla okuma
+FORWARD_BATCH_SIZE = 256
+
+# Gönderim hattı (kuyruk, paketleyici, depo) yeniden kurulur
+PIPELINE_CONFIG_KEYS = {'batch_publish', 'storage', 'forward_queue_size', 'forward_queue_policy', 'forward_workers'}
+
+# Prometheus metrikleri (supervisor altında diğer servislerle aynı registry'de)
+BLE_CONNECT_ATTEMPTS = Counter('gateway_ble_connect_attempts_total', 'BLE bağlantı denemeleri')
+BLE_CONNECT_FAILURES = Counter('gateway_ble_connect_failures_total', 'Başarısız BLE bağlantı denemeleri')
+BLE_CONNECTED_DEVICES = Gauge('gateway_ble_connected_devices', 'Bağlı BLE cihaz sayısı')
+BLE_GATT_READ_SECONDS = Histogram('gateway_ble_gatt_read_seconds', 'GATT karakteristik okuma süresi')
+BLE_GATT_READ_FAILURES = Counter('gateway_ble_gatt_read_failures_total', 'Başarısız GATT okumaları')
+BLE_PUBLISH_SECONDS = Histogram('gateway_ble_publish_seconds', 'Forwarder gönderim süresi', ['forwarder'])
+BLE_PUBLISH_FAILURES = Counter('gateway_ble_publish_failures_total', 'Başarısız gönderimler', ['forwarder'])
+BLE_SENT_BYTES = Counter('gateway_ble_sent_bytes_total', 'Forwarder ile başarıyla gönderilen payload byte sayısı',
+                         ['forwarder'])
+# Hata serileri sıfırla başlar: rate() ilk hatadan önce de 0 döner
+for _forwarder in ('mqtt', 'https'):
+    BLE_PUBLISH_FAILURES.labels(_forwarder)
+
+
+def configure_logging():
+    """Dosya + konsol loglamasını kur (script olarak çalıştırıldığında)"""
+    LOG_DIR.mkdir(exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_DIR / 'ble_service.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+
+def load_ble_backend(preference: str = 'auto') -> Optional[bool]:
+    """BLE kütüphanesini yükle: True bluepy, False bleak, None yok
+
+    preference: 'auto' eşzamanlı okuma yapan bleak'i tercih eder, kurulu değilse
+    bluepy kullanılır; 'bleak' / 'bluepy' sadece o kütüphaneyi dener.
+    BLE_BACKEND ortam değişkeni verilmişse ayarın yerine geçer.
+    """
+    global btle, BleakEngine, USE_BLUEPY, _BLE_BACKEND_LOADED
+    preference = (BLE_BACKEND or preference or 'auto').strip().lower()
+    if preference not in ('auto', 'bleak', 'bluepy'):
+        logger.warning(f"Bilinmeyen BLE backend '{preference}', auto kullanılıyor")
+        preference = 'auto'
+    if _BLE_BACKEND_LOADED == preference:
+        return USE_BLUEPY
+    _BLE_BACKEND_LOADED = preference
+    USE_BLUEPY = None
+    if preference in ('auto', 'bleak'):
+        try:
+            from services.ble_engine import BleakEngine
+            USE_BLUEPY = False
+        except ImportError:
+            pass
+    if USE_BLUEPY is None and preference in ('auto', 'bluepy'):
+        try:
+            from bluepy import btle
+            USE_BLUEPY = True
+        except ImportError:
+            pass
+    if USE_BLUEPY is None:
+        logger.error(f"BLE kütüphanesi bulunamadı (backend: {preference}). "
+                     f"'pip install bleak' veya 'pip install bluepy' kurun")
+    else:
+        logger.info(f"BLE backend: {'bluepy' if USE_BLUEPY else 'bleak'}")
+    return USE_BLUEPY
+
+
+def load_mqtt() -> bool:
+    """paho-mqtt'yi ilk çağrıda yükle"""
+    global mqtt, MQTT_AVAILABLE
+    if MQTT_AVAILABLE is None:
+        try:
+            import paho.mqtt.client as mqtt
+            MQTT_AVAILABLE = True
+        except ImportError:
+            logger.warning("paho-mqtt bulunamadı. MQTT desteği devre dışı.")
+            MQTT_AVAILABLE = False
+    return MQTT_AVAILABLE
 
 
 class BLEService:
     """BLE Haberleşme Servisi"""
     
-    def __init__(self):
+    def __init__(self, live: Optional[LivePublisher] = None, mqtt_pool=None, loop=None):
+        # live / mqtt_pool: supervisor altında diğer servislerle paylaşılan yayıncı ve MQTT bağlantıları
+        # loop: verilirse bleak motoru kendi thread'i yerine bu event loop'ta çalışır (supervisor döngüsü)
+        self.loop = loop
         self.config = None
         self.running = False
         self.connected_devices = {}
         self.scan_thread = None
-        self.read_thread = None
+        self.scheduler = None
+        self.pool = None
+        self.poll_executor = None
         self.write_thread = None
+        self.notify_thread = None
         self.mqtt_client = None
+        self.mqtt_pool = mqtt_pool
+        self.https_forwarder = None
+        # Okuma ile gönderim arasındaki sınırlı kuyruk; yavaş uplink okuma periyodunu bozmaz
+        self.forward_queue = None
+        self.forward_threads = []
+        self.batcher = None
+        self.store = None
+        self.drain_thread = None
+        self._drain_event = threading.Event()
+        self._drain_stop = threading.Event()
+        self._config_lock = threading.Lock()
+        # Canlı izleme: okumalar bağlı API worker'larına bloklamadan iletilir
+        self.live = live or LivePublisher(LIVE_TELEMETRY_DIR)
+        # MAC -> profil telemetry ifadelerinin derlenmiş çözme planı
+        self.decoders = {}
+        self.engine = None
+        self.gatt_cache = GattHandleCache(GATT_CACHE_FILE)
+        self.gatt_cache.load()
+        # Bu süreçte en az bir kez bağlanılmış cihazlar (yeniden bağlanma tespiti için)
+        self._seen_devices = set()
+        BLE_CONNECTED_DEVICES.set_function(lambda: len(self.connected_devices))
         
-    def load_config(self):
-        """Konfigürasyonu yükle"""
+    def read_config(self) -> Optional[Dict]:
+        """gateway.json'dan BLE bölümünü oku (hata durumunda None)"""
         try:
             with open(CONFIG_FILE, 'r') as f:
-                gateway_config = json.load(f)
-                self.config = gateway_config.get('ble', {})
-                logger.info(f"Konfigürasyon yüklendi: enabled={self.config.get('enabled')}")
-                return True
+                return json.load(f).get('ble', {})
         except Exception as e:
             logger.error(f"Konfigürasyon yükleme hatası: {e}")
+            return None
+    
+    def load_config(self):
+        """Konfigürasyonu yükle"""
+        config = self.read_config()
+        if config is None:
             return False
+        self.config = config
+        self.build_decoders()
+        logger.info(f"Konfigürasyon yüklendi: enabled={self.config.get('enabled')}")
+        return True
+    
+    def build_decoders(self):
+        """Profillerin valueExpression ifadelerini bir kez derle (okuma sırasında ayrıştırma yapılmaz)"""
+        decoders = {}
+        for profile in self.config.get('profiles', []):
+            mac = profile.get('mac', '').upper()
+            if not mac:
+                continue
+            try:
+                plan = compile_profile(profile)
+            except ExpressionError as e:
+                logger.error(f"Telemetry ifadesi derlenemedi, ham veri gönderilecek: {e}")
+                continue
+            if plan is not None:
+                decoders[mac] = plan
+        self.decoders = decoders
+    
+    def telemetry_fields(self, mac_address: str, data: bytes) -> Dict:
+        """Profil tanımlıysa çözülmüş telemetry değerleri, değilse ham veri (hex)"""
+        plan = self.decoders.get(mac_address)
+        if plan is not None:
+            values = plan.decode(data)
+            if values:
+                return {'values': values}
+        return {'data': data.hex(), 'data_length': len(data)}
+    
+    def telemetry_records(self, items: List[Tuple[str, bytes, int]]) -> List[Tuple[str, Dict]]:
+        """Kuyruktan alınan okumaları paket kayıtlarına çevir (aynı cihazın okumaları toplu çözülür)"""
+        by_device = {}
+        for index, (mac_address, data, _ts) in enumerate(items):
+            by_device.setdefault(mac_address, []).append(index)
+        
+        records = [None] * len(items)
+        for mac_address, indices in by_device.items():
+            plan = self.decoders.get(mac_address)
+            decoded = plan.decode_many([items[i][1] for i in indices]) if plan is not None else None
+            for position, index in enumerate(indices):
+                _mac, data, ts = items[index]
+                values = decoded[position] if decoded is not None else None
+                if values:
+                    records[index] = (mac_address, {'ts': ts, 'values': values})
+                else:
+                    records[index] = (mac_address, {'ts': ts, 'data': data.hex(), 'data_length': len(data)})
+        return records
+    
+    def _live_message(self, item: Tuple[str, bytes, int]) -> Dict:
+        # Canlı izleme thread'inde çağrılır: okuma thread'i çözme yapmaz
+        mac_address, data, ts = item
+        return {'mac_address': mac_address, 'ts': ts, **self.telemetry_fields(mac_address, data)}
     
     def scan_devices(self) -> List[Dict]:
         """BLE cihazlarını tara"""
@@ -119,27 +314,24 @@ class BLEService:
         
         return devices
     
+    def _get_engine(self) -> 'BleakEngine':
+        """bleak motorunu döndür (gerekirse oluşturup başlat)"""
+        if self.engine is None:
+            self.engine = BleakEngine(
+                max_concurrent_ops=self.config.get('max_concurrent_gatt_ops', 4),
+                connect_timeout=self.config.get('connection_timeout', 30),
+                loop=self.loop
+            )
+            self.engine.start()
+        return self.engine
+    
     def _scan_bleak(self) -> List[Dict]:
-        """bleak kullanarak tarama (async)"""
+        """bleak kullanarak tarama (motorun kalıcı event loop'unda)"""
         devices = []
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            async def scan():
-                scanner = BleakScanner()
-                scan_results = await scanner.discover(timeout=self.config.get('scan_interval', 10))
-                
-                for device in scan_results:
-                    devices.append({
-                        'mac': device.address,
-                        'name': device.name or device.address,
-                        'rssi': device.rssi if hasattr(device, 'rssi') else 0,
-                        'connectable': True
-                    })
-            
-            loop.run_until_complete(scan())
-            loop.close()
+            timeout = self.config.get('scan_interval', 10)
+            engine = self._get_engine()
+            devices = engine.run(engine.scan(timeout), timeout=timeout + 10)
         except Exception as e:
             logger.error(f"bleak tarama hatası: {e}")
         
@@ -151,11 +343,21 @@ class BLEService:
             logger.info(f"Cihaz zaten bağlı: {mac_address}")
             return True
         
+        BLE_CONNECT_ATTEMPTS.inc()
         try:
             if USE_BLUEPY:
                 client = btle.Peripheral(mac_address)
             else:
-                client = None  # bleak için async gerekli
+                engine = self._get_engine()
+                timeout = self.config.get('connection_timeout', 30)
+                engine.run(engine.connect(mac_address, timeout), timeout=timeout + 5)
+                client = engine.clients.get(mac_address)
+            
+            # Yeniden bağlanmada cihaz değişmiş olabilir; havuz bağlantıları sık
+            # yenilendiği için handle'lar silinmez, tek sorguyla yeniden doğrulanır
+            if mac_address in self._seen_devices:
+                self.gatt_cache.unverify(mac_address)
+            self._seen_devices.add(mac_address)
             
             self.connected_devices[mac_address] = {
                 'client': client,
@@ -168,6 +370,7 @@ class BLEService:
             return True
             
         except Exception as e:
+            BLE_CONNECT_FAILURES.inc()
             logger.error(f"Bağlantı hatası ({mac_address}): {e}")
             return False
     
@@ -179,12 +382,53 @@ class BLEService:
                     client = self.connected_devices[mac_address]['client']
                     if client:
                         client.disconnect()
+                elif self.engine:
+                    self.engine.run(self.engine.disconnect(mac_address), timeout=10)
             except Exception as e:
                 logger.error(f"Bağlantı kesme hatası ({mac_address}): {e}")
             
             del self.connected_devices[mac_address]
             logger.info(f"Cihaz bağlantısı kesildi: {mac_address}")
     
+    def resolve_handle(self, mac_address: str, service_uuid: str, char_uuid: str) -> int:
+        """Karakteristik value handle'ını önbellekten al, yoksa GATT keşfi ile çözümle"""
+        handle = self.gatt_cache.get(mac_address, service_uuid, char_uuid)
+        if handle is not None:
+            if self.gatt_cache.is_verified(mac_address, service_uuid, char_uuid):
+                return handle
+            # Diskten gelen handle bu bağlantıda bir kez doğrulanır
+            if self._verify_handle(mac_address, char_uuid, handle):
+                self.gatt_cache.mark_verified(mac_address, service_uuid, char_uuid)
+                return handle
+            self.gatt_cache.invalidate(mac_address)
+        
+        if USE_BLUEPY:
+            client = self.connected_devices[mac_address]['client']
+            service = client.getServiceByUUID(service_uuid)
+            handle = service.getCharacteristics(char_uuid)[0].getHandle()
+        else:
+            handle = self.engine.resolve_handle(mac_address, service_uuid, char_uuid)
+        
+        self.gatt_cache.put(mac_address, service_uuid, char_uuid, handle)
+        self.gatt_cache.save()
+        logger.debug(f"GATT handle çözümlendi: {mac_address} {char_uuid} -> 0x{handle:04x}")
+        return handle
+    
+    def _verify_handle(self, mac_address: str, char_uuid: str, handle: int) -> bool:
+        """Önbellekteki handle'ın hâlâ aynı karakteristiğe ait olduğunu kontrol et"""
+        try:
+            if USE_BLUEPY:
+                # Tek bir handle aralığı sorgusu; tam servis keşfinden çok daha ucuz
+                client = self.connected_devices[mac_address]['client']
+                characteristics = client.getCharacteristics(startHnd=max(1, handle - 1), endHnd=handle)
+                expected = btle.UUID(char_uuid)
+                return any(c.getHandle() == handle and c.uuid == expected for c in characteristics)
+            else:
+                return self.engine.verify_handle(mac_address, char_uuid, handle)
+        except Exception as e:
+            logger.debug(f"Handle doğrulama başarısız ({mac_address}): {e}")
+            return False
+    
     def read_characteristic(self, mac_address: str, service_uuid: str, char_uuid: str) -> Optional[bytes]:
         """Karakteristik değerini oku"""
         if mac_address not in self.connected_devices:
@@ -192,22 +436,31 @@ class BLEService:
             return None
         
         try:
+            handle = self.resolve_handle(mac_address, service_uuid, char_uuid)
+            started = time.perf_counter()
             if USE_BLUEPY:
                 client = self.connected_devices[mac_address]['client']
-                service = client.getServiceByUUID(service_uuid)
-                characteristic = service.getCharacteristics(char_uuid)[0]
-                value = characteristic.read()
+                value = client.readCharacteristic(handle)
+                BLE_GATT_READ_SECONDS.observe(time.perf_counter() - started)
                 
                 self.connected_devices[mac_address]['last_read'] = datetime.now()
                 logger.debug(f"Okuma başarılı: {mac_address} -> {value.hex()}")
                 return value
             else:
-                # bleak için async implementasyon gerekli
-                logger.warning("bleak için async implementasyon gerekli")
-                return None
+                value = self.engine.run(self.engine.read(mac_address, handle), timeout=30)
+                BLE_GATT_READ_SECONDS.observe(time.perf_counter() - started)
+                
+                self.connected_devices[mac_address]['last_read'] = datetime.now()
+                logger.debug(f"Okuma başarılı: {mac_address} -> {value.hex()}")
+                return value
                 
         except Exception as e:
+            BLE_GATT_READ_FAILURES.inc()
             logger.error(f"Okuma hatası ({mac_address}): {e}")
+            self.gatt_cache.invalidate(mac_address)
+            # bleak bağlantısı koptuysa kaydı sil ki auto_reconnect yeniden bağlanabilsin
+            if not USE_BLUEPY and self.engine and not self.engine.is_connected(mac_address):
+                self.connected_devices.pop(mac_address, None)
             return None
     
     def write_characteristic(self, mac_address: str, service_uuid: str, char_uuid: str, value: bytes) -> bool:
@@ -217,22 +470,24 @@ class BLEService:
             return False
         
         try:
+            handle = self.resolve_handle(mac_address, service_uuid, char_uuid)
             if USE_BLUEPY:
                 client = self.connected_devices[mac_address]['client']
-                service = client.getServiceByUUID(service_uuid)
-                characteristic = service.getCharacteristics(char_uuid)[0]
-                characteristic.write(value)
+                client.writeCharacteristic(handle, value, withResponse=True)
                 
                 self.connected_devices[mac_address]['last_write'] = datetime.now()
                 logger.debug(f"Yazma başarılı: {mac_address} -> {value.hex()}")
                 return True
             else:
-                # bleak için async implementasyon gerekli
-                logger.warning("bleak için async implementasyon gerekli")
-                return False
+                self.engine.run(self.engine.write(mac_address, handle, value), timeout=30)
+                
+                self.connected_devices[mac_address]['last_write'] = datetime.now()
+                logger.debug(f"Yazma başarılı: {mac_address} -> {value.hex()}")
+                return True
                 
         except Exception as e:
             logger.error(f"Yazma hatası ({mac_address}): {e}")
+            self.gatt_cache.invalidate(mac_address)
             return False
     
     def start_scanning(self):
@@ -245,9 +500,9 @@ class BLEService:
                 try:
                     devices = self.scan_devices()
                     
-                    # Konfigürasyondaki server MAC'e bağlan
+                    # Konfigürasyondaki server MAC'e bağlan (okuma modunda havuz bağlanır)
                     server_mac = self.config.get('server_mac', '').upper()
-                    if server_mac and server_mac not in self.connected_devices:
+                    if server_mac and server_mac not in self.connected_devices and not self.pool:
                         # MAC adresini bul
                         for device in devices:
                             if device['mac'].upper() == server_mac:
@@ -265,42 +520,200 @@ class BLEService:
         self.scan_thread.start()
         logger.info("BLE tarama başlatıldı")
     
+    def build_poll_targets(self) -> List[PollTarget]:
+        """Profillerden (ve eski tekil server_mac ayarından) okuma hedeflerini oluştur"""
+        targets = []
+        seen = set()
+        for profile in self.config.get('profiles', []) or []:
+            mac = (profile.get('mac') or '').upper()
+            service_uuid = profile.get('service_uuid', '')
+            char_uuid = profile.get('characteristic_uuid', '')
+            if not (mac and service_uuid and char_uuid):
+                continue
+            target = PollTarget(
+                mac, service_uuid, char_uuid,
+                period=profile.get('poll_period', 10000) / 1000.0,
+                name=profile.get('name', ''),
+                profile=profile
+            )
+            if target.key not in seen:
+                seen.add(target.key)
+                targets.append(target)
+        
+        # Eski tekil cihaz ayarı read_interval periyoduyla yoklanır
+        server_mac = self.config.get('server_mac', '').upper()
+        service_uuid = self.config.get('service_uuid', '')
+        char_uuid = self.config.get('characteristic_uuid', '')
+        if server_mac and service_uuid and char_uuid:
+            target = PollTarget(
+                server_mac, service_uuid, char_uuid,
+                period=self.config.get('read_interval', 1000) / 1000.0
+            )
+            if target.key not in seen:
+                targets.append(target)
+        return targets
+    
+    def _poll_target(self, target: PollTarget):
+        """Tek bir hedefi oku ve gönder (havuzdan bağlantı alarak)"""
+        profile = target.profile
+        if not self.pool.acquire(target.mac):
+            # Profilin bağlantı yeniden deneme ayarlarına göre bekle
+            target.connect_failures += 1
+            retries = profile.get('connect_retry', 3)
+            if retries and target.connect_failures % retries == 0:
+                wait = profile.get('wait_after_retries', 30)
+            else:
+                wait = profile.get('connect_retry_seconds', 10)
+            target.blocked_until = time.monotonic() + wait
+            return
+        
+        value = None
+        try:
+            value = self.read_characteristic(target.mac, target.service_uuid, target.char_uuid)
+        finally:
+            # Okuma başarısızsa bağlantı güvenilmez; kapat ki bir sonraki periyotta yeniden kurulsun
+            if value is None and target.mac in self.connected_devices:
+                self.disconnect_device(target.mac)
+            self.pool.release(target.mac, drop=target.mac not in self.connected_devices)
+        
+        if value:
+            logger.debug(f"Okunan veri [{target.name}]: {value.hex()}")
+            # Veriyi MQTT veya HTTPS'e gönder
+            self.send_data(target.mac, value)
+    
     def start_reading(self):
-        """Periyodik okuma başlat"""
-        if self.read_thread and self.read_thread.is_alive():
+        """Zamanlanmış çoklu cihaz okumayı başlat"""
+        if self.scheduler:
+            self.scheduler.set_targets(self.build_poll_targets())
+            return
+        
+        max_connections = self.config.get('max_connections', 5)
+        self.pool = ConnectionPool(
+            connect=self.connect_device,
+            disconnect=self.disconnect_device,
+            is_connected=lambda mac: mac in self.connected_devices,
+            max_connections=max_connections
+        )
+        self.poll_executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix='ble-poll')
+        self.scheduler = PollScheduler(
+            dispatch=lambda target: self.poll_executor.submit(self._poll_target, target),
+            stats_log_interval=self.config.get('schedule_stats_interval', 60)
+        )
+        targets = self.build_poll_targets()
+        self.scheduler.set_targets(targets)
+        self.scheduler.start()
+        logger.info(f"BLE okuma başlatıldı: {len(targets)} cihaz, en fazla {max_connections} bağlantı")
+    
+    def get_schedule_stats(self) -> Dict[str, Dict]:
+        """Cihaz başına okuma zamanlaması gecikme istatistikleri"""
+        return self.scheduler.stats() if self.scheduler else {}
+    
+    def _on_notification(self, mac_address: str, data: bytes):
+        """Gelen bildirimi gönderim kuyruğuna bırak (bildirim alımı hiçbir zaman bloklanmaz)"""
+        logger.debug(f"Bildirim alındı: {mac_address} -> {data.hex()}")
+        self.send_data(mac_address, data, block=False)
+    
+    def subscribe_notifications(self, mac_address: str, service_uuid: str, char_uuid: str) -> bool:
+        """Karakteristik bildirimlerine abone ol (CCCD'yi etkinleştir)"""
+        try:
+            handle = self.resolve_handle(mac_address, service_uuid, char_uuid)
+            if USE_BLUEPY:
+                client = self.connected_devices[mac_address]['client']
+                
+                # Karakteristik özelliklerine göre notify veya indicate seç
+                declarations = client.getCharacteristics(startHnd=max(1, handle - 1), endHnd=handle)
+                properties = declarations[0].properties if declarations else GATT_PROP_NOTIFY
+                if properties & GATT_PROP_NOTIFY or not properties & GATT_PROP_INDICATE:
+                    cccd_value = b'\x01\x00'
+                else:
+                    cccd_value = b'\x02\x00'
+                
+                # CCCD, value handle'dan sonra ve bir sonraki karakteristikten önce yer alır
+                cccd_handle = None
+                for descriptor in client.getDescriptors(startHnd=handle + 1, endHnd=handle + 4):
+                    if descriptor.uuid == btle.UUID(GATT_CHAR_DECLARATION_UUID):
+                        break
+                    if descriptor.uuid == btle.UUID(GATT_CCCD_UUID):
+                        cccd_handle = descriptor.handle
+                        break
+                if cccd_handle is None:
+                    logger.error(f"CCCD bulunamadı, karakteristik bildirim desteklemiyor: {char_uuid}")
+                    return False
+                
+                service = self
+                
+                class NotificationDelegate(btle.DefaultDelegate):
+                    def handleNotification(self, cHandle, data):
+                        if cHandle == handle:
+                            service._on_notification(mac_address, data)
+                
+                client.withDelegate(NotificationDelegate())
+                client.writeCharacteristic(cccd_handle, cccd_value, withResponse=True)
+            else:
+                self.engine.run(
+                    self.engine.start_notify(mac_address, handle, self._on_notification),
+                    timeout=30
+                )
+            
+            logger.info(f"Bildirim aboneliği başlatıldı: {mac_address} -> {char_uuid}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Bildirim aboneliği hatası ({mac_address}): {e}")
+            self.gatt_cache.invalidate(mac_address)
+            return False
+    
+    def start_notifications(self):
+        """Bildirim tabanlı okuma başlat (read_notify modu)"""
+        if self.notify_thread and self.notify_thread.is_alive():
             return
         
-        def read_loop():
+        def notify_loop():
+            subscribed = None
             while self.running and self.config.get('enabled'):
                 try:
                     server_mac = self.config.get('server_mac', '').upper()
                     service_uuid = self.config.get('service_uuid', '')
                     char_uuid = self.config.get('characteristic_uuid', '')
-                    read_interval = self.config.get('read_interval', 1000) / 1000.0
-                    operation_mode = self.config.get('operation_mode', 'read')
                     
-                    if server_mac and service_uuid and char_uuid:
-                        if operation_mode in ['read', 'read_write', 'read_notify']:
-                            if server_mac in self.connected_devices:
-                                value = self.read_characteristic(server_mac, service_uuid, char_uuid)
-                                if value:
-                                    logger.info(f"Okunan veri: {value.hex()}")
-                                    # Veriyi MQTT veya HTTPS'e gönder
-                                    self.send_data(server_mac, value)
-                            else:
-                                # Bağlantı yoksa bağlanmayı dene
-                                if self.config.get('auto_reconnect', False):
-                                    self.connect_device(server_mac)
+                    if not (server_mac and service_uuid and char_uuid):
+                        time.sleep(1)
+                        continue
+                    
+                    if server_mac not in self.connected_devices:
+                        subscribed = None
+                        # Bağlantı yoksa bağlanmayı dene
+                        if not (self.config.get('auto_reconnect', False) and self.connect_device(server_mac)):
+                            time.sleep(self.config.get('read_interval', 1000) / 1000.0)
+                            continue
                     
-                    time.sleep(read_interval)
+                    target = (server_mac, service_uuid, char_uuid)
+                    if subscribed != target:
+                        if not self.subscribe_notifications(*target):
+                            time.sleep(self.config.get('read_interval', 1000) / 1000.0)
+                            continue
+                        subscribed = target
+                    
+                    if USE_BLUEPY:
+                        # Bildirim gelene kadar bloklar; delegate veriyi hemen iletir
+                        client = self.connected_devices[server_mac]['client']
+                        client.waitForNotifications(1.0)
+                    else:
+                        # bleak bildirimleri motor loop'unda gelir, burada sadece bağlantı izlenir
+                        time.sleep(1.0)
+                        if not self.engine.is_connected(server_mac):
+                            self.connected_devices.pop(server_mac, None)
                     
                 except Exception as e:
-                    logger.error(f"Okuma döngüsü hatası: {e}")
+                    logger.error(f"Bildirim döngüsü hatası: {e}")
+                    subscribed = None
+                    if server_mac:
+                        self.disconnect_device(server_mac)
                     time.sleep(1)
         
-        self.read_thread = threading.Thread(target=read_loop, daemon=True)
-        self.read_thread.start()
-        logger.info("BLE okuma başlatıldı")
+        self.notify_thread = threading.Thread(target=notify_loop, daemon=True)
+        self.notify_thread.start()
+        logger.info("BLE bildirim dinleme başlatıldı")
     
     def start_writing(self):
         """Periyodik yazma başlat"""
@@ -336,7 +749,7 @@ class BLEService:
     
     def setup_mqtt(self):
         """MQTT client'ı kur"""
-        if not MQTT_AVAILABLE:
+        if not load_mqtt():
             logger.error("MQTT kütüphanesi bulunamadı")
             return False
         
@@ -349,14 +762,20 @@ class BLEService:
                 logger.warning("MQTT server belirtilmemiş")
                 return False
             
-            self.mqtt_client = mqtt.Client(client_id=f"gateway_ble_{int(time.time())}")
+            if self.mqtt_pool is not None:
+                self.mqtt_client = self.mqtt_pool.acquire(mqtt_server, mqtt_port, access_token)
+                return True
+            
+            client = mqtt.Client(client_id=f"gateway_ble_{int(time.time())}")
             
             # Access token varsa username olarak kullan
             if access_token:
-                self.mqtt_client.username_pw_set(access_token)
+                client.username_pw_set(access_token)
             
-            self.mqtt_client.connect(mqtt_server, mqtt_port, 60)
-            self.mqtt_client.loop_start()
+            client.connect(mqtt_server, mqtt_port, 60)
+            client.loop_start()
+            # Bağlantı kurulamazsa istemci tutulmaz: sonraki gönderim yeniden bağlanmayı dener
+            self.mqtt_client = client
             
             logger.info(f"MQTT bağlantısı kuruldu: {mqtt_server}:{mqtt_port}")
             return True
@@ -380,11 +799,13 @@ class BLEService:
             payload = {
                 'mac_address': mac_address,
                 'timestamp': datetime.now().isoformat(),
-                'data': data.hex(),
-                'data_length': len(data)
+                **self.telemetry_fields(mac_address, data)
             }
             
-            result = self.mqtt_client.publish(topic, json.dumps(payload))
+            body = json.dumps(payload)
+            started = time.perf_counter()
+            result = self.mqtt_client.publish(topic, body)
+            self._record_publish('mqtt', started, len(body), result.rc == mqtt.MQTT_ERR_SUCCESS)
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 logger.debug(f"MQTT'ye gönderildi: {topic} -> {payload}")
@@ -394,64 +815,401 @@ class BLEService:
                 return False
                 
         except Exception as e:
+            BLE_PUBLISH_FAILURES.labels('mqtt').inc()
             logger.error(f"MQTT gönderim hatası: {e}")
             return False
     
+    def _record_publish(self, forwarder: str, started: float, size: int, ok: bool):
+        """Gönderim süresini ve sonucunu metriklere işle"""
+        BLE_PUBLISH_SECONDS.labels(forwarder).observe(time.perf_counter() - started)
+        if ok:
+            BLE_SENT_BYTES.labels(forwarder).inc(size)
+        else:
+            BLE_PUBLISH_FAILURES.labels(forwarder).inc()
+    
+    def _https_url(self) -> Optional[str]:
+        """HTTPS forwarder URL'ini oluştur (server yoksa None)"""
+        https_server = self.config.get('https_server', '')
+        https_port = self.config.get('https_port', 443)
+        https_endpoint = self.config.get('https_endpoint', '/api/v1/telemetry')
+        
+        if not https_server:
+            return None
+        
+        # URL oluştur (port varsa ekle)
+        server = https_server.rstrip('/')
+        # Eğer server'da zaten port varsa (örn: api.example.com:8443) kullan, yoksa port ekle
+        if ':' not in server.split('/')[-1]:
+            if https_port != 443:  # 443 varsayılan HTTPS portu, eklemeye gerek yok
+                return f"https://{server}:{https_port}{https_endpoint}"
+            return f"https://{server}{https_endpoint}"
+        return f"https://{server}{https_endpoint}"
+    
+    def _https_headers(self) -> Dict[str, str]:
+        headers = {
+            'Content-Type': 'application/json'
+        }
+        access_token = self.config.get('https_access_token', '')
+        if access_token:
+            headers['Authorization'] = f'Bearer {access_token}'
+        return headers
+    
+    def setup_https(self):
+        """HTTPS forwarder'ı kur (kalıcı bağlantı havuzu)"""
+        url = self._https_url()
+        if not url:
+            logger.warning("HTTPS server belirtilmemiş")
+            return
+        
+        # requests sadece HTTPS forwarder seçildiğinde yüklenir
+        from services.https_forwarder import HttpsForwarder
+        self.https_forwarder = HttpsForwarder(
+            url,
+            headers=self._https_headers(),
+            max_in_flight=self.config.get('https_max_in_flight', 4),
+            timeout=self.config.get('https_timeout', 10),
+            gzip_enabled=self.config.get('https_gzip', False),
+            gzip_min_size=self.config.get('https_gzip_min_size', 1024)
+        )
+        logger.info(
+            f"HTTPS forwarder hazır: {url} (eşzamanlı istek: {self.https_forwarder.max_in_flight}, "
+            f"gzip: {'açık' if self.https_forwarder.gzip_enabled else 'kapalı'})"
+        )
+    
     def send_data_https(self, mac_address: str, data: bytes):
         """Veriyi HTTPS üzerinden gönder"""
+        if not self.https_forwarder:
+            logger.warning("HTTPS server belirtilmemiş")
+            return False
+        
+        # Payload
+        payload = {
+            'mac_address': mac_address,
+            'timestamp': datetime.now().isoformat(),
+            **self.telemetry_fields(mac_address, data)
+        }
+        
+        # POST isteği gönder (havuzdaki açık bağlantı üzerinden)
+        body = json.dumps(payload).encode('utf-8')
+        started = time.perf_counter()
+        ok = self.https_forwarder.send(body)
+        self._record_publish('https', started, len(body), ok)
+        if ok:
+            logger.debug(f"HTTPS'ye gönderildi: {self.https_forwarder.url} -> {payload}")
+            return True
+        return False
+    
+    def load_tb_gateway_config(self) -> Dict:
+        """ThingsBoard Gateway config'ini oku (yoksa veya okunamazsa boş)"""
         try:
-            https_server = self.config.get('https_server', '')
-            https_port = self.config.get('https_port', 443)
-            https_endpoint = self.config.get('https_endpoint', '/api/v1/telemetry')
-            access_token = self.config.get('https_access_token', '')
-            
-            if not https_server:
-                logger.warning("HTTPS server belirtilmemiş")
+            if TB_GATEWAY_CONFIG_FILE.exists():
+                with open(TB_GATEWAY_CONFIG_FILE, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"ThingsBoard Gateway config okunamadı, varsayılanlar kullanılıyor: {e}")
+        return {}
+    
+    def load_batch_settings(self) -> Dict[str, int]:
+        """Paketleme limitlerini oku: tb_gateway.json, BLE ayarları ile ezilebilir"""
+        thingsboard = self.load_tb_gateway_config().get('thingsboard', {})
+        settings = {
+            'max_payload_size': thingsboard.get('maxPayloadSizeBytes', 8196),
+            'min_pack_size': thingsboard.get('minPackSizeToSend', 500),
+            'min_pack_send_delay_ms': thingsboard.get('minPackSendDelayMS', 50)
+        }
+        
+        overrides = {
+            'max_payload_size': self.config.get('max_payload_size_bytes'),
+            'min_pack_size': self.config.get('min_pack_size_to_send'),
+            'min_pack_send_delay_ms': self.config.get('min_pack_send_delay_ms')
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return settings
+    
+    def send_batch_mqtt(self, payload: bytes) -> bool:
+        """Paketlenmiş payload'ı MQTT üzerinden gönder"""
+        if not self.mqtt_client:
+            if not self.setup_mqtt():
                 return False
-            
-            # URL oluştur (port varsa ekle)
-            server = https_server.rstrip('/')
-            # Eğer server'da zaten port varsa (örn: api.example.com:8443) kullan, yoksa port ekle
-            if ':' not in server.split('/')[-1]:
-                if https_port != 443:  # 443 varsayılan HTTPS portu, eklemeye gerek yok
-                    url = f"https://{server}:{https_port}{https_endpoint}"
-                else:
-                    url = f"https://{server}{https_endpoint}"
-            else:
-                url = f"https://{server}{https_endpoint}"
-            
-            # Headers
-            headers = {
-                'Content-Type': 'application/json'
-            }
-            
-            if access_token:
-                headers['Authorization'] = f'Bearer {access_token}'
-            
-            # Payload
-            payload = {
-                'mac_address': mac_address,
-                'timestamp': datetime.now().isoformat(),
-                'data': data.hex(),
-                'data_length': len(data)
-            }
-            
-            # POST isteği gönder
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                logger.debug(f"HTTPS'ye gönderildi: {url} -> {payload}")
+        
+        try:
+            topic = self.config.get('mqtt_topic', '') or 'gateway/ble/data'
+            started = time.perf_counter()
+            result = self.mqtt_client.publish(topic, payload)
+            self._record_publish('mqtt', started, len(payload), result.rc == mqtt.MQTT_ERR_SUCCESS)
+            if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 return True
-            else:
-                logger.error(f"HTTPS gönderim hatası: {response.status_code} - {response.text}")
-                return False
-                
+            logger.error(f"MQTT gönderim hatası: {result.rc}")
+            return False
         except Exception as e:
-            logger.error(f"HTTPS gönderim hatası: {e}")
+            BLE_PUBLISH_FAILURES.labels('mqtt').inc()
+            logger.error(f"MQTT gönderim hatası: {e}")
             return False
     
-    def send_data(self, mac_address: str, data: bytes):
-        """Veriyi forwarder tipine göre gönder"""
+    def send_batch_https(self, payload: bytes) -> bool:
+        """Paketlenmiş payload'ı HTTPS üzerinden gönder"""
+        if not self.https_forwarder:
+            logger.warning("HTTPS server belirtilmemiş")
+            return False
+        started = time.perf_counter()
+        ok = self.https_forwarder.send(payload)
+        self._record_publish('https', started, len(payload), ok)
+        return ok
+    
+    def send_batch(self, payload: bytes) -> bool:
+        """Paketlenmiş payload'ı forwarder tipine göre gönder"""
+        forwarder_type = self.config.get('forwarder_type', 'mqtt')
+        if forwarder_type == 'mqtt':
+            return self.send_batch_mqtt(payload)
+        elif forwarder_type == 'https':
+            return self.send_batch_https(payload)
+        logger.warning(f"Bilinmeyen forwarder tipi: {forwarder_type}")
+        return False
+    
+    def send_batch_async(self, payload: bytes) -> Future:
+        """Payload'ı gönder, sonucu (bool) Future olarak döndür
+
+        HTTPS forwarder istekleri arka planda eşzamanlı yürütür; eşzamanlı
+        istek limiti doluysa çağıran bekler. Diğer forwarder'lar senkron gönderir.
+        """
+        forwarder = self.https_forwarder
+        if forwarder and self.config.get('forwarder_type', 'mqtt') == 'https':
+            try:
+                future = forwarder.submit(payload)
+            except RuntimeError:
+                # Forwarder yeniden kuruluyor; paket başarısız sayılır ve depoya yazılır
+                BLE_PUBLISH_FAILURES.labels('https').inc()
+                future = Future()
+                future.set_result(False)
+                return future
+            # Süre eşzamanlı istek limitinde beklemeden sonra başlar: yalnızca isteğin kendisi ölçülür
+            started = time.perf_counter()
+            future.add_done_callback(
+                lambda f, size=len(payload): self._record_publish('https', started, size, f.result())
+            )
+            return future
+        future = Future()
+        future.set_result(self.send_batch(payload))
+        return future
+    
+    def _on_batch_sent(self, ok: bool, entries: List[Tuple[str, str]], size: int):
+        """Canlı paket gönderim sonucunu işle"""
+        if ok:
+            logger.debug(f"Paket gönderildi: {len(entries)} okuma, {size} byte")
+            # Bağlantı geri geldi: birikmiş kayıtları hemen göndermeye başla
+            if self.store is not None and len(self.store):
+                self._drain_event.set()
+        elif self.store is not None:
+            self.store.put(entries)
+            logger.warning(f"Paket gönderilemedi, {len(entries)} okuma depoya yazıldı")
+        else:
+            logger.error(f"Paket gönderilemedi: {len(entries)} okuma kaybedildi")
+    
+    def load_storage_settings(self) -> Dict:
+        """Giden kuyruk ayarlarını oku: tb_gateway.json storage limitleri, ble.storage ile ezilebilir
+
+        Depo tipi sadece ble.storage'dan alınır (varsayılan file): gönderilemeyen okumalar
+        yeniden başlatmada kaybolmaz.
+        """
+        settings = {
+            'type': 'file',
+            'data_folder_path': './data/ble_outbox/',
+            'data_file_path': './data/ble_outbox.db'
+        }
+        storage = dict(self.load_tb_gateway_config().get('storage', {}))
+        # ThingsBoard Gateway'in kendi deposunun tipi (hazır konfigürasyonda memory) ve
+        # veri yolları BLE giden kuyruğuna uygulanmaz
+        storage.pop('type', None)
+        storage.pop('data_folder_path', None)
+        storage.pop('data_file_path', None)
+        settings.update(storage)
+        settings.update(self.config.get('storage') or {})
+        settings.pop('ts', None)
+        return settings
+    
+    def _reading_payload(self, mac_address: str, encoded: str) -> bytes:
+        """Depodaki kaydı tekli gönderim payload'ına çevir (zaman damgası okuma anı)"""
+        record = json.loads(encoded)
+        ts = record.pop('ts', None)
+        timestamp = datetime.fromtimestamp(ts / 1000) if ts is not None else datetime.now()
+        payload = {'mac_address': mac_address, 'timestamp': timestamp.isoformat(), **record}
+        return json.dumps(payload).encode('utf-8')
+    
+    def _send_stored(self, entries: List[Tuple[str, str]]) -> int:
+        """Depodan okunan kayıtları gönder; baştan kesintisiz gönderilen kayıt sayısını döndür"""
+        batcher = self.batcher
+        if batcher is None:
+            # Tekli modda kayıtlar okuma başına payload olarak sırayla gönderilir
+            sent = 0
+            for mac, encoded in entries:
+                if not self.send_batch(self._reading_payload(mac, encoded)):
+                    break
+                sent += 1
+            return sent
+        
+        # Depodan gelen kayıtlar maksimum boyutlu paketlere yeniden paketlenir
+        packer = TelemetryBatcher(max_payload_size=batcher.max_payload_size)
+        for mac, encoded in entries:
+            packer.add_encoded(mac, encoded)
+        
+        # Paketler eşzamanlı gönderilebilir; yalnızca baştan kesintisiz başarılı kısım onaylanır
+        packs = packer.drain()
+        futures = [self.send_batch_async(payload) for payload, _group in packs]
+        sent = 0
+        delivered = True
+        for (_payload, group), future in zip(packs, futures):
+            delivered = delivered and future.result()
+            if delivered:
+                sent += len(group)
+        return sent
+    
+    def _spool(self, items: List[Tuple[str, bytes, int]]):
+        """Gönderilemeyen okumaları okuma anındaki zaman damgasıyla depoya yaz"""
+        self.store.put([(mac, encode_record(record)) for mac, record in self.telemetry_records(items)])
+        logger.debug(f"Okuma gönderilemedi, {len(items)} okuma depoya yazıldı")
+    
+    def start_draining(self, settings: Dict):
+        """Depodaki birikmiş okumaları bağlantı gelince gönder (paketli modda büyük paketlerle)"""
+        if self.drain_thread and self.drain_thread.is_alive():
+            return
+        
+        read_count = settings.get('read_records_count') or settings.get('max_read_records_count') or 100
+        ttl_check_interval = float(settings.get('messages_ttl_check_in_hours', 1)) * 3600
+        retry_min, retry_max = 1.0, 60.0
+        
+        self._drain_stop.clear()
+        
+        def drain_loop():
+            backoff = retry_min
+            next_expire = time.monotonic()
+            while self.running and not self._drain_stop.is_set():
+                if time.monotonic() >= next_expire:
+                    self.store.expire()
+                    next_expire = time.monotonic() + ttl_check_interval
+                
+                entries = self.store.peek(read_count) if len(self.store) else []
+                if not entries:
+                    self._drain_event.wait(min(ttl_check_interval, 60))
+                    self._drain_event.clear()
+                    continue
+                
+                sent = self._send_stored(entries)
+                self.store.ack(sent)
+                
+                if sent:
+                    logger.info(f"Depodan {sent} okuma gönderildi, kalan: {len(self.store)}")
+                    backoff = retry_min
+                else:
+                    # Bağlantı hâlâ yok; canlı gönderim başarılı olursa erken uyanılır
+                    self._drain_event.wait(backoff)
+                    self._drain_event.clear()
+                    backoff = min(backoff * 2, retry_max)
+        
+        self.drain_thread = threading.Thread(target=drain_loop, name='ble-drain', daemon=True)
+        self.drain_thread.start()
+    
+    def start_publishing(self):
+        """Paketli gönderimi hazırla (okumalar forwarder thread'inde paketlenir)"""
+        settings = self.load_batch_settings()
+        self.batcher = TelemetryBatcher(**settings)
+        logger.info(
+            f"Paketli gönderim başlatıldı: maks {settings['max_payload_size']} byte, "
+            f"min {settings['min_pack_size']} okuma veya {settings['min_pack_send_delay_ms']} ms"
+        )
+    
+    def start_storage(self):
+        """Gönderilemeyen okumaların deposunu ve boşaltma thread'ini başlat (paketli ve tekli modda)"""
+        storage_settings = self.load_storage_settings()
+        try:
+            self.store = create_message_store(storage_settings, base_dir=BASE_DIR)
+            self.start_draining(storage_settings)
+        except Exception as e:
+            logger.error(f"Giden kuyruk deposu açılamadı, gönderilemeyen okumalar kaybolacak: {e}")
+            self.store = None
+    
+    def _publish_packs(self):
+        """Paketleyicideki okumaları gönder (gönderim beklenmez)"""
+        # Eşzamanlı istek limiti dolunca submit bekler; bu sırada okumalar kuyrukta birikir
+        for payload, entries in self.batcher.drain():
+            future = self.send_batch_async(payload)
+            future.add_done_callback(
+                lambda f, entries=entries, size=len(payload): self._on_batch_sent(f.result(), entries, size)
+            )
+    
+    def _forward_loop(self):
+        """Kuyruktaki okumaları gönder (paketli modda paketleyerek)"""
+        stats_interval = self.config.get('schedule_stats_interval', 60)
+        next_report = time.monotonic() + stats_interval
+        while True:
+            if self.batcher is not None:
+                timeout = self.batcher.time_until_flush()
+                # Paket dolana kadar bekleyen okumalar tek seferde alınıp toplu çözülür
+                items = self.forward_queue.get_many(
+                    max(1, min(FORWARD_BATCH_SIZE, self.batcher.min_pack_size - len(self.batcher))),
+                    timeout=1.0 if timeout is None else timeout
+                )
+                for mac_address, record in self.telemetry_records(items):
+                    self.batcher.add(mac_address, record)
+                item = items[-1] if items else None
+                if self.batcher.ready() or (item is None and self.forward_queue.closed):
+                    self._publish_packs()
+            else:
+                item = self.forward_queue.get(timeout=1.0)
+                if item is not None:
+                    mac_address, data, _ts = item
+                    store = self.store
+                    if self.forward(mac_address, data):
+                        # Bağlantı geri geldi: birikmiş kayıtları hemen göndermeye başla
+                        if store is not None and len(store):
+                            self._drain_event.set()
+                    elif store is not None:
+                        self._spool([item])
+            
+            if item is None and self.forward_queue.closed:
+                return
+            if time.monotonic() >= next_report:
+                self.forward_queue.log_stats()
+                next_report = time.monotonic() + stats_interval
+    
+    def start_forwarding(self):
+        """Gönderim kuyruğunu ve forwarder thread'lerini başlat"""
+        if self.forward_queue is not None and not self.forward_queue.closed:
+            return
+        
+        self.forward_queue = ForwardQueue(
+            maxsize=self.config.get('forward_queue_size', 1000),
+            policy=self.config.get('forward_queue_policy', 'drop_oldest')
+        )
+        # Paketleyici thread-safe değildir: paketli modda tek forwarder thread'i
+        workers = 1 if self.batcher is not None else max(1, int(self.config.get('forward_workers', 1)))
+        self.forward_threads = []
+        for index in range(workers):
+            thread = threading.Thread(target=self._forward_loop, name=f'ble-forward-{index}', daemon=True)
+            thread.start()
+            self.forward_threads.append(thread)
+        logger.info(
+            f"Gönderim kuyruğu başlatıldı: kapasite {self.forward_queue.maxsize}, "
+            f"politika {self.forward_queue.policy}, {workers} forwarder"
+        )
+    
+    def get_queue_stats(self) -> Dict:
+        """Gönderim kuyruğu derinliği, bekleme süreleri ve atılan okuma sayaçları"""
+        return self.forward_queue.stats() if self.forward_queue is not None else {}
+    
+    def send_data(self, mac_address: str, data: bytes, block: bool = True) -> bool:
+        """Okumayı gönderim kuyruğuna bırak (kuyruk yoksa doğrudan gönder)
+
+        Zaman damgası okuma anında alınır; kuyrukta bekleme süresi veriyi etkilemez.
+        """
+        item = (mac_address, data, int(time.time() * 1000))
+        if self.live.active:
+            self.live.publish(mac_address, item, self._live_message)
+        if self.forward_queue is not None:
+            return self.forward_queue.put(item, block=block)
+        return self.forward(mac_address, data)
+    
+    def forward(self, mac_address: str, data: bytes) -> bool:
+        """Tek okumayı forwarder tipine göre gönder"""
         forwarder_type = self.config.get('forwarder_type', 'mqtt')
         
         if forwarder_type == 'mqtt':
@@ -462,6 +1220,65 @@ class BLEService:
             logger.warning(f"Bilinmeyen forwarder tipi: {forwarder_type}")
             return False
     
+    def setup_forwarder(self):
+        """Forwarder tipine göre MQTT veya HTTPS uplink'ini kur"""
+        forwarder_type = self.config.get('forwarder_type', 'mqtt')
+        if forwarder_type == 'mqtt':
+            self.setup_mqtt()
+        elif forwarder_type == 'https':
+            self.setup_https()
+    
+    def close_forwarder(self, mqtt_client, https_forwarder):
+        """Verilen uplink bağlantılarını kapat"""
+        # Havadaki HTTPS istekleri tamamlanır (başarısızlar depoya yazılır)
+        if https_forwarder:
+            https_forwarder.close()
+        if mqtt_client and self.mqtt_pool is not None:
+            self.mqtt_pool.release(mqtt_client)
+        elif mqtt_client:
+            try:
+                mqtt_client.loop_stop()
+                mqtt_client.disconnect()
+            except Exception as e:
+                logger.error(f"MQTT bağlantı kapatma hatası: {e}")
+    
+    def restart_forwarder(self):
+        """Uplink'i yeni ayarlarla yeniden kur; yeni bağlantı hazır olunca eskisi kapatılır"""
+        old_mqtt, old_https = self.mqtt_client, self.https_forwarder
+        self.mqtt_client = self.https_forwarder = None
+        self.setup_forwarder()
+        self.close_forwarder(old_mqtt, old_https)
+    
+    def start_uplink(self):
+        """Forwarder, paketleyici/depo ve gönderim kuyruğunu başlat"""
+        self.setup_forwarder()
+        # İstenirse okumalar tek tek değil paketler halinde gönderilir; paket formatı
+        # ({"<MAC>": [{ts, ...}]}) tekli mesajdan farklı olduğundan varsayılan kapalı
+        if self.config.get('batch_publish', False):
+            self.start_publishing()
+        self.start_storage()
+        self.start_forwarding()
+    
+    def stop_uplink(self):
+        """Kuyruktaki okumaları ve bekleyen paketleri gönderip uplink'i kapat"""
+        if self.forward_queue is not None:
+            self.forward_queue.close()
+            for thread in self.forward_threads:
+                thread.join(timeout=15)
+            self.forward_threads = []
+        if self.drain_thread:
+            self._drain_stop.set()
+            self._drain_event.set()
+            self.drain_thread.join(timeout=15)
+            self.drain_thread = None
+        mqtt_client, https_forwarder = self.mqtt_client, self.https_forwarder
+        self.mqtt_client = self.https_forwarder = None
+        self.close_forwarder(mqtt_client, https_forwarder)
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+        self.batcher = None
+    
     def start(self):
         """Servisi başlat"""
         if not self.load_config():
@@ -472,33 +1289,29 @@ class BLEService:
             logger.info("BLE servisi devre dışı")
             return False
         
-        if USE_BLUEPY is None:
+        if load_ble_backend(self.config.get('backend', 'auto')) is None:
             logger.error("BLE kütüphanesi bulunamadı")
             return False
         
         self.running = True
         
-        # Başlangıç taraması
-        devices = self.scan_devices()
-        logger.info(f"İlk tarama: {len(devices)} cihaz bulundu")
+        # İlk tarama tarama thread'inde yapılır: okumalar scan_interval kadar beklemez
+        operation_mode = self.config.get('operation_mode', 'read')
         
-        # Server MAC'e bağlan
+        # Server MAC'e bağlan (okuma modlarında bağlantıları havuz yönetir)
         server_mac = self.config.get('server_mac', '').upper()
-        if server_mac:
+        if server_mac and operation_mode not in ['read', 'read_write']:
             self.connect_device(server_mac)
         
-        # Forwarder'ı başlat
-        forwarder_type = self.config.get('forwarder_type', 'mqtt')
-        if forwarder_type == 'mqtt':
-            self.setup_mqtt()
-        # HTTPS için özel başlatma gerekmez
+        self.start_uplink()
         
         # Thread'leri başlat
         self.start_scanning()
         
-        operation_mode = self.config.get('operation_mode', 'read')
-        if operation_mode in ['read', 'read_write', 'read_notify']:
+        if operation_mode in ['read', 'read_write']:
             self.start_reading()
+        elif operation_mode == 'read_notify':
+            self.start_notifications()
         
         if operation_mode in ['write', 'read_write']:
             self.start_writing()
@@ -510,69 +1323,131 @@ class BLEService:
         """Servisi durdur"""
         self.running = False
         
-        # MQTT bağlantısını kapat
-        if self.mqtt_client:
-            try:
-                self.mqtt_client.loop_stop()
-                self.mqtt_client.disconnect()
-            except Exception as e:
-                logger.error(f"MQTT bağlantı kapatma hatası: {e}")
+        # Zamanlayıcıyı durdur ve süren okumaların bitmesini bekle
+        if self.scheduler:
+            self.scheduler.stop()
+            self.scheduler = None
+        if self.poll_executor:
+            self.poll_executor.shutdown(wait=True)
+            self.poll_executor = None
+        self.pool = None
+        
+        self.stop_uplink()
         
         # Tüm bağlantıları kes
         for mac in list(self.connected_devices.keys()):
             self.disconnect_device(mac)
         
+        self.gatt_cache.save()
+        
+        # bleak motorunu durdur
+        if self.engine:
+            self.engine.stop()
+            self.engine = None
+        
         # Thread'lerin bitmesini bekle
         if self.scan_thread:
             self.scan_thread.join(timeout=5)
-        if self.read_thread:
-            self.read_thread.join(timeout=5)
+        if self.notify_thread:
+            self.notify_thread.join(timeout=5)
         if self.write_thread:
             self.write_thread.join(timeout=5)
         
         logger.info("BLE servisi durduruldu")
     
     def reload_config(self):
-        """Konfigürasyonu yeniden yükle"""
-        logger.info("Konfigürasyon yeniden yükleniyor...")
-        old_enabled = self.config.get('enabled') if self.config else False
+        """Konfigürasyonu yeniden yükle ve sadece değişen kısımları uygula"""
+        new_config = self.read_config()
+        if new_config is not None:
+            with self._config_lock:
+                self.apply_config(new_config)
+    
+    def apply_config(self, new_config: Dict):
+        """Değişen anahtarlara göre gereken en küçük yeniden başlatmayı yap"""
+        changed = diff_config(self.config, new_config)
+        if not changed:
+            return
+        logger.info(f"Konfigürasyon değişti: {', '.join(sorted(changed))}")
         
-        if self.load_config():
-            new_enabled = self.config.get('enabled', False)
-            
-            if old_enabled != new_enabled:
-                if new_enabled:
-                    self.start()
-                else:
-                    self.stop()
-            else:
-                # Ayarları güncelle (bağlantı kontrolü vb.)
-                if not new_enabled:
-                    self.stop()
+        old_enabled = self.config.get('enabled', False) if self.config else False
+        self.config = new_config
+        new_enabled = new_config.get('enabled', False)
+        if 'profiles' in changed:
+            self.build_decoders()
+        
+        if old_enabled != new_enabled or not self.running:
+            if new_enabled:
+                self.start()
+            elif self.running:
+                self.stop()
+            return
+        
+        known = (LIVE_CONFIG_KEYS | SCHEDULE_CONFIG_KEYS | BATCH_CONFIG_KEYS |
+                 FORWARDER_CONFIG_KEYS | PIPELINE_CONFIG_KEYS | {'max_connections'})
+        restart_keys = changed - known
+        if restart_keys:
+            # operation_mode, max_concurrent_gatt_ops gibi yapısal ayarlar tam yeniden başlatma gerektirir
+            logger.info(f"Servis yeniden başlatılıyor ({', '.join(sorted(restart_keys))})")
+            self.stop()
+            self.start()
+            return
+        
+        if changed & PIPELINE_CONFIG_KEYS:
+            self.stop_uplink()
+            self.start_uplink()
+        elif changed & FORWARDER_CONFIG_KEYS:
+            self.restart_forwarder()
+        
+        if changed & BATCH_CONFIG_KEYS and self.batcher is not None:
+            settings = self.load_batch_settings()
+            self.batcher.configure(**settings)
+        
+        if 'max_connections' in changed and self.pool:
+            max_connections = self.config.get('max_connections', 5)
+            self.pool.resize(max_connections)
+            old_executor = self.poll_executor
+            self.poll_executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix='ble-poll')
+            old_executor.shutdown(wait=False)
+        
+        if changed & SCHEDULE_CONFIG_KEYS and self.scheduler:
+            self.start_reading()
+        
+        if 'schedule_stats_interval' in changed and self.scheduler:
+            self.scheduler.stats_log_interval = self.config.get('schedule_stats_interval', 60)
 
 
 def main():
     """Ana fonksiyon"""
+    configure_logging()
     service = BLEService()
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    
+    # gateway.json değiştiğinde yalnızca değişen ayarlar uygulanır
+    watcher = ConfigWatcher(CONFIG_FILE, service.reload_config)
+    metrics_server = None
     
     try:
-        if service.start():
-            # Servis çalışırken bekle
-            while True:
-                time.sleep(1)
-                
-                # Konfigürasyon değişikliklerini kontrol et (basit polling)
-                # Gerçek implementasyonda file watching kullanılabilir
-                service.reload_config()
-        else:
-            logger.error("Servis başlatılamadı")
+        if BLE_METRICS_PORT:
+            try:
+                metrics_server = start_http_server(BLE_METRICS_PORT, host=BLE_METRICS_HOST)
+            except OSError as e:
+                logger.error(f"Metrik sunucusu başlatılamadı (port {BLE_METRICS_PORT}): {e}")
+        if not service.start():
+            logger.error("Servis başlatılamadı, konfigürasyon değişikliği bekleniyor")
+        watcher.start()
+        while not stop_event.wait(3600):
+            pass
     
     except KeyboardInterrupt:
         logger.info("Kullanıcı tarafından durduruldu")
     except Exception as e:
         logger.error(f"Beklenmeyen hata: {e}")
     finally:
+        watcher.stop()
         service.stop()
+        if metrics_server:
+            metrics_server.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Config Watcher - Olay tabanlı konfigürasyon dosyası izleyici
+Dosya değiştiğinde (inotify / watchdog) kısa bir bekleme (debounce) sonrası
+callback'i çağırır; boşta iken dosyayı okumaz. watchdog kurulu değilse
+yalnızca dosyanın stat bilgisini kontrol eden hafif bir yoklamaya düşer.
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Callable, Set
+
+# Dosya izleme kütüphanesi
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger('Config_Watcher')
+
+
+def diff_config(old: Optional[Dict], new: Optional[Dict]) -> Set[str]:
+    """İki konfigürasyon arasında değeri değişen (eklenen/silinen dahil) anahtarlar"""
+    old = old or {}
+    new = new or {}
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def _file_signature(path: Path):
+    try:
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: 'ConfigWatcher'):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        # Atomik yazımlar (geçici dosya + rename) dest_path üzerinden gelir
+        paths = (getattr(event, 'src_path', None), getattr(event, 'dest_path', None))
+        if any(path and Path(os.fsdecode(path)).name == self.watcher.path.name for path in paths):
+            self.watcher.trigger()
+
+
+class ConfigWatcher:
+    """Dosya değişikliklerinde callback çağıran izleyici"""
+
+    def __init__(self, path: Path, on_change: Callable[[], None],
+                 debounce: float = 0.5, poll_interval: float = 5.0):
+        self.path = Path(path)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._signature = _file_signature(self.path)
+        self._timer = None
+        self._lock = threading.Lock()
+        self._observer = None
+        self._poll_thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """İzlemeyi başlat (dosyanın bulunduğu dizin izlenir)"""
+        self._stop_event.clear()
+        if WATCHDOG_AVAILABLE:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), str(self.path.parent), recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+            logger.info(f"Konfigürasyon dosyası izleniyor: {self.path}")
+        else:
+            self._poll_thread = threading.Thread(target=self._poll_loop, name='config-poll', daemon=True)
+            self._poll_thread.start()
+            logger.warning(
+                f"watchdog bulunamadı, konfigürasyon {self.poll_interval} sn'de bir stat ile kontrol ediliyor"
+            )
+
+    def stop(self):
+        self._stop_event.set()
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._poll_thread:
+            self._poll_thread.join(timeout=5)
+            self._poll_thread = None
+
+    def trigger(self):
+        """Değişiklik bildir; art arda gelen olaylar tek callback'te birleştirilir"""
+        with self._lock:
+            if self._stop_event.is_set():
+                return
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            self._timer = None
+        # İçerik değişmeden gelen olayları (ör. sadece açılıp kapanma) atla
+        signature = _file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return
+        self._signature = signature
+        try:
+            self.on_change()
+        except Exception as e:
+            logger.error(f"Konfigürasyon değişikliği uygulanamadı: {e}")
+
+    def _poll_loop(self):
+        while not self._stop_event.wait(self.poll_interval):
+            if _file_signature(self.path) != self._signature:
+                self._fire()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Forward Queue - Okuma ile gönderim arasındaki sınırlı kuyruk
+Okuma thread'leri okumaları kuyruğa bırakır, forwarder thread'leri gönderir;
+kuyruk dolduğunda yapılandırılan politika uygulanır:
+  block       : yer açılana kadar bekle (okuma hızı uplink'e uyar)
+  drop_oldest : en eski okumayı at, yenisini ekle
+  drop_newest : yeni okumayı at
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Optional, Dict, List, Any
+
+logger = logging.getLogger('Forward_Queue')
+
+POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+
+class ForwardQueue:
+    """Taşma politikalı, istatistikli sınırlı FIFO kuyruk (thread-safe)"""
+
+    def __init__(self, maxsize: int = 1000, policy: str = 'drop_oldest'):
+        if policy not in POLICIES:
+            logger.warning(f"Bilinmeyen kuyruk politikası '{policy}', drop_oldest kullanılıyor")
+            policy = 'drop_oldest'
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Sayaçlar
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.blocked_puts = 0
+        self.high_watermark = 0
+        # Bekleme süreleri (saniye): put'un yer beklemesi ve okumanın kuyrukta beklemesi
+        self.put_wait_total = 0.0
+        self.put_wait_max = 0.0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item: Any, block: bool = True) -> bool:
+        """Okumayı kuyruğa ekle; okuma atıldıysa False döner
+
+        block=False ise 'block' politikasında da beklenmez, kuyruk doluysa
+        yeni okuma atılır (event loop / bildirim callback'leri için).
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                if self.policy == 'block' and block:
+                    self.blocked_puts += 1
+                    started = time.monotonic()
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        self._cond.wait()
+                    waited = time.monotonic() - started
+                    self.put_wait_total += waited
+                    self.put_wait_max = max(self.put_wait_max, waited)
+                    if self._closed:
+                        return False
+                elif self.policy == 'drop_oldest':
+                    self._items.popleft()
+                    self.dropped_oldest += 1
+                else:
+                    self.dropped_newest += 1
+                    return False
+
+            self._items.append((time.monotonic(), item))
+            self.enqueued += 1
+            if len(self._items) > self.high_watermark:
+                self.high_watermark = len(self._items)
+            self._cond.notify_all()
+            return True
+
+    def _pop(self, now: float) -> Any:
+        enqueued_at, item = self._items.popleft()
+        waited = now - enqueued_at
+        self.dequeued += 1
+        self.queue_wait_total += waited
+        self.queue_wait_max = max(self.queue_wait_max, waited)
+        return item
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Sıradaki okumayı al; süre dolarsa veya kuyruk kapanıp boşaldıysa None"""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            item = self._pop(time.monotonic())
+            self._cond.notify_all()
+            return item
+
+    def get_many(self, max_items: int, timeout: Optional[float] = None) -> List[Any]:
+        """Bekleyen okumalardan en fazla max_items tanesini tek seferde al
+
+        Kuyruk boşsa get() gibi bekler; süre dolarsa veya kuyruk kapanıp
+        boşaldıysa boş liste döner.
+        """
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            now = time.monotonic()
+            items = [self._pop(now) for _ in range(min(max_items, len(self._items)))]
+            if items:
+                self._cond.notify_all()
+            return items
+
+    def close(self):
+        """Yeni okuma kabul etme, bekleyen put/get çağrılarını uyandır"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'policy': self.policy,
+                'depth': len(self._items),
+                'capacity': self.maxsize,
+                'high_watermark': self.high_watermark,
+                'enqueued': self.enqueued,
+                'forwarded': self.dequeued,
+                'dropped_oldest': self.dropped_oldest,
+                'dropped_newest': self.dropped_newest,
+                'blocked_puts': self.blocked_puts,
+                'avg_put_wait_ms': round(self.put_wait_total / self.blocked_puts * 1000, 3) if self.blocked_puts else 0.0,
+                'max_put_wait_ms': round(self.put_wait_max * 1000, 3),
+                'avg_queue_wait_ms': round(self.queue_wait_total / self.dequeued * 1000, 3) if self.dequeued else 0.0,
+                'max_queue_wait_ms': round(self.queue_wait_max * 1000, 3)
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(
+            f"Gönderim kuyruğu: {stats['depth']}/{stats['capacity']} (politika={stats['policy']}, "
+            f"en yüksek={stats['high_watermark']}) bekleme ort={stats['avg_queue_wait_ms']}ms "
+            f"maks={stats['max_queue_wait_ms']}ms atılan eski={stats['dropped_oldest']} "
+            f"yeni={stats['dropped_newest']} bloklanan={stats['blocked_puts']}"
+        )
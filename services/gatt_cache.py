@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+GATT Handle Cache - Çözümlenmiş karakteristik handle önbelleği
+(MAC, service UUID, characteristic UUID) -> value handle eşlemesini tutar
+ve servis yeniden başlatıldığında keşif gerekmesin diye diske kaydeder
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+
+logger = logging.getLogger('GATT_Cache')
+
+CacheKey = Tuple[str, str, str]
+
+
+def make_key(mac_address: str, service_uuid: str, char_uuid: str) -> CacheKey:
+    """Anahtarı normalize et (MAC büyük harf, UUID küçük harf)"""
+    return (mac_address.upper(), str(service_uuid).lower(), str(char_uuid).lower())
+
+
+class GattHandleCache:
+    """Karakteristik handle önbelleği (thread-safe, diske kalıcı)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._handles: Dict[CacheKey, int] = {}
+        # Bu bağlantıda doğrulanmış anahtarlar; diskten gelenler ilk kullanımda doğrulanır
+        self._verified = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def load(self):
+        """Önbelleği diskten yükle"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            with self._lock:
+                for mac, chars in data.items():
+                    for pair, handle in chars.items():
+                        service_uuid, char_uuid = pair.split('|', 1)
+                        self._handles[make_key(mac, service_uuid, char_uuid)] = int(handle)
+            logger.info(f"GATT handle önbelleği yüklendi: {len(self._handles)} kayıt")
+        except Exception as e:
+            logger.error(f"GATT handle önbelleği okunamadı, yok sayılıyor: {e}")
+
+    def save(self):
+        """Değişiklik varsa önbelleği atomik olarak diske yaz"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {}
+                for (mac, service_uuid, char_uuid), handle in self._handles.items():
+                    data.setdefault(mac, {})[f"{service_uuid}|{char_uuid}"] = handle
+                self._dirty = False
+
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix('.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.error(f"GATT handle önbelleği kaydedilemedi: {e}")
+
+    def get(self, mac_address: str, service_uuid: str, char_uuid: str) -> Optional[int]:
+        """Önbellekteki handle'ı döndür (yoksa None)"""
+        return self._handles.get(make_key(mac_address, service_uuid, char_uuid))
+
+    def is_verified(self, mac_address: str, service_uuid: str, char_uuid: str) -> bool:
+        return make_key(mac_address, service_uuid, char_uuid) in self._verified
+
+    def put(self, mac_address: str, service_uuid: str, char_uuid: str, handle: int):
+        """Keşif ile bulunan handle'ı kaydet"""
+        key = make_key(mac_address, service_uuid, char_uuid)
+        with self._lock:
+            self._verified.add(key)
+            if self._handles.get(key) != handle:
+                self._handles[key] = handle
+                self._dirty = True
+
+    def mark_verified(self, mac_address: str, service_uuid: str, char_uuid: str):
+        with self._lock:
+            self._verified.add(make_key(mac_address, service_uuid, char_uuid))
+
+    def unverify(self, mac_address: str):
+        """Cihaz handle'larını koru ama bir sonraki kullanımda yeniden doğrula"""
+        mac = mac_address.upper()
+        with self._lock:
+            self._verified = {key for key in self._verified if key[0] != mac}
+
+    def invalidate(self, mac_address: str):
+        """Cihaza ait tüm handle'ları sil (bağlantı kopması veya GATT hatası)"""
+        mac = mac_address.upper()
+        with self._lock:
+            keys = [key for key in self._handles if key[0] == mac]
+            for key in keys:
+                del self._handles[key]
+            self._verified = {key for key in self._verified if key[0] != mac}
+            if keys:
+                self._dirty = True
+        if keys:
+            logger.info(f"GATT handle önbelleği temizlendi: {mac} ({len(keys)} kayıt)")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+HTTPS Forwarder - Kalıcı bağlantı havuzlu HTTPS gönderici
+Tek bir requests.Session üzerinden keep-alive bağlantıları ve TLS
+oturumlarını yeniden kullanır, paketlenmiş payload'ları isteğe bağlı gzip ile
+sıkıştırır ve sınırlı sayıda isteği eşzamanlı yürütür
+"""
+
+import gzip
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('HTTPS_Forwarder')
+
+
+class HttpsForwarder:
+    """Keep-alive bağlantı havuzlu, eşzamanlılığı sınırlı HTTPS gönderici"""
+
+    def __init__(self, url: str, headers: Optional[Dict[str, str]] = None,
+                 max_in_flight: int = 4, timeout: float = 10.0,
+                 gzip_enabled: bool = False, gzip_min_size: int = 1024,
+                 gzip_level: int = 6, verify=True):
+        self.url = url
+        self.timeout = timeout
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.gzip_enabled = gzip_enabled
+        self.gzip_min_size = max(0, int(gzip_min_size))
+        self.gzip_level = gzip_level
+        # Oturum yerine istek başına verilir: REQUESTS_CA_BUNDLE ortam değişkeni session.verify'ı ezer
+        self.verify = verify
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        # Havuzdaki bağlantı sayısı eşzamanlı istek limitine eşit: fazladan TLS el sıkışması olmaz
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight,
+                              pool_block=True, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                            thread_name_prefix='https-forwarder')
+        self._stats_lock = threading.Lock()
+
+        # İstatistikler
+        self.requests = 0
+        self.failures = 0
+        self.payload_bytes = 0
+        self.body_bytes = 0
+
+    def _encode(self, payload: bytes):
+        if self.gzip_enabled and len(payload) >= self.gzip_min_size:
+            return gzip.compress(payload, compresslevel=self.gzip_level), {'Content-Encoding': 'gzip'}
+        return payload, None
+
+    def post(self, payload: bytes) -> bool:
+        """Payload'ı gönder ve sonucu bekle (çağıran thread'de çalışır)"""
+        body, headers = self._encode(payload)
+        ok = False
+        try:
+            response = self.session.post(self.url, data=body, headers=headers,
+                                         timeout=self.timeout, verify=self.verify)
+            if response.status_code == 200:
+                ok = True
+            else:
+                logger.error(f"HTTPS gönderim hatası: {response.status_code} - {response.text}")
+        except Exception as e:
+            logger.error(f"HTTPS gönderim hatası: {e}")
+
+        with self._stats_lock:
+            self.requests += 1
+            self.payload_bytes += len(payload)
+            self.body_bytes += len(body)
+            if not ok:
+                self.failures += 1
+        return ok
+
+    def submit(self, payload: bytes) -> Future:
+        """Payload'ı arka planda gönder; limit doluysa bir istek bitene kadar bekler
+
+        Future sonucu gönderimin başarılı olup olmadığıdır (bool).
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self.post, payload)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _future: self._slots.release())
+        return future
+
+    def send(self, payload: bytes) -> bool:
+        """Payload'ı gönder ve sonucu bekle (eşzamanlılık limitine dahil)"""
+        return self.submit(payload).result()
+
+    def close(self):
+        """Bekleyen istekleri tamamla ve bağlantıları kapat"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                'requests': self.requests,
+                'failures': self.failures,
+                'payload_bytes': self.payload_bytes,
+                'body_bytes': self.body_bytes
+            }
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Live Telemetry - BLE servisinden API'ye canlı okuma akışı
+Servis cihaz başına en yeni okumayı kısa aralıklarla paketleyip dizindeki her
+API worker'ının unix datagram soketine bloklamadan gönderir (alıcı yoksa veya
+yetişemiyorsa okuma atılır, okuma döngüsü hiçbir zaman beklemez). API
+tarafında her bağlı istemcinin kendi sınırlı tamponu vardır ve bu tampon
+anahtar (cihaz) başına sadece en yeni değeri tutar; yavaş bir istemci ne
+servisi ne de diğer istemcileri yavaşlatır.
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, Dict, List, Tuple, Callable, Any
+
+logger = logging.getLogger('Live_Telemetry')
+
+# Unix datagram soketleri (Windows'ta yok)
+UNIX_SOCKETS_AVAILABLE = hasattr(socket, 'AF_UNIX')
+
+SOCKET_SUFFIX = '.sock'
+
+
+def encode_record(key: str, message: Dict) -> bytes:
+    """Kayıt: anahtar + TAB + JSON (alıcı JSON'u çözmeden yönlendirir)"""
+    return key.encode() + b'\t' + json.dumps(message, separators=(',', ':')).encode()
+
+
+def decode_records(datagram: bytes):
+    """Datagram'daki (anahtar, JSON metni) kayıtları; kayıtlar satır satır dizilir"""
+    for line in datagram.split(b'\n'):
+        key, _, body = line.partition(b'\t')
+        if body:
+            yield key.decode(errors='replace'), body.decode(errors='replace')
+
+
+class LivePublisher:
+    """Okumaları dinleyen API worker'larına ileten yayıncı (thread-safe)
+
+    publish() sadece anahtarın en yeni değerini bir sözlüğe yazar; kodlama ve
+    gönderim ilk bekleyen değerden flush_interval sonra ayrı bir thread'de, anahtar başına tek kayıt ve
+    worker başına birkaç datagram olarak yapılır. Okuma thread'i hiçbir zaman
+    soket çağrısı yapmaz, beklemez. formatter verilirse (yayıncının veya
+    publish() çağrısının) değerler gönderimden hemen önce (sadece gönderilecek
+    en yeni değer için) mesaja çevrilir; böylece aynı süreçteki servisler tek
+    yayıncıyı paylaşabilir.
+    """
+
+    def __init__(self, directory: Path, flush_interval: float = 0.1,
+                 rescan_interval: float = 2.0, max_datagram_size: int = 32768,
+                 formatter: Optional[Callable[[Any], Dict]] = None):
+        self.directory = Path(directory)
+        self.formatter = formatter
+        self.flush_interval = flush_interval
+        self.rescan_interval = rescan_interval
+        self.max_datagram_size = max_datagram_size
+        self._targets = []
+        self._next_scan = 0.0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # Bekleyen değer yokken gönderim thread'i uyumaz, bu olayda bekler
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._sock = None
+        if UNIX_SOCKETS_AVAILABLE:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+
+        # İstatistikler (kayıt sayısı)
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def _refresh_targets(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_scan:
+                self._next_scan = now + self.rescan_interval
+                try:
+                    self._targets = sorted(
+                        str(path) for path in self.directory.iterdir() if path.name.endswith(SOCKET_SUFFIX)
+                    )
+                except FileNotFoundError:
+                    self._targets = []
+            return self._targets
+
+    def _forget(self, target: str):
+        with self._lock:
+            self._targets = [path for path in self._targets if path != target]
+
+    @property
+    def active(self) -> bool:
+        """Dinleyen en az bir API worker'ı var mı"""
+        return self._sock is not None and bool(self._refresh_targets())
+
+    def publish(self, key: str, message: Any, formatter: Optional[Callable[[Any], Dict]] = None):
+        """Anahtarın en yeni değerini bırak; gönderilmemiş eski değerin yerine geçer"""
+        if self._sock is None:
+            return
+        with self._lock:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = (message, formatter or self.formatter)
+            if not self._wakeup.is_set():
+                self._wakeup.set()
+            if self._thread is None:
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._flush_loop, name='live-telemetry', daemon=True)
+                self._thread.start()
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait()
+            # flush_interval içinde gelen değerler aynı gönderimde birleştirilir
+            if self._stop_event.wait(self.flush_interval):
+                return
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Canlı veri gönderim hatası: {e}")
+
+    def _datagrams(self, pending: Dict) -> List[Tuple[bytes, int]]:
+        datagrams, records, size = [], [], 0
+        for key, (message, formatter) in pending.items():
+            if formatter is not None:
+                message = formatter(message)
+            record = encode_record(key, message)
+            if records and size + len(record) + 1 > self.max_datagram_size:
+                datagrams.append((b'\n'.join(records), len(records)))
+                records, size = [], 0
+            records.append(record)
+            size += len(record) + 1
+        if records:
+            datagrams.append((b'\n'.join(records), len(records)))
+        return datagrams
+
+    def flush(self):
+        """Bekleyen değerleri tüm dinleyicilere gönder; alıcı doluysa atılır"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self._sock is None:
+            return
+        targets = self._refresh_targets()
+        if not targets:
+            return
+        datagrams = self._datagrams(pending)
+        for target in targets:
+            for datagram, count in datagrams:
+                try:
+                    self._sock.sendto(datagram, target)
+                    self.sent += count
+                except BlockingIOError:
+                    # Alıcının kuyruğu dolu: kayıtlar bu dinleyici için atılır
+                    self.dropped += count
+                except (FileNotFoundError, ConnectionRefusedError):
+                    # API worker'ı kapanmış; bir sonraki taramaya kadar atla
+                    self._forget(target)
+                    self.dropped += count
+                    break
+                except OSError as e:
+                    logger.debug(f"Canlı veri gönderilemedi ({target}): {e}")
+                    self.dropped += count
+
+    def close(self):
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def stats(self) -> Dict:
+        return {
+            'listeners': len(self._targets),
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped
+        }
+
+
+class LatestValueBuffer:
+    """İstemci başına tampon: anahtar başına en yeni değer, en fazla max_keys anahtar"""
+
+    def __init__(self, max_keys: int = 1024):
+        self.max_keys = max(1, max_keys)
+        self._pending = OrderedDict()
+        # asyncio sadece API tarafında yüklenir: yayıncı kullanan servislerin açılışı yavaşlamaz
+        import asyncio
+        self._event = asyncio.Event()
+        # Gönderilmeden yenisiyle değiştirilen / kapasite yüzünden atılan değerler
+        self.replaced = 0
+        self.dropped = 0
+
+    def put(self, key: str, value: str):
+        if key in self._pending:
+            self.replaced += 1
+        elif len(self._pending) >= self.max_keys:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[key] = value
+        self._event.set()
+
+    async def get(self, timeout: Optional[float] = None) -> List[str]:
+        """Bekleyen değerleri al (süre dolarsa boş liste)"""
+        import asyncio
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        values = list(self._pending.values())
+        self._pending.clear()
+        self._event.clear()
+        return values
+
+
+class LiveTelemetryHub:
+    """API worker'ında datagramları alıp bağlı istemcilerin tamponlarına dağıtan merkez"""
+
+    def __init__(self, directory: Path, max_keys: int = 1024, receive_buffer: int = 1 << 20):
+        self.directory = Path(directory)
+        self.max_keys = max_keys
+        self.receive_buffer = receive_buffer
+        self.path = self.directory / f'api-{os.getpid()}{SOCKET_SUFFIX}'
+        # Yeni bağlanan istemciye gönderilen son değerler
+        self.latest = OrderedDict()
+        self._subscribers = set()
+        self._sock = None
+        self._loop = None
+        self.received = 0
+
+    def start(self) -> bool:
+        """Soketi aç ve event loop'a bağla (çalışan loop içinden çağrılmalı)"""
+        if not UNIX_SOCKETS_AVAILABLE:
+            logger.warning("Unix soketleri desteklenmiyor, canlı veri akışı devre dışı")
+            return False
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if self.path.exists():
+                self.path.unlink()
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer)
+            sock.bind(str(self.path))
+            sock.setblocking(False)
+        except OSError as e:
+            logger.error(f"Canlı veri soketi açılamadı: {e}")
+            return False
+        import asyncio
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+        logger.info(f"Canlı veri soketi dinleniyor: {self.path}")
+        return True
+
+    def stop(self):
+        if self._sock is None:
+            return
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _on_readable(self):
+        while True:
+            try:
+                datagram = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.error(f"Canlı veri okuma hatası: {e}")
+                return
+            for key, value in decode_records(datagram):
+                self.publish(key, value)
+
+    def publish(self, key: str, value: str):
+        """Değeri tüm istemcilere dağıt (değer bir kez üretilir, istemci başına O(1))"""
+        self.received += 1
+        self.latest[key] = value
+        self.latest.move_to_end(key)
+        if len(self.latest) > self.max_keys:
+            self.latest.popitem(last=False)
+        for buffer in self._subscribers:
+            buffer.put(key, value)
+
+    def subscribe(self) -> LatestValueBuffer:
+        """Yeni istemci tamponu (mevcut son değerlerle doldurulmuş)"""
+        buffer = LatestValueBuffer(self.max_keys)
+        for key, value in self.latest.items():
+            buffer.put(key, value)
+        self._subscribers.add(buffer)
+        return buffer
+
+    def unsubscribe(self, buffer: LatestValueBuffer):
+        self._subscribers.discard(buffer)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+LoRaWAN Service - Semtech UDP Packet Forwarder Aktarıcısı
+Yerel konsantratör packet forwarder'ı (lora_pkt_fwd) ile ağ sunucusu
+arasında Semtech UDP protokolünü (PUSH_DATA / PULL_DATA / PULL_RESP / TX_ACK)
+tek asyncio döngüsünde aktarır. Forwarder'a ACK'ler yerelde verilir; sunucu
+ACK'leri token bazında izlenir, sunucuya ulaşılamadığında uplink'ler sınırlı
+bir tamponda bekletilir ve bağlantı döndüğünde sırayla gönderilir.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import random
+import socket
+import asyncio
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+# Script olarak çalıştırıldığında services paketini bulabilmek için proje kökünü ekle
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from services.config_watcher import ConfigWatcher, diff_config
+
+# Logging yapılandırması
+LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
+LOG_DIR.mkdir(exist_ok=True)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(LOG_DIR / 'lorawan_service.log'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger('LoRaWAN_Service')
+
+# Yollar
+BASE_DIR = Path(__file__).resolve().parent.parent
+CONFIG_FILE = BASE_DIR / "config" / "gateway.json"
+
+# Packet forwarder'ın (serv_port_up / serv_port_down) gönderdiği yerel adres
+DEFAULT_LOCAL_HOST = os.getenv("LORAWAN_LOCAL_HOST", "127.0.0.1")
+DEFAULT_LOCAL_PORT = 1680
+# Sunucuya PULL_DATA gönderme aralığı (NAT'ı açık tutar, erişilebilirliği ölçer)
+KEEPALIVE_INTERVAL = 10.0
+# PUSH_ACK / PULL_ACK bekleme süresi
+ACK_TIMEOUT = 2.0
+# Art arda bu kadar ACK gelmezse sunucu erişilemez sayılır
+MAX_MISSED_ACKS = 3
+# Erişilemezken tamponlanan en fazla uplink (dolunca en eski atılır)
+MAX_BUFFERED_UPLINKS = int(os.getenv("LORAWAN_MAX_BUFFERED", "1000"))
+# Bir uplink'in sunucuya en fazla gönderilme sayısı
+MAX_UPLINK_ATTEMPTS = 3
+# İstatistiklerin loglanma aralığı (saniye)
+STATS_INTERVAL = 300
+
+# Semtech UDP protokolü (sürüm 1 ve 2)
+PROTOCOL_VERSIONS = (1, 2)
+PUSH_DATA = 0x00
+PUSH_ACK = 0x01
+PULL_DATA = 0x02
+PULL_RESP = 0x03
+PULL_ACK = 0x04
+TX_ACK = 0x05
+# sürüm (1) + token (2) + tanımlayıcı (1) + gateway EUI (8)
+HEADER_SIZE = 4
+EUI_HEADER_SIZE = 12
+
+
+def parse_gateway_eui(gateway_id: Optional[str]) -> Optional[bytes]:
+    """'AA555A0000000000' / 'aa:55:...' biçimindeki gateway ID'yi 8 byte'a çevir"""
+    text = (gateway_id or '').replace(':', '').replace('-', '').strip()
+    if len(text) != 16:
+        return None
+    try:
+        return bytes.fromhex(text)
+    except ValueError:
+        return None
+
+
+class _Endpoint(asyncio.DatagramProtocol):
+    def __init__(self, on_datagram):
+        self.on_datagram = on_datagram
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.on_datagram(data, addr)
+
+    def error_received(self, exc):
+        logger.debug(f"UDP hatası: {exc}")
+
+
+class SemtechRelay:
+    """Packet forwarder ile ağ sunucusu arasındaki Semtech UDP aktarıcısı"""
+
+    def __init__(self, server_host: str, server_port: int = 1700,
+                 local_host: str = DEFAULT_LOCAL_HOST, local_port: int = DEFAULT_LOCAL_PORT,
+                 gateway_eui: Optional[bytes] = None, keepalive_interval: float = KEEPALIVE_INTERVAL,
+                 ack_timeout: float = ACK_TIMEOUT, max_missed: int = MAX_MISSED_ACKS,
+                 max_buffered: int = MAX_BUFFERED_UPLINKS):
+        self.server_host = server_host
+        self.server_port = int(server_port)
+        self.local_host = local_host
+        self.local_port = int(local_port)
+        self.gateway_eui = gateway_eui
+        self.keepalive_interval = keepalive_interval
+        self.ack_timeout = ack_timeout
+        self.max_missed = max(1, max_missed)
+        self.buffer = deque()
+        self.max_buffered = max(1, max_buffered)
+
+        self.server_addr = None
+        self.forwarder_addr = None
+        # Aksi görülene (art arda ACK kaybı) kadar sunucu erişilebilir kabul edilir
+        self.reachable = True
+        self._missed = 0
+        # token -> (gönderim zamanı, paket, gönderim sayısı)
+        self._pending = {}
+        self._pull_token = None
+        self._pull_deadline = None
+        self._local = None
+        self._upstream = None
+        self._task = None
+        # Bakım görevi bir sonraki süre dolumuna kadar uyur; yeni bir süre başlayınca uyandırılır
+        self._wakeup = asyncio.Event()
+
+        # İstatistikler
+        self.stats_counters = {
+            'uplinks': 0, 'uplinks_acked': 0, 'uplinks_buffered': 0, 'uplinks_dropped': 0,
+            'uplinks_retried': 0, 'downlinks': 0, 'downlinks_dropped': 0, 'tx_acks': 0,
+            'keepalives': 0, 'invalid': 0
+        }
+        self.relay_count = 0
+        self.relay_ns_total = 0
+        self.relay_ns_max = 0
+        self.ack_rtt_total = 0.0
+        self.ack_rtt_count = 0
+
+    async def start(self):
+        """Yerel soketi aç, sunucu adresini çöz ve bakım görevini başlat"""
+        loop = asyncio.get_running_loop()
+        self._local, _ = await loop.create_datagram_endpoint(
+            lambda: _Endpoint(self.on_local_datagram), local_addr=(self.local_host, self.local_port)
+        )
+        self._upstream, _ = await loop.create_datagram_endpoint(
+            lambda: _Endpoint(self.on_server_datagram), local_addr=('0.0.0.0', 0)
+        )
+        await self._resolve()
+        if self.server_addr is None:
+            # Adres çözülene ve sunucu ACK verene kadar uplink'ler tamponlanır
+            self.reachable = False
+        else:
+            # Önceki aktarıcıdan devralınan uplink'ler hemen gönderilir
+            self._flush_buffer()
+        self._task = asyncio.create_task(self._maintenance_loop())
+        logger.info(
+            f"Semtech UDP aktarıcı: {self.local_host}:{self.local_port} <-> "
+            f"{self.server_host}:{self.server_port}"
+        )
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for transport in (self._local, self._upstream):
+            if transport:
+                transport.close()
+        self._local = self._upstream = None
+
+    def unsent(self) -> List[Tuple[bytes, int]]:
+        """ACK beklenen ve tampondaki uplink'ler, gönderim sırasıyla (paket, gönderim sayısı)"""
+        pending = sorted(self._pending.values(), key=lambda entry: entry[0])
+        return [(packet, attempt) for _sent_at, packet, attempt in pending] + list(self.buffer)
+
+    def restore(self, uplinks: List[Tuple[bytes, int]]):
+        """Önceki aktarıcının gönderilmemiş uplink'lerini tampona al (sığmazsa en eskiler atılır)"""
+        dropped = max(0, len(self.buffer) + len(uplinks) - self.max_buffered)
+        self.buffer.extend(uplinks)
+        for _ in range(dropped):
+            self.buffer.popleft()
+        self.stats_counters['uplinks_dropped'] += dropped
+
+    @property
+    def alive(self) -> bool:
+        """Bakım görevi çalışıyor mu (beklenmeyen bir hatayla bittiyse False)"""
+        return self._task is not None and not self._task.done()
+
+    async def _resolve(self):
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                self.server_host, self.server_port, family=socket.AF_INET, type=socket.SOCK_DGRAM
+            )
+        except OSError as e:
+            logger.error(f"Sunucu adresi çözülemedi ({self.server_host}): {e}")
+            return
+        address = infos[0][4]
+        if address != self.server_addr:
+            self.server_addr = address
+            logger.info(f"Ağ sunucusu adresi: {address[0]}:{address[1]}")
+
+    # ------------------------------------------------------------------
+    # Packet forwarder -> aktarıcı
+    # ------------------------------------------------------------------
+
+    def on_local_datagram(self, data: bytes, addr: Tuple):
+        started = time.perf_counter_ns()
+        if len(data) < HEADER_SIZE or data[0] not in PROTOCOL_VERSIONS:
+            self.stats_counters['invalid'] += 1
+            return
+        identifier = data[3]
+        if identifier == PUSH_DATA and len(data) >= EUI_HEADER_SIZE:
+            self.stats_counters['uplinks'] += 1
+            if self.reachable and self.server_addr:
+                self._send_uplink(data, 1)
+            else:
+                self._buffer_uplink(data, 1)
+            # Forwarder'a ACK yerelde verilir; sunucuya teslimi aktarıcı üstlenir
+            self._local.sendto(data[:3] + bytes((PUSH_ACK,)), addr)
+            self._learn_eui(data)
+        elif identifier == PULL_DATA and len(data) >= EUI_HEADER_SIZE:
+            # PULL_RESP'ler forwarder'ın son PULL_DATA adresine gönderilir
+            self.forwarder_addr = addr
+            self._local.sendto(data[:3] + bytes((PULL_ACK,)), addr)
+            self._learn_eui(data)
+        elif identifier == TX_ACK and len(data) >= EUI_HEADER_SIZE:
+            self.stats_counters['tx_acks'] += 1
+            if self.server_addr:
+                self._upstream.sendto(data, self.server_addr)
+        else:
+            self.stats_counters['invalid'] += 1
+            return
+        self._record_relay(started)
+
+    def _learn_eui(self, data: bytes):
+        if self.gateway_eui is None:
+            self.gateway_eui = data[4:EUI_HEADER_SIZE]
+            logger.info(f"Gateway EUI forwarder'dan alındı: {self.gateway_eui.hex().upper()}")
+            self._send_keepalive()
+
+    def _send_uplink(self, packet: bytes, attempt: int):
+        self._upstream.sendto(packet, self.server_addr)
+        if not self._pending:
+            # Daha önce gönderilenler yeni paketten önce zaman aşımına uğrar; sadece ilk paket uyandırır
+            self._wakeup.set()
+        self._pending[packet[1:3]] = (time.monotonic(), packet, attempt)
+
+    def _buffer_uplink(self, packet: bytes, attempt: int):
+        if len(self.buffer) >= self.max_buffered:
+            self.buffer.popleft()
+            self.stats_counters['uplinks_dropped'] += 1
+        self.buffer.append((packet, attempt))
+        self.stats_counters['uplinks_buffered'] += 1
+
+    def _record_relay(self, started: int):
+        elapsed = time.perf_counter_ns() - started
+        self.relay_count += 1
+        self.relay_ns_total += elapsed
+        if elapsed > self.relay_ns_max:
+            self.relay_ns_max = elapsed
+
+    # ------------------------------------------------------------------
+    # Ağ sunucusu -> aktarıcı
+    # ------------------------------------------------------------------
+
+    def on_server_datagram(self, data: bytes, addr: Tuple):
+        started = time.perf_counter_ns()
+        if len(data) < HEADER_SIZE or data[0] not in PROTOCOL_VERSIONS:
+            self.stats_counters['invalid'] += 1
+            return
+        identifier, token = data[3], data[1:3]
+        if identifier == PULL_RESP:
+            if self.forwarder_addr:
+                self._local.sendto(data, self.forwarder_addr)
+                self.stats_counters['downlinks'] += 1
+            else:
+                # Forwarder henüz PULL_DATA göndermedi; downlink'i iletecek adres yok
+                self.stats_counters['downlinks_dropped'] += 1
+            self._record_relay(started)
+        elif identifier == PUSH_ACK:
+            pending = self._pending.pop(token, None)
+            if pending is not None:
+                self.stats_counters['uplinks_acked'] += 1
+                self.ack_rtt_total += time.monotonic() - pending[0]
+                self.ack_rtt_count += 1
+                self._mark_reachable()
+        elif identifier == PULL_ACK:
+            if token == self._pull_token:
+                self._pull_token = self._pull_deadline = None
+                self._mark_reachable()
+        else:
+            self.stats_counters['invalid'] += 1
+
+    def _mark_reachable(self):
+        self._missed = 0
+        if self.reachable:
+            return
+        self.reachable = True
+        logger.info(f"Ağ sunucusuna erişildi, {len(self.buffer)} tamponlanmış uplink gönderiliyor")
+        self._flush_buffer()
+
+    def _flush_buffer(self):
+        while self.buffer and self.reachable and self.server_addr:
+            packet, attempt = self.buffer.popleft()
+            self._send_uplink(packet, attempt)
+
+    def _mark_missed(self):
+        self._missed += 1
+        if self.reachable and self._missed >= self.max_missed:
+            self.reachable = False
+            logger.warning(f"Ağ sunucusundan {self._missed} ACK alınamadı, uplink'ler tamponlanıyor")
+
+    # ------------------------------------------------------------------
+    # Keepalive ve ACK takibi
+    # ------------------------------------------------------------------
+
+    async def _maintenance_loop(self):
+        next_keepalive = time.monotonic()
+        next_stats = next_keepalive + STATS_INTERVAL
+        while True:
+            now = time.monotonic()
+            self._expire_pending(now)
+
+            if self._pull_deadline is not None and now >= self._pull_deadline:
+                self._pull_token = self._pull_deadline = None
+                self._mark_missed()
+
+            if now >= next_keepalive:
+                next_keepalive = now + self.keepalive_interval
+                # Açılışta DNS hazır değilse adres her keepalive'da yeniden denenir
+                if not self.reachable or self.server_addr is None:
+                    await self._resolve()
+                self._send_keepalive()
+
+            if now >= next_stats:
+                next_stats = now + STATS_INTERVAL
+                logger.info(f"LoRaWAN aktarıcı: {self.stats()}")
+
+            # Sabit aralıkla yoklamak yerine en yakın keepalive / istatistik / ACK süresine kadar uyunur
+            deadline = min(next_keepalive, next_stats)
+            if self._pull_deadline is not None:
+                deadline = min(deadline, self._pull_deadline)
+            if self._pending:
+                deadline = min(deadline, min(sent_at for sent_at, _packet, _attempt in self._pending.values())
+                               + self.ack_timeout)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+    def _expire_pending(self, now: float):
+        limit = now - self.ack_timeout
+        expired = [token for token, (sent_at, _packet, _attempt) in self._pending.items() if sent_at <= limit]
+        for token in expired:
+            _sent_at, packet, attempt = self._pending.pop(token)
+            self._mark_missed()
+            if attempt < MAX_UPLINK_ATTEMPTS:
+                # ACK gelmeyen uplink tekrar gönderilir (sunucu tekrarları ayıklar)
+                self.stats_counters['uplinks_retried'] += 1
+                if self.reachable:
+                    self._send_uplink(packet, attempt + 1)
+                else:
+                    self._buffer_uplink(packet, attempt + 1)
+            else:
+                self.stats_counters['uplinks_dropped'] += 1
+
+    def _send_keepalive(self):
+        if self.server_addr is None or self.gateway_eui is None:
+            return
+        if self._pull_token is not None:
+            return
+        self._pull_token = random.getrandbits(16).to_bytes(2, 'big')
+        self._pull_deadline = time.monotonic() + self.ack_timeout
+        self._wakeup.set()
+        self._upstream.sendto(bytes((2,)) + self._pull_token + bytes((PULL_DATA,)) + self.gateway_eui,
+                              self.server_addr)
+        self.stats_counters['keepalives'] += 1
+
+    def stats(self) -> Dict:
+        return {
+            **self.stats_counters,
+            'reachable': self.reachable,
+            'buffered': len(self.buffer),
+            'pending_acks': len(self._pending),
+            'relay_avg_us': round(self.relay_ns_total / self.relay_count / 1000, 1) if self.relay_count else 0,
+            'relay_max_us': round(self.relay_ns_max / 1000, 1),
+            'ack_rtt_ms': round(self.ack_rtt_total / self.ack_rtt_count * 1000, 1) if self.ack_rtt_count else None
+        }
+
+
+class LoRaWANService:
+    """gateway.json lorawan bölümüne göre Semtech UDP aktarıcısını çalıştıran servis"""
+
+    def __init__(self):
+        self.config = None
+        self.relay = None
+        self.running = False
+        self.load_config()
+
+    def read_config(self) -> Optional[Dict]:
+        """gateway.json'dan lorawan bölümünü oku"""
+        try:
+            if CONFIG_FILE.exists():
+                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('lorawan', {})
+            logger.warning("Konfigürasyon dosyası bulunamadı")
+        except Exception as e:
+            logger.error(f"Konfigürasyon okuma hatası: {e}")
+        return None
+
+    def load_config(self):
+        """Konfigürasyonu yükle"""
+        self.config = self.read_config() or {}
+
+    async def start(self) -> bool:
+        """Servisi başlat"""
+        config = self.config
+        if not config.get('enabled'):
+            logger.info("LoRaWAN devre dışı")
+            return False
+        if config.get('forwarder_type') != 'udp':
+            logger.info(f"Forwarder tipi '{config.get('forwarder_type')}', UDP aktarıcı çalışmıyor")
+            return False
+        if not config.get('udp_server'):
+            logger.error("UDP sunucu adresi tanımlı değil")
+            return False
+
+        relay = SemtechRelay(
+            config['udp_server'],
+            config.get('udp_port', 1700),
+            local_port=config.get('local_port', DEFAULT_LOCAL_PORT),
+            gateway_eui=parse_gateway_eui(config.get('gateway_id'))
+        )
+        if self.relay is not None:
+            # Yeniden başlatmada ACK beklenen ve tamponlanmış uplink'ler kaybolmaz
+            relay.restore(self.relay.unsent())
+        try:
+            await relay.start()
+        except OSError as e:
+            logger.error(f"UDP aktarıcı başlatılamadı: {e}")
+            return False
+        self.relay = relay
+        self.running = True
+        return True
+
+    async def stop(self):
+        """Servisi durdur"""
+        if self.running:
+            self.running = False
+            await self.relay.stop()
+            logger.info(f"LoRaWAN servisi durduruldu: {self.relay.stats()}")
+
+    async def reload_config(self):
+        """Konfigürasyonu yeniden yükle; lorawan bölümü değiştiyse aktarıcıyı yeniden başlat"""
+        new_config = self.read_config()
+        if new_config is None:
+            return
+        changed = diff_config(self.config, new_config)
+        if not changed:
+            return
+        logger.info(f"Konfigürasyon değişti: {', '.join(sorted(changed))}")
+        self.config = new_config
+        await self.stop()
+        await self.start()
+
+
+async def run_service(stop_event: asyncio.Event):
+    service = LoRaWANService()
+    loop = asyncio.get_running_loop()
+
+    # Watcher thread'inden gelen değişiklikler event loop'ta uygulanır
+    watcher = ConfigWatcher(
+        CONFIG_FILE,
+        lambda: asyncio.run_coroutine_threadsafe(service.reload_config(), loop).result()
+    )
+    try:
+        if not await service.start():
+            logger.info("Servis başlatılmadı, konfigürasyon değişikliği bekleniyor")
+        watcher.start()
+        await stop_event.wait()
+    finally:
+        watcher.stop()
+        await service.stop()
+
+
+def main():
+    """Ana fonksiyon"""
+    async def runner():
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, stop_event.set)
+        await run_service(stop_event)
+
+    try:
+        asyncio.run(runner())
+    except KeyboardInterrupt:
+        logger.info("Kullanıcı tarafından durduruldu")
+    except Exception as e:
+        logger.error(f"Beklenmeyen hata: {e}")
+
+
+if __name__ == "__main__":
+    main()
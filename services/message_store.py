@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Message Store - Gönderilemeyen okumalar için kalıcı giden kuyruk
+ThingsBoard Gateway'in storage bölümünü izler (memory, file, sqlite):
+max_records_count, max_records_per_file, max_file_count,
+messages_ttl_in_days, read_records_count
+
+Kayıtlar (mac, kodlanmış JSON kayıt) çiftleridir; okuma peek() ile yapılır,
+gönderim başarılı olunca ack() ile silinir (en az bir kez teslim).
+SD kart yıpranmasını azaltmak için kayıt başına fsync yapılmaz ve okuma
+imleci sadece segment bittiğinde veya belirli aralıklarla diske yazılır.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+logger = logging.getLogger('Message_Store')
+
+Entry = Tuple[str, str]
+
+SECONDS_PER_DAY = 86400
+
+
+class MemoryMessageStore:
+    """Bellek içi sınırlı kuyruk (storage.type = memory)"""
+
+    def __init__(self, max_records_count: int = 100000, messages_ttl_in_days: float = 7, **_):
+        self.max_records_count = max(1, int(max_records_count))
+        self.ttl = float(messages_ttl_in_days) * SECONDS_PER_DAY
+        # (sıra no, zaman, kayıt); ack sıra numarasıyla yapılır: peek ile ack arasında
+        # taşma nedeniyle baştan atılan kayıtlar yerine gönderilmemiş kayıtlar silinmez
+        self._queue = deque()
+        self._next_seq = 0
+        self._peeked_seqs: List[int] = []
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def put(self, entries: List[Entry]):
+        now = time.time()
+        with self._lock:
+            for entry in entries:
+                self._queue.append((self._next_seq, now, entry))
+                self._next_seq += 1
+            overflow = len(self._queue) - self.max_records_count
+            for _ in range(max(0, overflow)):
+                self._queue.popleft()
+            self.dropped += max(0, overflow)
+
+    def peek(self, count: int) -> List[Entry]:
+        with self._lock:
+            peeked = list(islice(self._queue, count))
+            self._peeked_seqs = [seq for seq, _ts, _entry in peeked]
+            return [entry for _seq, _ts, entry in peeked]
+
+    def ack(self, count: int):
+        if count <= 0:
+            return
+        with self._lock:
+            if not self._peeked_seqs:
+                return
+            last_seq = self._peeked_seqs[min(count, len(self._peeked_seqs)) - 1]
+            self._peeked_seqs = []
+            while self._queue and self._queue[0][0] <= last_seq:
+                self._queue.popleft()
+
+    def expire(self):
+        limit = time.time() - self.ttl
+        with self._lock:
+            while self._queue and self._queue[0][1] < limit:
+                self._queue.popleft()
+                self.dropped += 1
+
+    def close(self):
+        pass
+
+
+class FileMessageStore:
+    """Segmentli dosya kuyruğu (storage.type = file)
+
+    Her segment en fazla max_records_per_file satır içerir; segment sayısı
+    max_file_count'u veya toplam kayıt max_records_count'u aşarsa en eski
+    segment silinir.
+    """
+
+    CURSOR_SAVE_INTERVAL = 10.0
+
+    def __init__(self, data_folder_path: str = './data/', max_records_count: int = 100000,
+                 max_records_per_file: int = 10000, max_file_count: int = 10,
+                 messages_ttl_in_days: float = 7, **_):
+        self.folder = Path(data_folder_path)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_records_count = max(1, int(max_records_count))
+        self.max_records_per_file = max(1, int(max_records_per_file))
+        self.max_file_count = max(2, int(max_file_count))
+        self.ttl = float(messages_ttl_in_days) * SECONDS_PER_DAY
+        self.cursor_file = self.folder / 'cursor.json'
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+        # segment adı -> toplam satır sayısı
+        self._segments: Dict[str, int] = {}
+        self._writer = None
+        self._writer_name = None
+        self._read_segment = None
+        self._read_offset = 0       # okuma segmentindeki byte konumu
+        self._read_line = 0         # okuma segmentinde tüketilen satır
+        self._peeked: List[Tuple[str, int, int]] = []
+        self._cursor_saved_at = 0.0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Başlangıç durumu
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        for path in sorted(self.folder.glob('data_*.dat')):
+            with open(path, 'rb') as f:
+                self._segments[path.name] = sum(1 for _ in f)
+
+        try:
+            with open(self.cursor_file, 'r') as f:
+                cursor = json.load(f)
+            if cursor.get('segment') in self._segments:
+                self._read_segment = cursor['segment']
+                self._read_offset = int(cursor.get('offset', 0))
+                self._read_line = int(cursor.get('line', 0))
+        except (FileNotFoundError, ValueError):
+            pass
+
+        # İmleçten önceki segmentler zaten gönderilmiş
+        if self._read_segment:
+            for name in list(self._segments):
+                if name < self._read_segment:
+                    self._remove_segment(name)
+        if len(self):
+            logger.info(f"Depoda gönderilmeyi bekleyen {len(self)} kayıt bulundu")
+
+    def __len__(self):
+        total = sum(self._segments.values())
+        return total - (self._read_line if self._read_segment in self._segments else 0)
+
+    # ------------------------------------------------------------------
+    # Yazma
+    # ------------------------------------------------------------------
+
+    def _new_segment_name(self) -> str:
+        last = max(self._segments, default='data_0000000000.dat')
+        return f"data_{int(last[5:15]) + 1:010d}.dat"
+
+    def _open_writer(self):
+        if self._writer:
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+            self._writer.close()
+        name = self._new_segment_name()
+        self._segments[name] = 0
+        self._writer = open(self.folder / name, 'a', encoding='utf-8')
+        self._writer_name = name
+
+    def put(self, entries: List[Entry]):
+        with self._lock:
+            index = 0
+            while index < len(entries):
+                if not self._writer or self._segments[self._writer_name] >= self.max_records_per_file:
+                    self._open_writer()
+                space = self.max_records_per_file - self._segments[self._writer_name]
+                chunk = entries[index:index + space]
+                # Tek write çağrısı; fsync sadece segment kapanırken
+                self._writer.write(''.join(f"{mac}\t{encoded}\n" for mac, encoded in chunk))
+                self._segments[self._writer_name] += len(chunk)
+                index += len(chunk)
+            self._writer.flush()
+            self._enforce_limits()
+
+    def _enforce_limits(self):
+        while len(self._segments) > self.max_file_count or \
+                (len(self) > self.max_records_count and len(self._segments) > 1):
+            oldest = min(self._segments)
+            if self._writer and oldest == self._writer_name:
+                break
+            self.dropped += self._unread_in(oldest)
+            logger.warning(f"Depo limiti aşıldı, en eski segment siliniyor: {oldest}")
+            self._remove_segment(oldest)
+
+    def _unread_in(self, name: str) -> int:
+        if name == self._read_segment:
+            return self._segments[name] - self._read_line
+        return self._segments[name]
+
+    def _remove_segment(self, name: str):
+        self._segments.pop(name, None)
+        try:
+            (self.folder / name).unlink()
+        except FileNotFoundError:
+            pass
+        if name == self._read_segment:
+            self._read_segment = None
+            self._read_offset = 0
+            self._read_line = 0
+            self._peeked = []
+        elif any(peeked[0] == name for peeked in self._peeked):
+            # Okunan segment limit nedeniyle silindi: sonraki ack hiçbir şey onaylamaz, kayıtlar yeniden okunur
+            self._peeked = []
+        if self._writer and name == self._writer_name:
+            self._writer.close()
+            self._writer = None
+
+    # ------------------------------------------------------------------
+    # Okuma
+    # ------------------------------------------------------------------
+
+    def peek(self, count: int) -> List[Entry]:
+        with self._lock:
+            if self._writer:
+                self._writer.flush()
+            entries = []
+            self._peeked = []
+            segment = self._read_segment if self._read_segment in self._segments else None
+            offset, line = (self._read_offset, self._read_line) if segment else (0, 0)
+            names = sorted(self._segments)
+            if segment is None and names:
+                segment = names[0]
+
+            while segment and len(entries) < count:
+                with open(self.folder / segment, 'rb') as f:
+                    f.seek(offset)
+                    for raw in f:
+                        offset += len(raw)
+                        line += 1
+                        mac, _, encoded = raw.decode('utf-8').rstrip('\n').partition('\t')
+                        entries.append((mac, encoded))
+                        self._peeked.append((segment, offset, line))
+                        if len(entries) >= count:
+                            break
+                if len(entries) >= count:
+                    break
+                later = [name for name in names if name > segment]
+                segment = later[0] if later else None
+                offset, line = 0, 0
+            return entries
+
+    def ack(self, count: int):
+        if count <= 0:
+            return
+        with self._lock:
+            if not self._peeked:
+                return
+            segment, offset, line = self._peeked[min(count, len(self._peeked)) - 1]
+            self._peeked = []
+            # Tamamen tüketilen eski segmentleri sil
+            for name in sorted(self._segments):
+                if name >= segment:
+                    break
+                self._remove_segment(name)
+            finished = line >= self._segments.get(segment, 0) and \
+                not (self._writer and segment == self._writer_name)
+            if finished:
+                self._remove_segment(segment)
+                self._save_cursor(force=True)
+                return
+            self._read_segment, self._read_offset, self._read_line = segment, offset, line
+            self._save_cursor()
+
+    def _save_cursor(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._cursor_saved_at < self.CURSOR_SAVE_INTERVAL:
+            return
+        self._cursor_saved_at = now
+        try:
+            tmp_path = self.cursor_file.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'segment': self._read_segment, 'offset': self._read_offset,
+                           'line': self._read_line}, f)
+            os.replace(tmp_path, self.cursor_file)
+        except Exception as e:
+            logger.error(f"Depo imleci kaydedilemedi: {e}")
+
+    def expire(self):
+        """TTL süresi dolan segmentleri sil (segmentin son yazma zamanına göre)"""
+        limit = time.time() - self.ttl
+        with self._lock:
+            for name in sorted(self._segments):
+                if self._writer and name == self._writer_name:
+                    continue
+                try:
+                    expired = (self.folder / name).stat().st_mtime < limit
+                except FileNotFoundError:
+                    expired = True
+                if expired:
+                    self.dropped += self._unread_in(name)
+                    logger.info(f"Süresi dolan segment siliniyor: {name}")
+                    self._remove_segment(name)
+
+    def close(self):
+        with self._lock:
+            if self._writer:
+                self._writer.flush()
+                os.fsync(self._writer.fileno())
+                self._writer.close()
+                self._writer = None
+            if self._read_segment:
+                self._save_cursor(force=True)
+
+
+class SQLiteMessageStore:
+    """SQLite kuyruğu (storage.type = sqlite), WAL modunda"""
+
+    def __init__(self, data_file_path: str = './data/data.db', max_records_count: int = 100000,
+                 messages_ttl_in_days: float = 7, **_):
+        self.path = Path(data_file_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_records_count = max(1, int(max_records_count))
+        self.ttl = float(messages_ttl_in_days) * SECONDS_PER_DAY
+        self._lock = threading.Lock()
+        self._peeked_ids: List[int] = []
+        self.dropped = 0
+
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        # WAL + synchronous=NORMAL: commit başına fsync yok, SD kart dostu
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS messages ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, mac TEXT NOT NULL, record TEXT NOT NULL)'
+        )
+        self._db.commit()
+        self._count = self._db.execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+
+    def __len__(self):
+        return self._count
+
+    def put(self, entries: List[Entry]):
+        now = time.time()
+        with self._lock:
+            with self._db:
+                self._db.executemany(
+                    'INSERT INTO messages (ts, mac, record) VALUES (?, ?, ?)',
+                    [(now, mac, encoded) for mac, encoded in entries]
+                )
+                self._count += len(entries)
+                overflow = self._count - self.max_records_count
+                if overflow > 0:
+                    self._db.execute(
+                        'DELETE FROM messages WHERE id IN (SELECT id FROM messages ORDER BY id LIMIT ?)',
+                        (overflow,)
+                    )
+                    self._count -= overflow
+                    self.dropped += overflow
+
+    def peek(self, count: int) -> List[Entry]:
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT id, mac, record FROM messages ORDER BY id LIMIT ?', (count,)
+            ).fetchall()
+            self._peeked_ids = [row[0] for row in rows]
+            return [(row[1], row[2]) for row in rows]
+
+    def ack(self, count: int):
+        if count <= 0:
+            return
+        with self._lock:
+            if not self._peeked_ids:
+                return
+            last_id = self._peeked_ids[min(count, len(self._peeked_ids)) - 1]
+            self._peeked_ids = []
+            with self._db:
+                deleted = self._db.execute('DELETE FROM messages WHERE id <= ?', (last_id,)).rowcount
+            self._count = max(0, self._count - deleted)
+
+    def expire(self):
+        with self._lock:
+            with self._db:
+                deleted = self._db.execute(
+                    'DELETE FROM messages WHERE ts < ?', (time.time() - self.ttl,)
+                ).rowcount
+            self._count = max(0, self._count - deleted)
+            self.dropped += deleted
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def create_message_store(settings: Dict, base_dir: Optional[Path] = None):
+    """storage ayarlarına göre depo oluştur (göreli yollar base_dir'e göre)"""
+    settings = dict(settings)
+    store_type = settings.pop('type', 'memory')
+    for key in ('data_folder_path', 'data_file_path'):
+        if key in settings and base_dir is not None and not Path(settings[key]).is_absolute():
+            settings[key] = str(base_dir / settings[key])
+
+    if store_type == 'file':
+        return FileMessageStore(**settings)
+    if store_type == 'sqlite':
+        return SQLiteMessageStore(**settings)
+    if store_type != 'memory':
+        logger.warning(f"Bilinmeyen depo tipi '{store_type}', bellek deposu kullanılıyor")
+    return MemoryMessageStore(**settings)
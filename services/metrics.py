@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Metrics - Prometheus metin formatında sayaç, gösterge ve histogramlar
+prometheus_client kurulu olmayan cihazlar için hafif bir registry: etiket
+kombinasyonu başına seri ilk kullanımda bir kez oluşturulur, sıcak yoldaki
+her ölçüm kısa bir kilit altında birkaç toplama işlemidir. Her süreç kendi
+REGISTRY'sini sunar: API /api/metrics, BLE servisi ve supervisor ise
+start_http_server() ile açılan /metrics üzerinden.
+"""
+
+import math
+import bisect
+import socket
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger('Metrics')
+
+# Prometheus metin formatı sürümü
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Varsayılan histogram sınırları (saniye)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Registry:
+    """Süreçteki metriklerin listesi ve metin çıktısı"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, '_Metric'] = {}
+
+    def register(self, metric: '_Metric'):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Tüm metrikleri Prometheus metin formatında döndür"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    """Etiketli seri tablosu; etiketsiz metrikte tek seri doğrudan kullanılır"""
+
+    type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+        # Çağrıda verilen (str'ye çevrilmemiş) değerlerden seriye kısa yol
+        self._lookup: Dict[tuple, object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Etiket değerlerine ait seri (yoksa oluşturulur)"""
+        child = self._lookup.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: {len(self.labelnames)} etiket bekleniyordu")
+            key = tuple(str(value) for value in values)
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+                self._lookup[values] = child
+        return child
+
+    def _samples(self, key: Tuple[str, ...], child) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {_escape(self.documentation)}', f'# TYPE {self.name} {self.type}']
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            lines.extend(self._samples(key, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        # acquire/release, with bloğundan belirgin şekilde ucuz (sıcak yol)
+        self._lock.acquire()
+        try:
+            self.value += amount
+        finally:
+            self._lock.release()
+
+
+class Counter(_Metric):
+    """Sadece artan sayaç"""
+
+    type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+    def _samples(self, key, child) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}']
+
+
+class _GaugeChild:
+    __slots__ = ('_lock', 'value', 'function')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self._lock.acquire()
+        try:
+            self.value += amount
+        finally:
+            self._lock.release()
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Değer çıktı üretilirken fonksiyondan okunur (sıcak yolda maliyet yok)"""
+        self.function = function
+
+    def get(self) -> float:
+        function = self.function
+        return function() if function is not None else self.value
+
+
+class Gauge(_Metric):
+    """Artıp azalabilen anlık değer"""
+
+    type = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._children[()].dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._children[()].set_function(function)
+
+    def _samples(self, key, child) -> List[str]:
+        try:
+            value = child.get()
+        except Exception as e:
+            logger.debug(f"{self.name} değeri okunamadı: {e}")
+            return []
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}']
+
+
+class _HistogramChild:
+    __slots__ = ('_lock', '_bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        # Kova başına (kümülatif olmayan) sayılar; son eleman +Inf kovası
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._bounds, value)
+        self._lock.acquire()
+        try:
+            self.counts[index] += 1
+            self.sum += value
+        finally:
+            self._lock.release()
+
+
+class Histogram(_Metric):
+    """Sabit sınırlı kovalarda dağılım (süreler saniye cinsinden)"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional[Registry] = REGISTRY):
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def _samples(self, key, child) -> List[str]:
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+        names = self.labelnames + ('le',)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}')
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class _MetricsServer(ThreadingHTTPServer):
+    """İstek gelene kadar uyuyan sunucu (serve_forever her 0,5 sn'de uyanır)"""
+
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _serve(self):
+        while not self._stopping.is_set():
+            self.handle_request()
+
+    def serve_in_background(self):
+        self._thread = threading.Thread(target=self._serve, name='metrics-http', daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        """Sunucuyu durdur: bekleyen handle_request() kendi soketine bağlanılarak uyandırılır"""
+        self._stopping.set()
+        host, port = self.server_address[:2]
+        try:
+            socket.create_connection(('127.0.0.1' if host == '0.0.0.0' else host, port), timeout=1).close()
+        except OSError as e:
+            logger.debug(f"Metrik sunucusu uyandırılamadı: {e}")
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.server_close()
+
+
+def start_http_server(port: int, host: str = '127.0.0.1', registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Registry'yi arka plan thread'inde GET /metrics ile sun; durdurmak için shutdown()
+
+    Uç nokta kimlik doğrulamasızdır: varsayılan olarak sadece cihazın kendisinden erişilir.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = _MetricsServer((host, port), MetricsHandler)
+    server.serve_in_background()
+    logger.info(f"Metrikler yayında: http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Modbus RTU - Register okuma istemcisi ve blok birleştirme
+Register haritasındaki noktalar fonksiyon koduna (FC3 holding / FC4 input)
+göre sıralanır; bitişik veya aralarında az boşluk olan register'lar tek PDU'nun
+izin verdiği en fazla 125 register'lık bloklarda birleştirilir. Yavaş,
+yarı-dubleks hatta her istek yerine sadece gereken kadar istek gider. Bir blok
+boşluklardaki tanımsız adresler yüzünden reddedilirse (exception 02) blok en
+büyük boşluğundan bölünür ve bu plan kalıcı olarak kullanılır.
+
+Çerçeveleme sabit bir timeout yerine hattın zamanlamasıyla yapılır: karakter
+süresi baud / veri / parite / stop bitlerinden hesaplanır, istekler arasında
+3.5 karakter sessizlik bırakılır ve yanıt beklenen uzunlukta veya sessizlikte
+biter. Bir yoklama turu timeout süresine değil hattaki süreye mal olur.
+"""
+
+import json
+import time
+import struct
+import logging
+from typing import Optional, Dict, List, Any
+
+from services.value_decoder import make_transform
+
+logger = logging.getLogger('Modbus_RTU')
+
+FC_READ_HOLDING_REGISTERS = 3
+FC_READ_INPUT_REGISTERS = 4
+# Tek okuma isteğinde en fazla register (PDU 253 byte: 1 + 1 + 2 * 125)
+MAX_READ_REGISTERS = 125
+
+# Register haritasındaki tablo isimleri
+TABLES = {
+    'holding': FC_READ_HOLDING_REGISTERS, 'holding_registers': FC_READ_HOLDING_REGISTERS,
+    'input': FC_READ_INPUT_REGISTERS, 'input_registers': FC_READ_INPUT_REGISTERS,
+    '3': FC_READ_HOLDING_REGISTERS, '4': FC_READ_INPUT_REGISTERS
+}
+
+# Veri tipi -> (struct kodu, register sayısı)
+DATA_TYPES = {
+    'uint16': ('H', 1), 'int16': ('h', 1),
+    'uint32': ('I', 2), 'int32': ('i', 2),
+    'float': ('f', 2), 'float32': ('f', 2),
+    'uint64': ('Q', 4), 'int64': ('q', 4),
+    'double': ('d', 4), 'float64': ('d', 4)
+}
+# big_endian: ABCD, little_endian: DCBA, word_swap: CDAB, byte_swap: BADC
+BYTE_ORDERS = ('big_endian', 'little_endian', 'word_swap', 'byte_swap')
+
+# Modbus exception kodları
+EXCEPTION_ILLEGAL_FUNCTION = 1
+EXCEPTION_ILLEGAL_DATA_ADDRESS = 2
+
+# Çerçeve sonu için en kısa sessizlik (USB-seri adaptör gecikmesine karşı pay)
+DEFAULT_MIN_SILENCE = 0.002
+
+
+def _crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data: bytes) -> int:
+    """Modbus CRC-16 (poly 0xA001, başlangıç 0xFFFF)"""
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ _CRC_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def with_crc(frame: bytes) -> bytes:
+    return frame + struct.pack('<H', crc16(frame))
+
+
+def check_crc(frame: bytes) -> bool:
+    return len(frame) >= 4 and crc16(frame[:-2]) == struct.unpack_from('<H', frame, len(frame) - 2)[0]
+
+
+def build_read_request(slave_id: int, function: int, address: int, count: int) -> bytes:
+    """FC3/FC4 okuma isteği (CRC dahil)"""
+    return with_crc(struct.pack('>BBHH', slave_id, function, address, count))
+
+
+def expected_response_length(function: int, count: int) -> int:
+    """Başarılı okuma yanıtının byte uzunluğu: adres + fc + byte sayısı + veri + CRC"""
+    return 3 + 2 * count + 2
+
+
+class ModbusError(Exception):
+    """Modbus haberleşme hatası"""
+
+
+class ModbusTimeout(ModbusError):
+    """Slave zamanında (veya hiç) yanıt vermedi"""
+
+
+class ModbusExceptionResponse(ModbusError):
+    """Slave exception yanıtı döndü"""
+
+    def __init__(self, function: int, code: int):
+        super().__init__(f"FC{function} exception {code}")
+        self.function = function
+        self.code = code
+
+
+class RegisterPoint:
+    """Register haritasındaki tek değer (adı, tablosu, adresi ve derlenmiş çözücüsü)"""
+
+    def __init__(self, name: str, function: int, address: int, data_type: str = 'uint16',
+                 byte_order: str = 'big_endian', scale=None, offset=None):
+        if data_type not in DATA_TYPES:
+            raise ValueError(f"Bilinmeyen veri tipi: {data_type}")
+        if byte_order not in BYTE_ORDERS:
+            raise ValueError(f"Bilinmeyen byte sırası: {byte_order}")
+        if not 0 <= address <= 0xFFFF:
+            raise ValueError(f"Geçersiz register adresi: {address}")
+        self.name = name
+        self.function = function
+        self.address = address
+        self.data_type = data_type
+        self.byte_order = byte_order
+        code, self.words = DATA_TYPES[data_type]
+        size = 2 * self.words
+
+        # Byte sırası struct ön eki ve gerekirse byte permütasyonu ile çözülür
+        if byte_order == 'little_endian':
+            self._struct = struct.Struct('<' + code)
+            self._permutation = None
+        else:
+            self._struct = struct.Struct('>' + code)
+            if byte_order == 'word_swap' and self.words > 1:
+                self._permutation = tuple(
+                    word * 2 + byte for word in reversed(range(self.words)) for byte in (0, 1)
+                )
+            elif byte_order == 'byte_swap':
+                self._permutation = tuple(index ^ 1 for index in range(size))
+            else:
+                self._permutation = None
+        self._size = size
+        self._transform = make_transform(scale if scale is not None else 1, 1, offset or 0)
+
+    @property
+    def end(self) -> int:
+        return self.address + self.words
+
+    def decode(self, data: bytes, offset: int = 0) -> Any:
+        """Yanıt verisindeki (register byte'ları) değeri çöz"""
+        if self._permutation is None:
+            value = self._struct.unpack_from(data, offset)[0]
+        else:
+            raw = data[offset:offset + self._size]
+            value = self._struct.unpack(bytes(raw[index] for index in self._permutation))[0]
+        return value if self._transform is None else self._transform(value)
+
+
+class ReadBlock:
+    """Tek istekle okunan register aralığı ve içindeki noktalar"""
+
+    def __init__(self, function: int, points: List[RegisterPoint]):
+        self.function = function
+        self.points = points
+        self.start = min(point.address for point in points)
+        self.count = max(point.end for point in points) - self.start
+        # İstenen ama haritada olmayan register sayısı
+        self.gap = self.count - len({
+            address for point in points for address in range(point.address, point.end)
+        })
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return {point.name: point.decode(data, 2 * (point.address - self.start)) for point in self.points}
+
+    def __repr__(self):
+        return f"ReadBlock(fc={self.function}, start={self.start}, count={self.count}, points={len(self.points)})"
+
+
+def parse_register_map(register_map, data_type: str = 'uint16', byte_order: str = 'big_endian',
+                       function_codes: Optional[str] = None) -> List[RegisterPoint]:
+    """Register haritasını noktalara çevir
+
+    Desteklenen biçimler (tablo: holding / input / 3 / 4):
+      {"holding": [0, 100]}                     -> 0'dan başlayan 100 register
+      {"holding": [[0, 10], [20, 4]]}           -> birden fazla [başlangıç, adet] aralığı
+      {"holding": {"temp": 0, "power": {"address": 10, "type": "float",
+                   "byte_order": "word_swap", "scale": 0.1, "offset": 0}}}
+    Aralıklardaki register'lar '<tablo>_<adres>' adıyla, genel veri tipinde okunur.
+    """
+    if isinstance(register_map, str):
+        register_map = json.loads(register_map) if register_map.strip() else {}
+    if not isinstance(register_map, dict):
+        raise ValueError("Register haritası bir JSON nesnesi olmalı")
+
+    allowed = None
+    if function_codes:
+        allowed = {int(code) for code in str(function_codes).replace(' ', '').split(',') if code}
+
+    points = []
+    for table, entries in register_map.items():
+        function = TABLES.get(str(table).lower())
+        if function is None:
+            raise ValueError(f"Bilinmeyen register tablosu: {table}")
+        if allowed is not None and function not in allowed:
+            continue
+
+        if isinstance(entries, dict):
+            for name, spec in entries.items():
+                if isinstance(spec, int):
+                    spec = {'address': spec}
+                points.append(RegisterPoint(
+                    name, function, int(spec['address']),
+                    data_type=spec.get('type', data_type),
+                    byte_order=spec.get('byte_order', byte_order),
+                    scale=spec.get('scale'), offset=spec.get('offset')
+                ))
+            continue
+
+        if not entries:
+            continue
+        ranges = entries if isinstance(entries[0], list) else [entries]
+        _code, words = DATA_TYPES.get(data_type, ('H', 1))
+        for item in ranges:
+            if len(item) != 2:
+                raise ValueError(f"Aralık [başlangıç, adet] olmalı: {item}")
+            start, count = int(item[0]), int(item[1])
+            for address in range(start, start + count - words + 1, words):
+                points.append(RegisterPoint(
+                    f"{str(table).lower()}_{address}", function, address,
+                    data_type=data_type, byte_order=byte_order
+                ))
+    return points
+
+
+def plan_blocks(points: List[RegisterPoint], max_gap: int = 10,
+                max_count: int = MAX_READ_REGISTERS) -> List[ReadBlock]:
+    """Noktaları en az sayıda okuma isteğine birleştir
+
+    Aynı fonksiyon kodundaki noktalar adres sırasıyla gezilir; bir sonraki
+    nokta mevcut bloğun sonundan en fazla max_gap register uzaktaysa ve blok
+    max_count register'ı aşmıyorsa aynı bloğa eklenir.
+    """
+    blocks = []
+    for function in sorted({point.function for point in points}):
+        current, start, end = [], None, None
+        for point in sorted((p for p in points if p.function == function), key=lambda p: (p.address, p.end)):
+            if current and point.address - end <= max_gap and max(end, point.end) - start <= max_count:
+                current.append(point)
+                end = max(end, point.end)
+                continue
+            if current:
+                blocks.append(ReadBlock(function, current))
+            current, start, end = [point], point.address, point.end
+        if current:
+            blocks.append(ReadBlock(function, current))
+    return blocks
+
+
+def character_time(baudrate: int, data_bits: int = 8, parity: str = 'none', stop_bits: float = 1) -> float:
+    """Hattaki bir karakterin süresi (başlangıç + veri + parite + stop bitleri)"""
+    bits = 1 + int(data_bits) + (0 if parity in (None, 'none', 'N') else 1) + float(stop_bits)
+    return bits / int(baudrate)
+
+
+class RTUTiming:
+    """Baud ve karakter formatından RTU çerçeve aralıkları
+
+    t15: çerçeve içindeki karakterler arası en fazla sessizlik (1.5 karakter)
+    t35: çerçeveleri ayıran en az sessizlik (3.5 karakter)
+    19200 baud üzerinde standart sabit değerleri (750 µs / 1.75 ms) kullanır.
+    min_silence: USB-seri adaptörler veriyi birkaç ms'lik paketlerle ilettiği
+    için çerçeve sonu kararında kullanılan en kısa sessizlik.
+    """
+
+    def __init__(self, baudrate: int = 9600, data_bits: int = 8, parity: str = 'none',
+                 stop_bits: float = 1, min_silence: float = DEFAULT_MIN_SILENCE):
+        self.baudrate = int(baudrate)
+        self.char_time = character_time(baudrate, data_bits, parity, stop_bits)
+        if self.baudrate > 19200:
+            self.t15, self.t35 = 0.00075, 0.00175
+        else:
+            self.t15, self.t35 = 1.5 * self.char_time, 3.5 * self.char_time
+        self.silence = max(self.t35, min_silence)
+
+    def frame_time(self, length: int) -> float:
+        """length byte'lık çerçevenin hatta geçme süresi"""
+        return length * self.char_time
+
+
+class RTUFramer:
+    """Çerçeveleri zamanlamaya göre gönderen / alan katman
+
+    Göndermeden önce hattın en az t35 sessiz kalması beklenir. Yanıtın ilk
+    byte'ı için response_timeout (slave'in cevap verme süresi) beklenir; sonrası
+    beklenen uzunluğa ulaşınca veya hat t35 sessiz kalınca biter. Kısa veya
+    bozuk çerçeve tam timeout yerine hattaki süresi kadar sürede sonuçlanır.
+    """
+
+    def __init__(self, port, timing: RTUTiming, response_timeout: float = 1.0):
+        # port: açık serial.Serial (veya aynı read/write arayüzüne sahip nesne)
+        self.port = port
+        self.timing = timing
+        self.response_timeout = response_timeout
+        self._last_activity = 0.0
+        self._timeout = None
+
+    def _read(self, size: int, timeout: float) -> bytes:
+        # timeout değiştiğinde pyserial portu yeniden ayarlar; gereksiz çağrıdan kaçın
+        if timeout != self._timeout:
+            self.port.timeout = self._timeout = timeout
+        return self.port.read(size)
+
+    def _read_until_silence(self, size: int, budget: float) -> bytes:
+        """size byte'ı budget içinde oku; gecikirse veri kesilene (sessizlik) kadar devam et"""
+        data = self._read(size, budget)
+        while data and len(data) < size:
+            chunk = self._read(size - len(data), self.timing.silence)
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def send(self, frame: bytes):
+        """Çerçeveler arası sessizlikten sonra gönder"""
+        wait = self._last_activity + self.timing.t35 - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.port.reset_input_buffer()
+        started = time.monotonic()
+        self.port.write(frame)
+        self.port.flush()
+        # flush() sürücüye göre gönderim bitmeden dönebilir: hattaki süreyi hesaba kat
+        self._last_activity = max(time.monotonic(), started + self.timing.frame_time(len(frame)))
+
+    def receive(self, length: int, exception_length: int = 5) -> bytes:
+        """Yanıt çerçevesini oku: beklenen uzunlukta veya sessizlikte biter
+
+        İkinci byte'ta fonksiyon kodunun 0x80 biti varsa exception yanıtıdır
+        (exception_length byte).
+        """
+        timing = self.timing
+        frame = self._read(1, self.response_timeout + timing.frame_time(1))
+        if frame:
+            frame += self._read(1, timing.frame_time(1) + timing.silence)
+            if len(frame) == 2:
+                if frame[1] & 0x80:
+                    length = exception_length
+                remaining = length - 2
+                if remaining > 0:
+                    frame += self._read_until_silence(remaining, timing.frame_time(remaining) + timing.silence)
+            self._last_activity = time.monotonic()
+        return frame
+
+
+class ModbusRTUClient:
+    """pyserial portu üzerinden Modbus RTU register okuma"""
+
+    def __init__(self, port, timeout: float = 1.0, timing: Optional[RTUTiming] = None):
+        # timing verilmezse portun baud ayarından (8N1) hesaplanır
+        self.port = port
+        self.timeout = timeout
+        self.timing = timing or RTUTiming(getattr(port, 'baudrate', 9600))
+        self.framer = RTUFramer(port, self.timing, response_timeout=timeout)
+
+        # İstatistikler
+        self.requests = 0
+        self.timeouts = 0
+        self.crc_errors = 0
+        self.tx_bytes = 0
+        self.rx_bytes = 0
+
+    def transact(self, request: bytes, response_length: int) -> bytes:
+        """İsteği gönder ve yanıt çerçevesini oku (exception yanıtı 5 byte)"""
+        self.framer.send(request)
+        self.requests += 1
+        self.tx_bytes += len(request)
+        frame = self.framer.receive(response_length)
+        self.rx_bytes += len(frame)
+        return frame
+
+    def read_registers(self, slave_id: int, function: int, address: int, count: int) -> bytes:
+        """Register'ları oku; ham register byte'larını (2 * count) döndürür"""
+        if not 1 <= count <= MAX_READ_REGISTERS:
+            raise ValueError(f"Register sayısı 1-{MAX_READ_REGISTERS} olmalı: {count}")
+        request = build_read_request(slave_id, function, address, count)
+        frame = self.transact(request, expected_response_length(function, count))
+
+        if not frame:
+            self.timeouts += 1
+            raise ModbusTimeout(f"Slave {slave_id} yanıt vermedi (FC{function} @{address})")
+        if len(frame) >= 5 and frame[1] == function | 0x80:
+            if not check_crc(frame[:5]):
+                self.crc_errors += 1
+                raise ModbusError("Exception yanıtında CRC hatası")
+            raise ModbusExceptionResponse(function, frame[2])
+        if len(frame) < expected_response_length(function, count):
+            self.timeouts += 1
+            raise ModbusTimeout(f"Eksik yanıt: {len(frame)} byte")
+        if not check_crc(frame):
+            self.crc_errors += 1
+            raise ModbusError("CRC hatası")
+        if frame[0] != slave_id or frame[1] != function or frame[2] != 2 * count:
+            raise ModbusError(f"Beklenmeyen yanıt başlığı: {frame[:3].hex()}")
+        return frame[3:-2]
+
+    def stats(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'timeouts': self.timeouts,
+            'crc_errors': self.crc_errors,
+            'tx_bytes': self.tx_bytes,
+            'rx_bytes': self.rx_bytes
+        }
+
+
+class ModbusPoller:
+    """Bir slave'in register haritasını birleştirilmiş bloklarla okuyan yoklayıcı"""
+
+    def __init__(self, client: ModbusRTUClient, slave_id: int, points: List[RegisterPoint],
+                 max_gap: int = 10, retry_count: int = 3, error_handling: str = 'retry'):
+        self.client = client
+        self.slave_id = slave_id
+        self.retry_count = max(0, int(retry_count))
+        self.error_handling = error_handling
+        self.blocks = plan_blocks(points, max_gap=max_gap)
+        logger.info(
+            f"Slave {slave_id}: {len(points)} nokta {len(self.blocks)} istekte okunacak "
+            f"({', '.join(f'FC{b.function}@{b.start}+{b.count}' for b in self.blocks)})"
+        )
+
+        # İstatistikler
+        self.cycles = 0
+        self.failed_blocks = 0
+
+    def _read_block(self, block: ReadBlock) -> bytes:
+        attempts = 1 + (self.retry_count if self.error_handling == 'retry' else 0)
+        for attempt in range(attempts):
+            try:
+                return self.client.read_registers(self.slave_id, block.function, block.start, block.count)
+            except ModbusExceptionResponse:
+                raise
+            except ModbusError as e:
+                if attempt + 1 >= attempts:
+                    raise
+                logger.debug(f"Slave {self.slave_id} {block} tekrar deneniyor: {e}")
+
+    def _split(self, block: ReadBlock):
+        """Boşluklu bloğu en büyük boşluğundan ikiye böl (reddedilen parça tekrar bölünür)"""
+        points = sorted(block.points, key=lambda point: (point.address, point.end))
+        index, widest, end = 1, -1, points[0].end
+        for position in range(1, len(points)):
+            gap = points[position].address - end
+            if gap > widest:
+                index, widest = position, gap
+            end = max(end, points[position].end)
+        parts = [ReadBlock(block.function, points[:index]), ReadBlock(block.function, points[index:])]
+        position = self.blocks.index(block)
+        self.blocks[position:position + 1] = parts
+        logger.warning(f"Slave {self.slave_id} {block} reddedildi, {parts[0]} ve {parts[1]} olarak bölündü")
+        return parts
+
+    def poll(self) -> Dict[str, Any]:
+        """Tüm blokları bir kez oku; okunamayan blokların noktaları sonuçta yer almaz
+
+        error_handling='stop' ise ilk başarısız blokta ModbusError fırlatılır.
+        """
+        self.cycles += 1
+        values = {}
+        pending = list(self.blocks)
+        while pending:
+            block = pending.pop(0)
+            try:
+                values.update(block.decode(self._read_block(block)))
+            except ModbusExceptionResponse as e:
+                if e.code == EXCEPTION_ILLEGAL_DATA_ADDRESS and block.gap:
+                    pending[0:0] = self._split(block)
+                    continue
+                self.failed_blocks += 1
+                logger.error(f"Slave {self.slave_id} {block} okunamadı: {e}")
+                if self.error_handling == 'stop':
+                    raise
+            except ModbusError as e:
+                self.failed_blocks += 1
+                logger.error(f"Slave {self.slave_id} {block} okunamadı: {e}")
+                if self.error_handling == 'stop':
+                    raise
+        return values
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+MQTT Pool - Aynı süreçteki servislerin paylaştığı MQTT bağlantıları
+Aynı sunucu / port / access token için tek paho istemcisi (tek TCP bağlantısı
+ve tek ağ thread'i) açılır; servisler istemciyi acquire() ile alır, release()
+ile bırakır. Son kullanıcı bıraktığında bağlantı kapatılır. Bağlantı havuz
+kilidi dışında kurulur: erişilemeyen bir sunucu diğer servislerin acquire /
+release çağrılarını bekletmez.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Tuple
+
+logger = logging.getLogger('MQTT_Pool')
+
+
+class MQTTConnectionPool:
+    """Referans sayılı, paylaşılan MQTT istemcileri"""
+
+    def __init__(self, client_prefix: str = 'gateway', keepalive: int = 60):
+        self.client_prefix = client_prefix
+        self.keepalive = keepalive
+        self._lock = threading.Lock()
+        # (sunucu, port, token) -> [istemci future'ı, kullanıcı sayısı]
+        self._clients: Dict[Tuple[str, int, str], list] = {}
+
+    def acquire(self, server: str, port: int = 1883, access_token: str = ''):
+        """Bağlantıyı al (yoksa kur); kurulamazsa istisna fırlatır"""
+        # paho-mqtt ilk bağlantıda yüklenir (MQTT kullanmayan kurulumların açılışı yavaşlamaz)
+        try:
+            import paho.mqtt.client as mqtt
+        except ImportError:
+            raise RuntimeError("MQTT kütüphanesi bulunamadı")
+        key = (server, int(port), access_token or '')
+        with self._lock:
+            entry = self._clients.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._clients[key] = [Future(), 1]
+            else:
+                entry[1] += 1
+        if not owner:
+            # Bağlantı kuruluyorsa kuran çağrının sonucu beklenir (kurulamazsa aynı istisna)
+            return entry[0].result()
+        return self._connect(mqtt, key, entry)
+
+    def _connect(self, mqtt, key: Tuple[str, int, str], entry: list):
+        server, port, access_token = key
+        future = entry[0]
+        try:
+            client = mqtt.Client(client_id=f"{self.client_prefix}_{int(time.time())}")
+            if access_token:
+                client.username_pw_set(access_token)
+            client.connect(server, port, self.keepalive)
+            client.loop_start()
+        except Exception as e:
+            with self._lock:
+                if self._clients.get(key) is entry:
+                    del self._clients[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            closed = self._clients.get(key) is not entry
+        if closed:
+            # Bağlantı kurulurken havuz kapatıldı
+            self._close(client)
+            error = RuntimeError("MQTT havuzu kapatıldı")
+            future.set_exception(error)
+            raise error
+        future.set_result(client)
+        logger.info(f"Paylaşılan MQTT bağlantısı kuruldu: {server}:{port}")
+        return client
+
+    @staticmethod
+    def _client(entry: list):
+        future = entry[0]
+        if future.done() and future.exception() is None:
+            return future.result()
+        return None
+
+    def release(self, client):
+        """Bağlantıyı bırak; kullanan kalmadıysa kapat"""
+        with self._lock:
+            for key, entry in self._clients.items():
+                if self._client(entry) is client:
+                    entry[1] -= 1
+                    if entry[1] > 0:
+                        return
+                    del self._clients[key]
+                    break
+            else:
+                return
+        self._close(client)
+
+    def close(self):
+        with self._lock:
+            clients = [self._client(entry) for entry in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            if client is not None:
+                self._close(client)
+
+    @staticmethod
+    def _close(client):
+        try:
+            client.loop_stop()
+            client.disconnect()
+        except Exception as e:
+            logger.error(f"MQTT bağlantı kapatma hatası: {e}")
+
+    def __len__(self):
+        return len(self._clients)
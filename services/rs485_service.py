@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+RS-485 Service - Modbus RTU Yoklama Servisi
+RS-485 hattındaki slave cihazın register haritasını polling_interval'de bir
+birleştirilmiş FC3/FC4 bloklarıyla okur; değerleri canlı veri akışına verir ve
+modbus.mqtt_server tanımlıysa MQTT ile gönderir (supervisor altında BLE ile
+aynı sunucuya tek paylaşılan bağlantı). Gönderilemeyen turlar saklanmaz.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import signal
+import threading
+from pathlib import Path
+from typing import Optional, Dict
+
+# Script olarak çalıştırıldığında services paketini bulabilmek için proje kökünü ekle
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+# Seri port kütüphanesi
+try:
+    import serial
+    import serial.rs485
+    SERIAL_AVAILABLE = True
+except ImportError:
+    SERIAL_AVAILABLE = False
+
+from services.config_watcher import ConfigWatcher, diff_config
+from services.live_telemetry import LivePublisher
+from services.mqtt_pool import MQTTConnectionPool
+from services.modbus_rtu import ModbusRTUClient, ModbusPoller, ModbusError, RTUTiming, parse_register_map
+
+# Logging yapılandırması
+LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
+LOG_DIR.mkdir(exist_ok=True)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(LOG_DIR / 'rs485_service.log'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger('RS485_Service')
+
+if not SERIAL_AVAILABLE:
+    logger.warning("pyserial bulunamadı. 'pip install pyserial' kurun")
+
+# Yollar
+BASE_DIR = Path(__file__).resolve().parent.parent
+CONFIG_FILE = BASE_DIR / "config" / "gateway.json"
+# API worker'larının canlı veri soketleri (API ile aynı dizin olmalı)
+LIVE_TELEMETRY_DIR = Path(os.getenv("LIVE_TELEMETRY_DIR", str(BASE_DIR / "data" / "live")))
+
+DEFAULT_PORT = "/dev/ttyUSB0"
+# Aradaki tanımsız register sayısı bu değeri geçmiyorsa istekler tek blokta birleştirilir
+DEFAULT_MAX_REGISTER_GAP = 10
+# Yoklama istatistiklerinin loglanma aralığı (saniye)
+STATS_INTERVAL = 300
+# MQTT bağlantısı kurulamadığında yeniden deneme aralığı (saniye)
+MQTT_RETRY_INTERVAL = 30
+DEFAULT_MQTT_TOPIC = 'gateway/modbus/data'
+
+PARITIES = {'none': 'N', 'even': 'E', 'odd': 'O', 'mark': 'M', 'space': 'S'}
+
+
+class RS485Service:
+    """Modbus RTU yoklama servisi"""
+
+    def __init__(self, live: Optional[LivePublisher] = None, mqtt_pool: Optional[MQTTConnectionPool] = None):
+        # live / mqtt_pool: supervisor altında diğer servislerle paylaşılan yayıncı ve MQTT bağlantıları
+        self.config = None
+        self.serial = None
+        self.client = None
+        self.poller = None
+        self.running = False
+        self.poll_thread = None
+        self.stop_event = threading.Event()
+        self._config_lock = threading.RLock()
+        self.live = live or LivePublisher(LIVE_TELEMETRY_DIR)
+        self.mqtt_pool = mqtt_pool or MQTTConnectionPool(client_prefix='gateway_rs485')
+        self.mqtt_client = None
+        self._mqtt_lock = threading.Lock()
+        self._mqtt_thread = None
+        self._next_mqtt_attempt = 0.0
+        self.load_config()
+
+    def read_config(self) -> Optional[Dict]:
+        """gateway.json'dan rs485 ve modbus bölümlerini oku"""
+        try:
+            if CONFIG_FILE.exists():
+                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                    gateway_config = json.load(f)
+                return {
+                    'rs485': gateway_config.get('rs485', {}),
+                    'modbus': gateway_config.get('modbus', {})
+                }
+            logger.warning("Konfigürasyon dosyası bulunamadı")
+        except Exception as e:
+            logger.error(f"Konfigürasyon okuma hatası: {e}")
+        return None
+
+    def load_config(self):
+        """Konfigürasyonu yükle"""
+        self.config = self.read_config() or {'rs485': {}, 'modbus': {}}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config['rs485'].get('enabled') and self.config['modbus'].get('enabled'))
+
+    def open_port(self):
+        """rs485 ayarlarıyla seri portu aç"""
+        rs485 = self.config['rs485']
+        port = serial.Serial(
+            port=os.getenv("RS485_PORT") or rs485.get('port') or DEFAULT_PORT,
+            baudrate=int(rs485.get('baudrate', 9600)),
+            bytesize=int(rs485.get('data_bits', 8)),
+            parity=PARITIES.get(rs485.get('parity', 'none'), 'N'),
+            stopbits=float(rs485.get('stop_bits', 1)),
+            rtscts=rs485.get('flow_control') == 'rts_cts',
+            xonxoff=rs485.get('flow_control') == 'xon_xoff',
+            timeout=int(rs485.get('timeout', 1000)) / 1000
+        )
+        if rs485.get('direction_control') == 'manual':
+            # Alıcı-verici yönü RTS ile sürülür (otomatik yönlü adaptörlerde gerekmez)
+            try:
+                port.rs485_mode = serial.rs485.RS485Settings(rts_level_for_tx=True, rts_level_for_rx=False)
+            except (ValueError, OSError, AttributeError) as e:
+                # Sürücü desteklemiyorsa ayar geri alınır (aksi halde her yeniden ayarda hata verir)
+                port.rs485_mode = None
+                logger.warning(f"RS-485 yön kontrolü ayarlanamadı: {e}")
+        return port
+
+    def start(self) -> bool:
+        """Servisi başlat"""
+        if not self.enabled:
+            logger.info("RS-485 / Modbus devre dışı")
+            return False
+        if not SERIAL_AVAILABLE:
+            logger.error("pyserial yok, servis başlatılamadı")
+            return False
+
+        rs485, modbus = self.config['rs485'], self.config['modbus']
+        try:
+            points = parse_register_map(
+                modbus.get('register_map', '{}'),
+                data_type=modbus.get('data_type', 'uint16'),
+                byte_order=modbus.get('byte_order', 'big_endian'),
+                function_codes=modbus.get('function_codes')
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Register haritası geçersiz: {e}")
+            return False
+        if not points:
+            logger.warning("Register haritası boş, okunacak değer yok")
+            return False
+
+        try:
+            self.serial = self.open_port()
+        except (serial.SerialException, ValueError) as e:
+            logger.error(f"Seri port açılamadı: {e}")
+            return False
+
+        # Çerçeve aralıkları hattın karakter formatından hesaplanır; timeout sadece slave'in cevap süresi
+        timing = RTUTiming(
+            baudrate=int(rs485.get('baudrate', 9600)),
+            data_bits=int(rs485.get('data_bits', 8)),
+            parity=rs485.get('parity', 'none'),
+            stop_bits=float(rs485.get('stop_bits', 1))
+        )
+        self.client = ModbusRTUClient(self.serial, timeout=int(rs485.get('timeout', 1000)) / 1000, timing=timing)
+        self.poller = ModbusPoller(
+            self.client,
+            int(modbus.get('slave_id', 1)),
+            points,
+            max_gap=int(modbus.get('max_register_gap', DEFAULT_MAX_REGISTER_GAP)),
+            retry_count=int(modbus.get('retry_count', 3)),
+            error_handling=modbus.get('error_handling', 'retry')
+        )
+        self.running = True
+        self.stop_event.clear()
+        self._next_mqtt_attempt = 0.0
+        self.poll_thread = threading.Thread(target=self.poll_loop, name='modbus-poll', daemon=True)
+        self.poll_thread.start()
+        logger.info(
+            f"RS-485 servisi başlatıldı ({self.serial.port}, {self.serial.baudrate} baud, "
+            f"t3.5={timing.t35 * 1000:.2f} ms)"
+        )
+        return True
+
+    def stop(self):
+        """Servisi durdur"""
+        self.running = False
+        self.stop_event.set()
+        if self.poll_thread:
+            self.poll_thread.join(timeout=10)
+            self.poll_thread = None
+        with self._mqtt_lock:
+            client, self.mqtt_client = self.mqtt_client, None
+        if client is not None:
+            self.mqtt_pool.release(client)
+        if self.serial:
+            try:
+                self.serial.close()
+            except Exception as e:
+                logger.error(f"Seri port kapatma hatası: {e}")
+            self.serial = None
+        logger.info("RS-485 servisi durduruldu")
+
+    def poll_loop(self):
+        """polling_interval'de bir tüm blokları oku (sabit frekans, kaçan turlar atlanır)"""
+        interval = max(0.05, int(self.config['modbus'].get('polling_interval', 1000)) / 1000)
+        key = f"modbus:{self.poller.slave_id}"
+        next_poll = time.monotonic()
+        next_stats = next_poll + STATS_INTERVAL
+        busy = 0.0
+
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            try:
+                values = self.poller.poll()
+            except ModbusError as e:
+                # error_handling='stop': konfigürasyon değişene kadar yoklama durur
+                logger.error(f"Modbus yoklaması durduruldu: {e}")
+                self.running = False
+                return
+            except Exception as e:
+                logger.error(f"Modbus yoklama hatası: {e}")
+                values = {}
+            finished = time.monotonic()
+            busy += finished - started
+
+            if values:
+                logger.debug(f"{key}: {values}")
+                ts = int(time.time() * 1000)
+                self.live.publish(key, {'device': key, 'ts': ts, 'values': values})
+                self.publish_uplink({'ts': ts, 'values': values})
+
+            if finished >= next_stats:
+                stats = self.client.stats()
+                logger.info(
+                    f"Modbus: {self.poller.cycles} tur, {stats['requests']} istek, "
+                    f"{stats['timeouts']} zaman aşımı, {stats['crc_errors']} CRC hatası, "
+                    f"hat doluluğu %{100 * busy / STATS_INTERVAL:.1f}"
+                )
+                next_stats, busy = finished + STATS_INTERVAL, 0.0
+
+            next_poll += interval
+            if next_poll < finished:
+                next_poll = finished
+            self.stop_event.wait(next_poll - finished)
+
+    def connect_uplink(self):
+        """modbus.mqtt_server'a bağlan (havuzdan); yoklama thread'ini bekletmemek için ayrı thread'de"""
+        modbus = self.config['modbus']
+        server = modbus.get('mqtt_server', '')
+        try:
+            client = self.mqtt_pool.acquire(server, int(modbus.get('mqtt_port', 1883)),
+                                            modbus.get('mqtt_access_token', ''))
+        except Exception as e:
+            logger.error(f"MQTT bağlantı hatası ({server}), {MQTT_RETRY_INTERVAL} sn sonra denenecek: {e}")
+            return
+        with self._mqtt_lock:
+            if self.running and self.mqtt_client is None:
+                self.mqtt_client, client = client, None
+        if client is not None:
+            # Bağlantı kurulurken servis durduruldu
+            self.mqtt_pool.release(client)
+
+    def publish_uplink(self, message: Dict):
+        """Yoklama turunu MQTT'ye gönder (bağlantı yoksa tur atlanır, bağlantı arka planda kurulur)"""
+        modbus = self.config['modbus']
+        if not modbus.get('mqtt_server'):
+            return
+        client = self.mqtt_client
+        if client is None:
+            now = time.monotonic()
+            if now >= self._next_mqtt_attempt and not (self._mqtt_thread and self._mqtt_thread.is_alive()):
+                self._next_mqtt_attempt = now + MQTT_RETRY_INTERVAL
+                self._mqtt_thread = threading.Thread(target=self.connect_uplink, name='modbus-mqtt', daemon=True)
+                self._mqtt_thread.start()
+            return
+        try:
+            # QoS 1: kısa kopmalarda paho mesajı bağlantı dönünce gönderir
+            result = client.publish(modbus.get('mqtt_topic') or DEFAULT_MQTT_TOPIC, json.dumps(message), qos=1)
+            if result.rc != 0:
+                logger.warning(f"MQTT gönderim hatası: {result.rc}")
+        except Exception as e:
+            logger.error(f"MQTT gönderim hatası: {e}")
+
+    def reload_config(self):
+        """Konfigürasyonu yeniden yükle; rs485/modbus değiştiyse yoklamayı yeniden başlat"""
+        new_config = self.read_config()
+        if new_config is None:
+            return
+        with self._config_lock:
+            changed = diff_config(self.config['rs485'], new_config['rs485']) | \
+                diff_config(self.config['modbus'], new_config['modbus'])
+            if not changed:
+                return
+            logger.info(f"Konfigürasyon değişti: {', '.join(sorted(changed))}")
+            self.config = new_config
+            self.stop()
+            self.start()
+
+
+def main():
+    """Ana fonksiyon"""
+    service = RS485Service()
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    watcher = ConfigWatcher(CONFIG_FILE, service.reload_config)
+
+    try:
+        if not service.start():
+            logger.info("Servis başlatılmadı, konfigürasyon değişikliği bekleniyor")
+        watcher.start()
+        while not stop_event.wait(3600):
+            pass
+
+    except KeyboardInterrupt:
+        logger.info("Kullanıcı tarafından durduruldu")
+    except Exception as e:
+        logger.error(f"Beklenmeyen hata: {e}")
+    finally:
+        watcher.stop()
+        service.stop()
+        service.live.close()
+        service.mqtt_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Gateway Supervisor - BLE, RS-485 ve LoRaWAN servislerini tek süreçte çalıştırır
+Servisler ayrı Python süreçleri yerine tek yorumlayıcıda, tek asyncio döngüsü
+etrafında barındırılır: tek log dosyası, tek konfigürasyon izleyicisi, tek
+canlı veri yayıncısı kullanılır. BLE ve RS-485 MQTT uplink'lerini paylaşılan
+havuzdan alır (aynı sunucu / port / token için tek bağlantı); LoRaWAN
+aktarıcısı ağ sunucusuyla Semtech UDP üzerinden konuştuğu için MQTT
+kullanmaz. LoRaWAN aktarıcısı ve bleak motoru doğrudan döngüde çalışır;
+thread tabanlı işler (bluepy, RS-485 yoklaması, servislerin bloklayan
+start / stop çağrıları) kendi thread'lerinde veya executor'da yapılır. Çöken servis kendi başına,
+artan bekleme süreleriyle yeniden başlatılır; servis thread'lerinin
+beklenmeyen hataları döngüyü hemen uyandırır, sağlık kontrolü sabit aralıkla
+yoklanmaz.
+
+Kullanım:
+    python3 services/supervisor.py
+    GATEWAY_SERVICES=ble,lorawan python3 services/supervisor.py
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import threading
+import inspect
+import logging
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Script olarak çalıştırıldığında services paketini bulabilmek için proje kökünü ekle
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+# Logging yapılandırması (servis modülleri import edilmeden önce: tüm servisler tek dosyaya yazar)
+LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
+LOG_DIR.mkdir(exist_ok=True)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(LOG_DIR / 'gateway.log'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger('Supervisor')
+
+from services.config_watcher import ConfigWatcher  # noqa: E402
+from services.live_telemetry import LivePublisher  # noqa: E402
+from services.mqtt_pool import MQTTConnectionPool  # noqa: E402
+from services.metrics import start_http_server  # noqa: E402
+
+# Yollar
+BASE_DIR = Path(__file__).resolve().parent.parent
+CONFIG_FILE = BASE_DIR / "config" / "gateway.json"
+LIVE_TELEMETRY_DIR = Path(os.getenv("LIVE_TELEMETRY_DIR", str(BASE_DIR / "data" / "live")))
+
+# Barındırılacak servisler (sırayla başlatılır, ters sırayla durdurulur)
+GATEWAY_SERVICES = [name.strip() for name in os.getenv("GATEWAY_SERVICES", "ble,rs485,lorawan").split(',')
+                    if name.strip()]
+# Yedek sağlık kontrolü aralığı (thread çökmeleri anında bildirilir) ve yeniden başlatma beklemeleri (saniye)
+HEALTH_CHECK_INTERVAL = 30.0
+RESTART_BACKOFF_MIN = 1.0
+RESTART_BACKOFF_MAX = 60.0
+# Barındırılan servislerin Prometheus metriklerinin sunulduğu port (0: kapalı)
+GATEWAY_METRICS_PORT = int(os.getenv("GATEWAY_METRICS_PORT", "9101"))
+# Kimlik doğrulamasız uç nokta: dışarıdan kazınacaksa 0.0.0.0 veya arayüz adresi verilir
+GATEWAY_METRICS_HOST = os.getenv("GATEWAY_METRICS_HOST", "127.0.0.1")
+
+
+async def _call(func, *args):
+    """Coroutine ise döngüde bekle, değilse executor'da çalıştır"""
+    if inspect.iscoroutinefunction(func):
+        return await func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
+def _threads_dead(*threads) -> bool:
+    return any(thread is not None and not thread.is_alive() for thread in threads)
+
+
+class HostedService:
+    """Supervisor altında çalışan tek servis
+
+    create: servis nesnesini oluşturur (start / stop / reload_config / running)
+    crashed: servis çalışıyor görünürken işçilerinin ölüp ölmediği
+    """
+
+    def __init__(self, name: str, create: Callable[[], object], crashed: Callable[[object], bool]):
+        self.name = name
+        self._create = create
+        self._crashed = crashed
+        self.service = None
+        self.failed = False
+        self.restarts = 0
+        self._backoff = RESTART_BACKOFF_MIN
+        self._next_restart = 0.0
+
+    async def start(self):
+        try:
+            if self.service is None:
+                self.service = await asyncio.to_thread(self._create)
+            await _call(self.service.start)
+            self.failed = False
+        except Exception as e:
+            logger.error(f"{self.name} servisi başlatılamadı: {e}")
+            self._schedule_restart()
+
+    async def stop(self):
+        if self.service is None:
+            return
+        try:
+            await _call(self.service.stop)
+        except Exception as e:
+            logger.error(f"{self.name} servisi durdurulamadı: {e}")
+
+    async def reload(self):
+        if self.service is None:
+            await self.start()
+            return
+        try:
+            await _call(self.service.reload_config)
+        except Exception as e:
+            logger.error(f"{self.name} konfigürasyonu uygulanamadı: {e}")
+
+    def crashed(self) -> bool:
+        if self.failed:
+            return True
+        return self.service is not None and bool(getattr(self.service, 'running', False)) and \
+            self._crashed(self.service)
+
+    def restart_delay(self) -> Optional[float]:
+        """Bekleyen yeniden başlatmaya kalan süre (bekleyen yoksa None)"""
+        if not self.failed:
+            return None
+        return max(0.0, self._next_restart - time.monotonic())
+
+    def _schedule_restart(self):
+        self.failed = True
+        self._next_restart = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, RESTART_BACKOFF_MAX)
+
+    async def check(self):
+        """Çökmüşse (bekleme süresi dolduğunda) yeniden başlat"""
+        if not self.crashed():
+            # Uzun süre sağlıklı çalışan servisin bekleme süresi sıfırlanır
+            if time.monotonic() > self._next_restart + RESTART_BACKOFF_MAX:
+                self._backoff = RESTART_BACKOFF_MIN
+            return
+        if not self.failed:
+            logger.error(f"{self.name} servisi çöktü, yeniden başlatılıyor")
+            self._schedule_restart()
+        if time.monotonic() < self._next_restart:
+            return
+        self.restarts += 1
+        await self.stop()
+        await self.start()
+
+
+class Supervisor:
+    """Servisleri tek süreçte, paylaşılan kaynaklarla çalıştıran yönetici"""
+
+    def __init__(self, names: Optional[List[str]] = None):
+        self.live = LivePublisher(LIVE_TELEMETRY_DIR)
+        self.mqtt_pool = MQTTConnectionPool(client_prefix='gateway')
+        self.services = [self._build(name) for name in (names or GATEWAY_SERVICES)]
+        self._config_changed = None
+        self._health_changed = None
+        self._loop = None
+
+    def _build(self, name: str) -> HostedService:
+        # Servis modülleri (ve BLE / seri port kütüphaneleri) sadece barındırılacaklarsa yüklenir
+        if name == 'ble':
+            def create():
+                from services.ble_service import BLEService
+                return BLEService(live=self.live, mqtt_pool=self.mqtt_pool, loop=self._loop)
+            return HostedService(name, create, lambda service: _threads_dead(
+                service.scan_thread, service.notify_thread, service.write_thread, *service.forward_threads
+            ))
+        if name == 'rs485':
+            def create():
+                from services.rs485_service import RS485Service
+                return RS485Service(live=self.live, mqtt_pool=self.mqtt_pool)
+            return HostedService(name, create, lambda service: _threads_dead(service.poll_thread))
+        if name == 'lorawan':
+            def create():
+                from services.lorawan_service import LoRaWANService
+                return LoRaWANService()
+            return HostedService(name, create, lambda service: not service.relay.alive)
+        raise ValueError(f"Bilinmeyen servis: {name}")
+
+    def _on_config_change(self, loop: asyncio.AbstractEventLoop):
+        loop.call_soon_threadsafe(self._config_changed.set)
+
+    def _next_check(self) -> float:
+        """Sağlık kontrolüne kadar beklenecek süre: en yakın yeniden başlatma veya yedek aralık"""
+        delays = [delay for delay in (service.restart_delay() for service in self.services) if delay is not None]
+        return min(delays + [HEALTH_CHECK_INTERVAL])
+
+    async def run(self, stop_event: asyncio.Event):
+        loop = self._loop = asyncio.get_running_loop()
+        self._config_changed = asyncio.Event()
+        self._health_changed = asyncio.Event()
+        # Servis thread'i yakalanmamış bir hatayla biterse kontrol beklenmeden yapılır
+        previous_excepthook = threading.excepthook
+
+        def on_thread_exception(args):
+            previous_excepthook(args)
+            loop.call_soon_threadsafe(self._health_changed.set)
+
+        threading.excepthook = on_thread_exception
+        # Tek izleyici; değişiklik her servise iletilir, servisler kendi bölümlerini karşılaştırır
+        watcher = ConfigWatcher(CONFIG_FILE, lambda: self._on_config_change(loop))
+        # Tüm servisler aynı registry'ye yazar; tek /metrics uç noktası
+        metrics_server = None
+        if GATEWAY_METRICS_PORT:
+            try:
+                metrics_server = start_http_server(GATEWAY_METRICS_PORT, host=GATEWAY_METRICS_HOST)
+            except OSError as e:
+                logger.error(f"Metrik sunucusu başlatılamadı (port {GATEWAY_METRICS_PORT}): {e}")
+
+        logger.info(f"Supervisor başlatılıyor: {', '.join(service.name for service in self.services)}")
+        try:
+            for service in self.services:
+                await service.start()
+            watcher.start()
+
+            while not stop_event.is_set():
+                waits = {asyncio.ensure_future(event.wait())
+                         for event in (stop_event, self._config_changed, self._health_changed)}
+                await asyncio.wait(waits, timeout=self._next_check(), return_when=asyncio.FIRST_COMPLETED)
+                for wait in waits:
+                    wait.cancel()
+                if stop_event.is_set():
+                    break
+                self._health_changed.clear()
+                if self._config_changed.is_set():
+                    self._config_changed.clear()
+                    for service in self.services:
+                        await service.reload()
+                for service in self.services:
+                    await service.check()
+        finally:
+            threading.excepthook = previous_excepthook
+            watcher.stop()
+            for service in reversed(self.services):
+                await service.stop()
+            self.live.close()
+            self.mqtt_pool.close()
+            if metrics_server:
+                metrics_server.shutdown()
+            logger.info("Supervisor durduruldu")
+
+
+def main():
+    """Ana fonksiyon"""
+    async def runner():
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_event.set)
+        await Supervisor().run(stop_event)
+
+    try:
+        asyncio.run(runner())
+    except Exception as e:
+        logger.error(f"Beklenmeyen hata: {e}")
+
+
+if __name__ == "__main__":
+    main()
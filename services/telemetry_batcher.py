@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Telemetry Batcher - Okumaları toplu payload'lara paketler
+ThingsBoard Gateway'in maxPayloadSizeBytes / minPackSizeToSend /
+minPackSendDelayMS ayarlarını izler: paket, minimum okuma sayısına
+ulaştığında veya ilk okumadan itibaren gecikme süresi dolduğunda gönderilir,
+hiçbir payload maksimum boyutu aşmaz
+"""
+
+import json
+import time
+from typing import Optional, List, Dict, Tuple
+
+# Batch payload formatı: {"<mac>":[{"ts":...},...],...}
+# Boyut = 1 + Σ(len(mac) + 5) + Σ(len(kayıt) + 1)  (süslü parantez, tırnak, iki nokta, köşeli parantez, virgüller)
+_PAYLOAD_OVERHEAD = 1
+_DEVICE_OVERHEAD = 5
+
+
+def encode_record(record: Dict) -> str:
+    """Kaydı kompakt JSON olarak kodla (bir kez kodlanır, boyutu hesaplanır)"""
+    return json.dumps(record, separators=(',', ':'))
+
+
+class TelemetryBatcher:
+    """Okuma paketleyici (thread-safe değildir, çağıran kilitler)"""
+
+    def __init__(self, max_payload_size: int = 8196, min_pack_size: int = 500,
+                 min_pack_send_delay_ms: int = 50):
+        self.configure(max_payload_size, min_pack_size, min_pack_send_delay_ms)
+        self._pending: List[Tuple[str, str]] = []
+        self._first_added = None
+
+        # İstatistikler (tek tek gönderim ile karşılaştırma için)
+        self.readings = 0
+        self.payloads = 0
+        self.payload_bytes = 0
+        self.oversized = 0
+
+    def configure(self, max_payload_size: int, min_pack_size: int, min_pack_send_delay_ms: int):
+        """Paket limitlerini güncelle (bekleyen okumalar korunur)"""
+        self.max_payload_size = max(256, int(max_payload_size))
+        self.min_pack_size = max(1, int(min_pack_size))
+        self.min_pack_send_delay = max(0, int(min_pack_send_delay_ms)) / 1000.0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, mac_address: str, record: Dict) -> bool:
+        """Okumayı pakete ekle; paket gönderime hazırsa True döner"""
+        return self.add_encoded(mac_address, encode_record(record))
+
+    def add_encoded(self, mac_address: str, encoded: str) -> bool:
+        """Önceden kodlanmış okumayı ekle (depodan gelen kayıtlar için)"""
+        if not self._pending:
+            self._first_added = time.monotonic()
+        self._pending.append((mac_address, encoded))
+        self.readings += 1
+        return len(self._pending) >= self.min_pack_size
+
+    def time_until_flush(self, now: Optional[float] = None) -> Optional[float]:
+        """Gecikme tetikli gönderime kalan süre (bekleyen yoksa None)"""
+        if not self._pending:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._first_added + self.min_pack_send_delay - now)
+
+    def ready(self, now: Optional[float] = None) -> bool:
+        if len(self._pending) >= self.min_pack_size:
+            return True
+        remaining = self.time_until_flush(now)
+        return remaining is not None and remaining <= 0
+
+    def drain(self) -> List[Tuple[bytes, List[Tuple[str, str]]]]:
+        """Bekleyen okumaları maksimum boyutu aşmayan payload'lara böl
+
+        (payload, payload'daki (mac, kodlanmış kayıt) listesi) döner; her
+        payload giriş sırasındaki ardışık bir aralığı kapsar.
+        """
+        pending, self._pending = self._pending, []
+        self._first_added = None
+
+        payloads = []
+        groups: Dict[str, List[str]] = {}
+        size = _PAYLOAD_OVERHEAD
+        start = 0
+
+        for index, (mac, encoded) in enumerate(pending):
+            added = len(encoded) + 1
+            if mac not in groups:
+                added += len(mac) + _DEVICE_OVERHEAD
+            if index > start and size + added > self.max_payload_size:
+                payloads.append((self._build(groups), pending[start:index]))
+                groups, size, start = {}, _PAYLOAD_OVERHEAD, index
+                added = len(encoded) + 1 + len(mac) + _DEVICE_OVERHEAD
+            if size + added > self.max_payload_size:
+                # Tek başına sınırı aşan kayıt yine de ayrı gönderilir
+                self.oversized += 1
+            groups.setdefault(mac, []).append(encoded)
+            size += added
+
+        if start < len(pending):
+            payloads.append((self._build(groups), pending[start:]))
+
+        self.payloads += len(payloads)
+        self.payload_bytes += sum(len(payload) for payload, _ in payloads)
+        return payloads
+
+    @staticmethod
+    def _build(groups: Dict[str, List[str]]) -> bytes:
+        body = ','.join(f'{json.dumps(mac)}:[{",".join(records)}]' for mac, records in groups.items())
+        return ('{' + body + '}').encode('utf-8')
+
+    def stats(self) -> Dict:
+        return {
+            'readings': self.readings,
+            'payloads': self.payloads,
+            'payload_bytes': self.payload_bytes,
+            'pending': len(self._pending),
+            'oversized': self.oversized
+        }
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Value Decoder - valueExpression ifadelerini derlenmiş çözme planına çevirir
+Profil telemetry ifadeleri bir kez ayrıştırılır; her alan için önceden
+hazırlanmış struct.Struct / slice ve ölçek/ofset katsayıları tutulur, okuma
+sırasında metin işlenmez. Ham karakteristik byte'ları tipli anahtar/değer
+telemetrisine çevrilir.
+
+İfade söz dizimi: [tip][_be|_le][dilim] [* / + - sayı]...
+  [0]          0. byte, işaretsiz
+  [0:2]        0-1. byte'lar (varsayılan little-endian), işaretsiz
+  [1,3]        1. ve 3. byte'lar sırayla birleştirilir
+  [:] / [2:]   açık uçlu dilim (varsayılan tip hex)
+  int_be[0:2]  big-endian işaretli 16 bit
+  float[2:6]   32 bit float (2, 4 veya 8 byte)
+  hex[..] / str[..]  hex metni / UTF-8 metin
+  [0:2] * 0.1 - 40   ölçek ve ofset (soldan sağa uygulanır)
+Telemetry öğesindeki 'type', 'byteorder', 'scale', 'offset' alanları ifadedeki
+değerlerin yerine geçer / üzerine uygulanır.
+"""
+
+import re
+import struct
+import logging
+from typing import Optional, Dict, List, Callable, Any
+
+logger = logging.getLogger('Value_Decoder')
+
+TYPES = ('uint', 'int', 'float', 'hex', 'str')
+NUMERIC_TYPES = ('uint', 'int', 'float')
+
+# Genişliğe göre struct kodları
+_STRUCT_CODES = {
+    'uint': {1: 'B', 2: 'H', 4: 'I', 8: 'Q'},
+    'int': {1: 'b', 2: 'h', 4: 'i', 8: 'q'},
+    'float': {2: 'e', 4: 'f', 8: 'd'}
+}
+
+_EXPRESSION_RE = re.compile(
+    r'^\s*(?:(?P<type>[a-z]+?)(?:_(?P<order>be|le))?)?\s*\[(?P<index>[^\]]*)\](?P<ops>.*)$'
+)
+_OPERATION_RE = re.compile(r'\s*([*/+-])\s*(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)')
+
+
+class ExpressionError(ValueError):
+    """Geçersiz valueExpression"""
+
+
+def _parse_number(text: str):
+    return float(text) if any(c in text for c in '.eE') else int(text)
+
+
+def _parse_index(index: str):
+    """'[...]' içeriği: (başlangıç, bitiş) dilimi veya byte indeks listesi"""
+    index = index.replace(' ', '')
+    try:
+        if ':' in index:
+            start, _, stop = index.partition(':')
+            return (int(start) if start else None, int(stop) if stop else None), None
+        if index:
+            return None, [int(part) for part in index.split(',')]
+    except ValueError:
+        pass
+    raise ExpressionError(f"Geçersiz dilim: [{index}]")
+
+
+def _parse_operations(ops: str):
+    """Aritmetiği (çarpan, bölen, ekleme) üçlüsüne indirger: değer * çarpan / bölen + ekleme"""
+    multiplier, divisor, addend = 1, 1, 0
+    position = 0
+    ops = ops.rstrip()
+    while position < len(ops):
+        match = _OPERATION_RE.match(ops, position)
+        if not match:
+            raise ExpressionError(f"Geçersiz işlem: '{ops[position:].strip()}'")
+        operator, number = match.group(1), _parse_number(match.group(2))
+        if operator == '*':
+            multiplier, addend = multiplier * number, addend * number
+        elif operator == '/':
+            if number == 0:
+                raise ExpressionError("Sıfıra bölme")
+            divisor, addend = divisor * number, addend / number
+        elif operator == '+':
+            addend += number
+        else:
+            addend -= number
+        position = match.end()
+    return multiplier, divisor, addend
+
+
+def make_transform(multiplier, divisor, addend) -> Optional[Callable[[Any], Any]]:
+    """Katsayılara göre en az işlem yapan dönüşüm (gerek yoksa None)"""
+    if multiplier == 1 and divisor == 1:
+        return (lambda value: value + addend) if addend else None
+    if divisor == 1:
+        return lambda value: value * multiplier + addend
+    if multiplier == 1:
+        return lambda value: value / divisor + addend
+    return lambda value: value * multiplier / divisor + addend
+
+
+class FieldDecoder:
+    """Tek telemetry anahtarının derlenmiş çözücüsü"""
+
+    def __init__(self, key: str, expression: str, value_type: Optional[str] = None,
+                 byteorder: Optional[str] = None, scale=None, offset=None):
+        match = _EXPRESSION_RE.match(expression or '')
+        if not match:
+            raise ExpressionError(f"Geçersiz ifade: '{expression}'")
+        self.key = key
+        self.expression = expression
+        value_type = value_type or match.group('type')
+        if value_type == 'string':
+            value_type = 'str'
+        if value_type is not None and value_type not in TYPES:
+            raise ExpressionError(f"Bilinmeyen tip: '{value_type}'")
+        byteorder = byteorder or {'be': 'big', 'le': 'little'}.get(match.group('order'), 'little')
+        if byteorder not in ('little', 'big'):
+            raise ExpressionError(f"Bilinmeyen byte sırası: '{byteorder}'")
+        self.byteorder = byteorder
+
+        bounds, indices = _parse_index(match.group('index'))
+        multiplier, divisor, addend = _parse_operations(match.group('ops'))
+        for name, number in (('scale', scale), ('offset', offset)):
+            # "0.1" gibi metin değerler çözümde sayı yerine metin tekrarı üretirdi
+            if number is not None and (isinstance(number, bool) or not isinstance(number, (int, float))):
+                raise ExpressionError(f"{name} sayı olmalı: {number!r}")
+        if scale is not None:
+            multiplier, addend = multiplier * scale, addend * scale
+        if offset is not None:
+            addend += offset
+
+        # Sabit konum ve genişlik: sadece negatif olmayan, iki ucu belli dilimler
+        self.start = self.width = None
+        if bounds is not None:
+            start, stop = bounds
+            start = 0 if start is None else start
+            if start >= 0 and stop is not None and stop >= 0:
+                if stop <= start:
+                    raise ExpressionError(f"Boş dilim: {expression}")
+                self.start, self.width = start, stop - start
+            self._slice = slice(bounds[0], bounds[1])
+        elif len(indices) == 1 and indices[0] >= 0:
+            self.start, self.width = indices[0], 1
+        self._indices = indices
+
+        if value_type is None:
+            value_type = 'uint' if self.width is not None or indices else 'hex'
+        self.type = value_type
+        numeric = value_type in NUMERIC_TYPES
+        if not numeric and (multiplier, divisor, addend) != (1, 1, 0):
+            raise ExpressionError(f"'{value_type}' tipine ölçek/ofset uygulanamaz: {expression}")
+        self.transform = make_transform(multiplier, divisor, addend) if numeric else None
+
+        # struct ile çözülebilen alanlar için önceden hazırlanmış Struct
+        self.code = None
+        if numeric and self.width is not None:
+            self.code = _STRUCT_CODES[value_type].get(self.width)
+            if value_type == 'float' and self.code is None:
+                raise ExpressionError(f"float 2, 4 veya 8 byte olmalı: {expression}")
+        self.decode = self._compile()
+
+    def _compile(self) -> Callable[[bytes], Any]:
+        transform = self.transform
+        if self.code is not None:
+            unpack_from = struct.Struct(('<' if self.byteorder == 'little' else '>') + self.code).unpack_from
+            start = self.start
+            if transform is None:
+                return lambda data: unpack_from(data, start)[0]
+            return lambda data: transform(unpack_from(data, start)[0])
+
+        # Byte'ları seç (dilim veya indeks listesi)
+        if self._indices is not None and len(self._indices) > 1:
+            indices = tuple(self._indices)
+            select = lambda data: bytes(data[i] for i in indices)  # noqa: E731
+        elif self._indices is not None:
+            index = self._indices[0]
+            select = lambda data: bytes((data[index],))  # noqa: E731
+        else:
+            part = self._slice
+            width = self.width
+
+            def select(data):
+                value = data[part]
+                if width is not None and len(value) != width:
+                    raise IndexError("veri kısa")
+                return value
+
+        if self.type == 'hex':
+            return lambda data: select(data).hex()
+        if self.type == 'str':
+            return lambda data: select(data).decode('utf-8', errors='replace')
+        # Standart dışı genişlikteki tamsayılar
+        signed = self.type == 'int'
+        byteorder = self.byteorder
+        if transform is None:
+            return lambda data: int.from_bytes(select(data), byteorder, signed=signed)
+        return lambda data: transform(int.from_bytes(select(data), byteorder, signed=signed))
+
+
+class DecodePlan:
+    """Bir profilin tüm telemetry alanlarının çözme planı"""
+
+    def __init__(self, fields: List[FieldDecoder]):
+        self.fields = fields
+        self._decoders = [(field.key, field.decode) for field in fields]
+        # Toplu çözme: alanlar çakışmıyor ve hepsi struct ile çözülebiliyorsa tek kayıt formatı
+        self._record = self._record_layout()
+        self._record_structs = {}
+
+        # İstatistikler
+        self.decoded = 0
+        self.errors = 0
+
+    def _record_layout(self):
+        if not self.fields or any(field.code is None for field in self.fields):
+            return None
+        orders = {field.byteorder for field in self.fields if field.width > 1}
+        if len(orders) > 1:
+            return None
+        fields = sorted(self.fields, key=lambda field: field.start)
+        layout, position = [], 0
+        for field in fields:
+            if field.start < position:
+                return None
+            if field.start > position:
+                layout.append(f'{field.start - position}x')
+            layout.append(field.code)
+            position = field.start + field.width
+        prefix = '>' if orders == {'big'} else '<'
+        keys = [(field.key, field.transform) for field in fields]
+        return prefix + ''.join(layout), position, keys
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        """Tek okumayı çöz; veri yetmeyen alanlar atlanır"""
+        self.decoded += 1
+        try:
+            return {key: decode(data) for key, decode in self._decoders}
+        except (struct.error, IndexError, ValueError):
+            values = {}
+            for key, decode in self._decoders:
+                try:
+                    values[key] = decode(data)
+                except (struct.error, IndexError, ValueError):
+                    self.errors += 1
+            return values
+
+    def decode_many(self, buffers: List[bytes]) -> List[Dict[str, Any]]:
+        """Birçok okumayı birlikte çöz (aynı uzunluktaki okumalar tek iter_unpack ile)"""
+        if self._record is None or not buffers:
+            return [self.decode(data) for data in buffers]
+        record_format, record_size, keys = self._record
+        length = len(buffers[0])
+        if length < record_size or any(len(data) != length for data in buffers):
+            return [self.decode(data) for data in buffers]
+
+        record_struct = self._record_structs.get(length)
+        if record_struct is None:
+            padding = f'{length - record_size}x' if length > record_size else ''
+            record_struct = self._record_structs[length] = struct.Struct(record_format + padding)
+        self.decoded += len(buffers)
+        if all(transform is None for _key, transform in keys):
+            names = [key for key, _transform in keys]
+            return [dict(zip(names, row)) for row in record_struct.iter_unpack(b''.join(buffers))]
+        return [
+            {key: value if transform is None else transform(value) for (key, transform), value in zip(keys, row)}
+            for row in record_struct.iter_unpack(b''.join(buffers))
+        ]
+
+
+def compile_telemetry(telemetry: Dict) -> FieldDecoder:
+    """Telemetry öğesini ({'key', 'valueExpression', ...}) derle"""
+    return FieldDecoder(
+        telemetry.get('key', ''),
+        telemetry.get('valueExpression', ''),
+        value_type=telemetry.get('type'),
+        byteorder=telemetry.get('byteorder'),
+        scale=telemetry.get('scale'),
+        offset=telemetry.get('offset')
+    )
+
+
+def compile_profile(profile: Dict) -> Optional[DecodePlan]:
+    """Profilin telemetry listesinden çözme planı (telemetry yoksa None)
+
+    Geçersiz ifadelerde ExpressionError fırlatır.
+    """
+    fields = []
+    for telemetry in profile.get('telemetry') or []:
+        if not telemetry.get('key') or not telemetry.get('valueExpression'):
+            continue
+        try:
+            fields.append(compile_telemetry(telemetry))
+        except ExpressionError as e:
+            device = profile.get('name') or profile.get('mac')
+            raise ExpressionError(f"{device + '/' if device else ''}{telemetry['key']}: {e}")
+    return DecodePlan(fields) if fields else None
@@ -231,6 +231,7 @@ async function loadConfig() {
         // RS-485
         if (config.rs485) {
             document.getElementById('rs485-enabled').checked = config.rs485.enabled || false;
+            if (config.rs485.port) document.getElementById('rs485-port').value = config.rs485.port;
             if (config.rs485.baudrate) document.getElementById('rs485-baudrate').value = config.rs485.baudrate;
             if (config.rs485.parity) document.getElementById('rs485-parity').value = config.rs485.parity;
             if (config.rs485.data_bits) document.getElementById('rs485-data-bits').value = config.rs485.data_bits;
@@ -276,6 +277,7 @@ async function loadConfig() {
             if (config.lorawan.mqtt_port) document.getElementById('lorawan-mqtt-port').value = config.lorawan.mqtt_port;
             if (config.lorawan.udp_server) document.getElementById('lorawan-udp-server').value = config.lorawan.udp_server;
             if (config.lorawan.udp_port) document.getElementById('lorawan-udp-port').value = config.lorawan.udp_port;
+            if (config.lorawan.local_port) document.getElementById('lorawan-local-port').value = config.lorawan.local_port;
         }
 
         // WiFi
@@ -315,6 +317,7 @@ function setupRS485() {
     saveBtn.addEventListener('click', async () => {
         const config = {
             enabled: document.getElementById('rs485-enabled').checked,
+            port: document.getElementById('rs485-port').value,
             baudrate: parseInt(document.getElementById('rs485-baudrate').value),
             parity: document.getElementById('rs485-parity').value,
             data_bits: parseInt(document.getElementById('rs485-data-bits').value),
@@ -399,6 +402,103 @@ function updateBLEScannedDevices(devices) {
     }
 }
 
+// BLE tarama işini başlat ve bulunan cihazları geldikçe listele
+async function scanBLEDevicesStreaming() {
+    const job = await apiCall('/ble/scan/jobs', 'POST');
+    if (!job) return null;
+    
+    // Devam eden veya önbellekteki tarama sonucu
+    const devices = new Map((job.devices || []).map(device => [device.mac, device]));
+    if (devices.size > 0) updateBLEScannedDevices([...devices.values()]);
+    if (job.status !== 'running' || typeof EventSource === 'undefined') {
+        if (job.status === 'failed') throw new Error(job.error || 'Tarama başarısız');
+        return [...devices.values()];
+    }
+    
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`${API_BASE}/ble/scan/jobs/${job.job_id}/events`, { withCredentials: true });
+        source.addEventListener('device', (event) => {
+            const device = JSON.parse(event.data);
+            devices.set(device.mac, device);
+            updateBLEScannedDevices([...devices.values()]);
+        });
+        source.addEventListener('done', (event) => {
+            source.close();
+            const result = JSON.parse(event.data);
+            if (result.status === 'failed') {
+                reject(new Error(result.error || 'Tarama başarısız'));
+            } else {
+                resolve([...devices.values()]);
+            }
+        });
+        source.onerror = () => {
+            // Bağlantı koptu: o ana kadar bulunanları döndür
+            source.close();
+            resolve([...devices.values()]);
+        };
+    });
+}
+
+// Cihazların en son okunan değerlerini canlı izle (SSE)
+let bleLiveSource = null;
+const bleLiveReadings = new Map();
+let bleLiveRenderPending = false;
+
+function renderBLELiveData() {
+    bleLiveRenderPending = false;
+    const container = document.getElementById('ble-live-data');
+    if (!container) return;
+    
+    if (bleLiveReadings.size === 0) {
+        container.innerHTML = '<p class="text-muted">Henüz okuma yok</p>';
+        return;
+    }
+    // Değerler cihazın yayınından gelir: HTML olarak değil metin olarak eklenir (XSS)
+    const items = [...bleLiveReadings.values()].map(reading => {
+        const time = new Date(reading.ts).toLocaleTimeString();
+        // Profilde telemetry tanımlıysa çözülmüş değerler, değilse ham veri
+        const values = reading.values
+            ? Object.entries(reading.values).map(([key, value]) => `${key}: ${value}`).join(', ')
+            : `${reading.data} (${reading.data_length} byte)`;
+        const item = document.createElement('div');
+        item.className = 'device-item';
+        item.style.cssText = 'padding: 10px; margin-bottom: 5px; border: 1px solid #e1e8ed; border-radius: 4px;';
+        const name = document.createElement('strong');
+        name.textContent = reading.mac_address || reading.device;
+        const detail = document.createElement('small');
+        detail.textContent = values;
+        item.append(name, ` - ${time}`, document.createElement('br'), detail);
+        return item;
+    });
+    container.replaceChildren(...items);
+}
+
+function toggleBLELiveData(button) {
+    if (bleLiveSource) {
+        bleLiveSource.close();
+        bleLiveSource = null;
+        button.textContent = 'Canlı Verileri İzle';
+        return;
+    }
+    if (typeof EventSource === 'undefined') {
+        showMessage('ble-message', 'Tarayıcı canlı izlemeyi desteklemiyor', true);
+        return;
+    }
+    
+    bleLiveSource = new EventSource(`${API_BASE}/telemetry/live`, { withCredentials: true });
+    bleLiveSource.addEventListener('telemetry', (event) => {
+        const reading = JSON.parse(event.data);
+        bleLiveReadings.set(reading.mac_address || reading.device, reading);
+        // Çok sayıda okumada liste kare başına bir kez çizilir
+        if (!bleLiveRenderPending) {
+            bleLiveRenderPending = true;
+            requestAnimationFrame(renderBLELiveData);
+        }
+    });
+    button.textContent = 'İzlemeyi Durdur';
+    renderBLELiveData();
+}
+
 // Global scope'ta olmalı (HTML onclick için)
 window.selectBLEDevice = function(mac, serviceUuid, characteristicUuid) {
     const macInput = document.getElementById('ble-profile-mac');
@@ -476,7 +576,7 @@ function renderTelemetryList() {
                 </div>
                 <div class="form-group" style="flex: 1;">
                     <label>Value Expression</label>
-                    <input type="text" class="form-control telemetry-expression" data-index="${index}" value="${item.valueExpression}" placeholder="Örn: [0], [:], [1,2]">
+                    <input type="text" class="form-control telemetry-expression" data-index="${index}" value="${item.valueExpression}" placeholder="Örn: [0], [0:2] * 0.1, int_be[2:4], float[4:8]">
                 </div>
                 <div class="form-group" style="width: 100px;">
                     <label>&nbsp;</label>
@@ -617,12 +717,12 @@ function setupBLE() {
             scanBtn.disabled = true;
             scanBtn.textContent = 'Taranıyor...';
             console.log('BLE tarama başlatılıyor...');
-            const result = await apiCall('/ble/scan', 'POST');
-            console.log('BLE tarama sonucu:', result);
+            const devices = await scanBLEDevicesStreaming();
+            console.log('BLE tarama sonucu:', devices);
             
-            if (result && result.devices) {
-                updateBLEScannedDevices(result.devices);
-                showMessage('ble-message', `${result.devices.length} BLE cihazı bulundu`);
+            if (devices && devices.length > 0) {
+                updateBLEScannedDevices(devices);
+                showMessage('ble-message', `${devices.length} BLE cihazı bulundu`);
             } else {
                 showMessage('ble-message', 'BLE cihazı bulunamadı', true);
             }
@@ -637,6 +737,15 @@ function setupBLE() {
     
     console.log('BLE scan button event listener eklendi');
     
+    // Canlı veri izleme
+    const liveBtn = document.getElementById('toggle-ble-live');
+    if (liveBtn) {
+        liveBtn.addEventListener('click', (e) => {
+            e.preventDefault();
+            toggleBLELiveData(liveBtn);
+        });
+    }
+    
     // Yeni profil ekle
     addProfileBtn.addEventListener('click', (e) => {
         e.preventDefault();
@@ -750,6 +859,7 @@ function setupLoRaWAN() {
         } else {
             config.udp_server = document.getElementById('lorawan-udp-server').value;
             config.udp_port = parseInt(document.getElementById('lorawan-udp-port').value);
+            config.local_port = parseInt(document.getElementById('lorawan-local-port').value);
         }
 
         try {